@@ -0,0 +1,59 @@
+"""Measure the memory used by model instances
+
+Run from the root of the repository, with and without a change, to
+compare them::
+
+    python benchmarks/instances.py
+
+The instances are built from documents the way query results are, and
+the documents themselves aren't counted. No database connection is
+needed. tracemalloc requires Python 3.4 or later.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from simon import Model  # NOQA
+
+
+class User(Model):
+    class Meta:
+        collection = 'users'
+
+    def full_name(self):
+        return '{0} {1}'.format(self.first_name, self.last_name)
+
+
+def build(documents):
+    if hasattr(User, '_from_db'):
+        return [User._from_db(document) for document in documents]
+
+    # Before 0.8.0, results were loaded into new instances this way.
+    instances = []
+    for document in documents:
+        instance = User()
+        instance._document = document
+        instances.append(instance)
+    return instances
+
+
+def main(number=100000):
+    documents = [{'_id': x, 'first_name': 'Simon'} for x in range(number)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = build(documents)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print('{0} instances: {1:.0f} bytes each'.format(
+        len(instances), float(after - before) / number))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Time the translation of attribute names to document keys
+
+Run from the root of the repository, with and without a change, to
+compare them::
+
+    python benchmarks/map_fields.py
+
+No database connection is needed. Before 0.8.0, queries with operators
+raise :class:`RuntimeError` on Python 3.8 and later, so compare those
+with an older version of Python. Cases that fail are reported rather
+than timed.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from simon import Model  # NOQA
+from simon.utils import map_fields  # NOQA
+
+FIELD_MAP = {'id': '_id', 'first_name': 'profile.first_name',
+             'last_name': 'profile.last_name', 'score': 'stats.score'}
+
+
+class User(Model):
+    class Meta:
+        collection = 'users'
+        field_map = FIELD_MAP
+
+
+QUERY = {'first_name': 'Simon', 'score__gt': 1000, 'friends__size': 2,
+         'last_name__not__in': ['Seville']}
+
+BENCHMARKS = (
+    ('attribute key, map_fields()',
+     lambda: map_fields(FIELD_MAP, {'profile__first_name': 1},
+                        flatten_keys=True)),
+    ('attribute key, Meta.map_key()',
+     lambda: User._meta.map_key('profile__first_name')),
+    ('4-key query with operators, flatten_keys',
+     lambda: map_fields(FIELD_MAP, dict(QUERY), with_operators=True,
+                        flatten_keys=True)),
+    ('nested keys, second pass',
+     lambda: map_fields(FIELD_MAP, {'profile__first_name': 1,
+                                    'stats__score': 2})),
+)
+
+
+def main(number=100000, repeat=5):
+    for name, function in BENCHMARKS:
+        try:
+            best = min(timeit.repeat(function, number=number, repeat=repeat))
+        except (AttributeError, RuntimeError) as e:
+            # Meta.map_key() was added in 0.8.0.
+            print('{0}: failed ({1!r})'.format(name, e))
+            continue
+        print('{0}: {1:.2f}us per call'.format(name, best / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,4 @@
 __version__ = '0.8.0'
 
 from .base import Model
+from .sessions import identity_map, session
@@ -1,21 +1,28 @@
 """The base Simon models"""
 
 from collections import defaultdict
+from functools import partial
+from itertools import chain, islice
 import sys
 import warnings
 
 from bson import ObjectId
 
-from ._compat import get_next, iterkeys, itervalues, reraise, with_metaclass
+from ._compat import iteritems, itervalues, reraise, with_metaclass
 from .exceptions import MultipleDocumentsFound, NoDocumentFound
 from .meta import Meta
 from .query import Q, QuerySet
+from .sessions import (Counter, flush_queued, get_counters, get_identity_map,
+                       get_session)
 from .utils import (current_datetime, get_nested_key, guarantee_object_id,
                     ignored, is_atomic, map_fields, remove_nested_key,
-                    set_write_concern, update_nested_keys)
+                    set_nested_key, set_write_concern, update_nested_keys)
 
 __all__ = ('Model',)
 
+# Used to tell a missing value apart from None.
+_missing = object()
+
 
 # In version 2.4, PyMongo introduced MongoClient as a
 # replacement for Connection. Part of the new class is that the
@@ -24,6 +31,238 @@ __all__ = ('Model',)
 # number of servers in a replica set that must receive the
 # update before the write is considered successful.
 
+def _apply_operator(document, operator, fields):
+    """Apply the effects of an update operator to a document.
+
+    The new values are computed from the values already in
+    ``document``. Any fields whose new values can't be computed that
+    way--because they're missing, aren't lists, or are being pulled
+    with a query--are left alone.
+
+    :param document: The document to update.
+    :type document: dict.
+    :param operator: The update operator.
+    :type operator: str.
+    :param fields: The fields and values used with the operator.
+    :type fields: dict.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    for key, value in iteritems(fields):
+        try:
+            current = get_nested_key(document, key)
+        except KeyError:
+            current = _missing
+
+        if operator == '$inc':
+            if current is _missing:
+                current = 0
+            set_nested_key(document, key, current + value)
+            continue
+
+        if operator in ('$push', '$pushAll', '$addToSet'):
+            if current is _missing:
+                current = []
+        if not isinstance(current, list):
+            continue
+
+        if operator == '$push':
+            current = current + [value]
+        elif operator == '$pushAll':
+            current = current + list(value)
+        elif operator == '$addToSet':
+            if isinstance(value, dict) and '$each' in value:
+                value = value['$each']
+            else:
+                value = [value]
+            current = list(current)
+            for x in value:
+                if x not in current:
+                    current.append(x)
+        elif operator == '$pop':
+            current = current[:-1] if value == 1 else current[1:]
+        elif operator == '$pull' and not isinstance(value, dict):
+            current = [x for x in current if x != value]
+        elif operator == '$pullAll':
+            current = [x for x in current if x not in value]
+        else:
+            continue
+
+        set_nested_key(document, key, current)
+
+
+def _has_key(document, key):
+    """Return whether a document contains a key.
+
+    :param document: The document.
+    :type document: dict.
+    :param key: The key, using ``.`` for nested keys.
+    :type key: str.
+    :returns: bool -- ``True`` if the key is in the document.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    try:
+        get_nested_key(document, key)
+    except KeyError:
+        return False
+    return True
+
+
+def _invalidate(cls, id=None):
+    """Remove out of date entries from a model's caches.
+
+    The document is removed from ``Meta.cache``, and all of the results
+    for the model's collection are removed from ``Meta.query_cache``.
+
+    :param cls: The model class.
+    :type cls: :class:`Model`.
+    :param id: (optional) The ``_id`` of the document that was written.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    if id is not None and cls._meta.cache is not None:
+        cls._meta.cache.remove(id)
+
+    if cls._meta.query_cache is not None:
+        cls._meta.query_cache.invalidate(cls._meta.db.full_name)
+
+
+def _invalidate_when_sent(session, cls, id=None):
+    """Remove out of date entries from a model's caches after a write.
+
+    Writes queued in a session aren't in the database until the session
+    is flushed. Until then, the cached values are still correct, and
+    removing them early would let them be cached again from the old
+    document.
+
+    :param session: The session the write was queued in, if any.
+    :type session: :class:`~simon.sessions.Session` or
+                   :class:`~simon.sessions.WriteBehind`.
+    :param cls: The model class.
+    :type cls: :class:`Model`.
+    :param id: (optional) The ``_id`` of the document that was written.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    if session is None:
+        _invalidate(cls, id)
+    else:
+        session.on_flush(partial(_invalidate, cls, id))
+
+
+def _mark_changed(instance, key):
+    """Record that a key in an instance's document has changed.
+
+    Most instances are never changed, so the ``set`` of changed keys
+    isn't created until it's needed.
+
+    :param instance: The instance.
+    :type instance: :class:`Model`.
+    :param key: The key, using ``.`` for nested keys.
+    :type key: str.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    changed = instance._changed
+    if changed is None:
+        # Going through __setattr__() isn't necessary for _changed.
+        object.__setattr__(instance, '_changed', set([key]))
+    else:
+        changed.add(key)
+
+
+def _remove_value(document, key):
+    """Remove a key from a document if it's there.
+
+    :param document: The document.
+    :type document: dict.
+    :param key: The key, using ``.`` for nested keys.
+    :type key: str.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    with ignored(KeyError, TypeError):
+        remove_nested_key(document, key)
+
+
+class _Field(object):
+
+    """Give direct access to a field declared on a model.
+
+    Attributes for the fields named in ``field_map`` and
+    ``typed_fields`` are read from and written to the document without
+    going through :meth:`Model.__getattr__` and
+    :meth:`Model.__setattr__`. If the ``field_map`` no longer maps the
+    name the way it did when the field was declared, whether it was
+    replaced or changed in place, the work is handed back to them.
+
+    :param name: The name of the attribute.
+    :type name: str.
+    :param key: The key of the field in the document.
+    :type key: str.
+    :param field_map: The ``field_map`` used to find ``key``.
+    :type field_map: dict.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    def __init__(self, name, key, field_map):
+        self.name = name
+        self.key = key
+        # What the field_map held for the name. As long as it holds the
+        # same thing, key is still right.
+        self.mapped = field_map.get(name, name)
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        if instance._meta.field_map.get(self.name, self.name) == self.mapped:
+            try:
+                value = instance._document[self.key]
+            except KeyError:
+                pass
+            else:
+                if isinstance(value, (dict, list)):
+                    # Changes could be made to the value in place.
+                    _mark_changed(instance, self.key)
+                return value
+
+        return instance.__getattr__(self.name)
+
+    def __set__(self, instance, value):
+        if (instance._meta.field_map.get(self.name, self.name) !=
+                self.mapped or isinstance(value, dict)):
+            # Documents are merged into the existing value rather than
+            # replacing it.
+            instance._set_attribute(self.name, value)
+            return
+
+        instance._document[self.key] = value
+        _mark_changed(instance, self.key)
+
+    def __delete__(self, instance):
+        # Model.__delattr__() has already removed the field if it was
+        # in the document.
+        message = "'{0}' object has no attribute '{1}'."
+        raise AttributeError(message.format(instance.__class__.__name__,
+                                            self.key))
+
+
 class ModelMetaClass(type):
 
     """Define :class:`Model`."""
@@ -36,7 +275,20 @@ class ModelMetaClass(type):
             return new_new(cls, name, bases, attrs)
 
         module = attrs.pop('__module__')
-        new_class = new_new(cls, name, bases, {'__module__': module})
+        namespace = {'__module__': module}
+
+        # The document and its changed keys are kept in the slots Model
+        # provides. Instances still get a __dict__, unless the class
+        # declares __slots__ of its own, so that they can override the
+        # attributes of the class. It's only created when that happens.
+        if '__slots__' in attrs:
+            namespace['__slots__'] = attrs.pop('__slots__')
+        elif any(getattr(base, '__dictoffset__', 0) for base in bases):
+            namespace['__slots__'] = ()
+        else:
+            namespace['__slots__'] = ('__dict__',)
+
+        new_class = new_new(cls, name, bases, namespace)
 
         # Associate all attributes with the new class.
         for k, v in attrs.items():
@@ -55,8 +307,42 @@ class ModelMetaClass(type):
         # Associate _meta with the new class.
         new_class.addattr('_meta', Meta(meta))
 
+        new_class.addfields()
+
         return new_class
 
+    def addfields(self):
+        """Add a :class:`_Field` for each field declared on the class.
+
+        Only fields stored at the top level of the document are given
+        one. Nested fields, and names already used by the class, are
+        left to :meth:`Model.__getattr__` and :meth:`Model.__setattr__`.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        meta = self._meta
+
+        names = set()
+        for name in chain(meta.field_map, meta.typed_fields):
+            if '__' in name or '.' in name or name in meta.core_attributes:
+                continue
+
+            key = meta.map_key(name)
+            if '.' in key:
+                continue
+
+            existing = getattr(self, name, _missing)
+            if existing is not _missing and not isinstance(existing, _Field):
+                # Don't hide a method or class attribute.
+                continue
+
+            setattr(self, name, _Field(name, key, meta.field_map))
+            names.add(name)
+
+        meta.fields = frozenset(names)
+
     def addattr(self, name, value):
         """Assign attributes to the class."""
 
@@ -70,6 +356,10 @@ class Model(with_metaclass(ModelMetaClass)):
 
     """Base class for all Simon models."""
 
+    # Subclasses only get a __dict__ for overriding attributes (see
+    # ModelMetaClass), keeping each instance as small as possible.
+    __slots__ = ('_changed', '_document', '_saved', '__weakref__')
+
     def __init__(self, **fields):
         """Assign all keyword arguments to the object's document.
 
@@ -82,6 +372,15 @@ class Model(with_metaclass(ModelMetaClass)):
         # used to store the real document's values
         self._document = {}
 
+        # Keep track of the keys that are set or removed so that saving
+        # only needs to send the ones that have changed. The set is
+        # created when the first one changes.
+        self._changed = None
+
+        # Until it has been saved, the whole document needs to be sent
+        # to the database, even if it has an _id.
+        self._saved = False
+
         fields = map_fields(self.__class__._meta.field_map, fields)
 
         # Add the fields to the document
@@ -101,6 +400,163 @@ class Model(with_metaclass(ModelMetaClass)):
         # just call that with no parameters.
         return self.find()
 
+    @classmethod
+    def bulk_create(cls, documents, batch_size=1000, **kwargs):
+        """Insert many new documents into the database.
+
+        Each item in ``documents`` can be an instance of the model or a
+        ``dict`` of the fields to give a new instance. The documents are
+        sent to the database in batches of ``batch_size`` documents,
+        with one ``insert`` per batch. Each instance is given the
+        ``_id`` assigned to its document.
+
+        ``required_fields`` and ``typed_fields`` are enforced for every
+        document in a batch before any of them are inserted. When
+        ``auto_timestamp`` is ``True``, all of the documents in a batch
+        share the same ``created`` and ``modified`` values.
+
+        Inside of a session, or when ``Meta.write_behind`` is enabled,
+        the inserts are queued the same way as those of :meth:`save`.
+
+        :param documents: The documents to insert.
+        :type documents: iterable.
+        :param batch_size: (optional) The maximum number of documents to
+                           send with each insert.
+        :type batch_size: int.
+        :param safe: (optional) **DEPRECATED** Use ``w`` instead.
+        :type safe: bool.
+        :param w: (optional) The number of servers that must receive the
+                  update for it to be successful.
+        :type w: int.
+        :returns: list -- the new instances.
+        :raises: :class:`TypeError`, :class:`ValueError`
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        if batch_size < 1:
+            raise ValueError('batch_size must be greater than 0.')
+
+        write_concern = {
+            'safe': kwargs.pop('safe', None),
+            'w': kwargs.pop('w', None),
+        }
+
+        set_write_concern(write_concern, cls._meta.write_concern)
+
+        instances = []
+
+        documents = iter(documents)
+        while True:
+            batch = [x if isinstance(x, cls) else cls(**x)
+                     for x in islice(documents, batch_size)]
+            if not batch:
+                break
+
+            # Use copies of the internal documents so that the instances
+            # will be in a consistent state if something goes wrong.
+            docs = [x._document.copy() for x in batch]
+
+            required = cls._meta.required
+            for doc in docs:
+                if required and not (required.issubset(doc) or all(
+                        _has_key(doc, k) for k in required)):
+                    message = ("The '{0}' object cannot be updated because it "
+                               "must contain all of the required fields: "
+                               "{1}.")
+                    message = message.format(
+                        cls.__name__, ', '.join(cls._meta.required_fields))
+                    raise TypeError(message)
+
+                cls._check_typed_fields(doc)
+
+            if cls._meta.auto_timestamp:
+                now = current_datetime()
+                for doc in docs:
+                    doc['created'] = now
+                    doc['modified'] = now
+
+            # Inside of a session, the inserts are queued along with the
+            # other writes. Models using write-behind always queue them.
+            session = get_session()
+            if session is None and cls._meta.write_behind:
+                session = cls._meta.write_behind
+            if session is not None:
+                # The inserts won't happen right away, so the _ids need
+                # to be assigned now.
+                for doc in docs:
+                    if '_id' not in doc:
+                        doc['_id'] = ObjectId()
+                ids = session.insert(cls._meta.db, docs, **write_concern)
+            else:
+                ids = cls._meta.db.insert(doc_or_docs=docs, **write_concern)
+            _invalidate_when_sent(session, cls)
+
+            identity_map = get_identity_map()
+            for instance, doc, id in zip(batch, docs, ids):
+                doc['_id'] = id
+                instance._document = doc
+                instance._changed = None
+                instance._saved = True
+
+                if identity_map is not None:
+                    identity_map.add(cls._meta.db, instance)
+
+            instances.extend(batch)
+
+        return instances
+
+    def counter(self, field):
+        """Return a counter for a field of the document.
+
+        Adding to the counter increments the field in the database, but
+        the increments are accumulated in memory and sent periodically
+        as a single ``$inc`` rather than one for each call::
+
+            >>> page.counter('views').add()
+            >>> page.counter('views').add(10)
+
+        The increments are aggregated by ``Meta.counters`` if the model
+        has one, or by the aggregator shared by all models. See
+        :class:`~simon.sessions.Counters` for when the increments are
+        sent.
+
+        The value associated with the instance is not changed.
+
+        If the document does not have an ``_id``--this will
+        most likely indicate that the document has never been saved--
+        a :class:`TypeError` will be raised.
+
+        :param field: Name of the field.
+        :type field: str.
+        :returns: :class:`~simon.sessions.Counter` -- the counter.
+        :raises: :class:`TypeError`
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        id = self._document.get('_id')
+        if not id:
+            raise TypeError("The '{0}' object cannot be counted because its "
+                            "'{1}' attribute has not been set.".format(
+                                self.__class__.__name__, '_id'))
+
+        field = self._meta.map_key(field)
+
+        write_concern = {}
+        set_write_concern(write_concern, self._meta.write_concern)
+
+        counters = self._meta.counters or get_counters()
+
+        # The cached copies of the document are out of date once the
+        # increments have been sent.
+        on_flush = partial(_invalidate, self.__class__, id)
+
+        return Counter(counters, self._meta.db, id, field, on_flush=on_flush,
+                       **write_concern)
+
     @classmethod
     def create(cls, **fields):
         """Create a new document and saves it to the database.
@@ -165,9 +621,23 @@ class Model(with_metaclass(ModelMetaClass)):
 
         set_write_concern(write_concern, self._meta.write_concern)
 
-        self._meta.db.remove({'_id': id}, **write_concern)
+        session = get_session()
+        if session is None and self._meta.write_behind:
+            session = self._meta.write_behind
+        if session is not None:
+            session.remove(self._meta.db, {'_id': id}, **write_concern)
+        else:
+            self._meta.db.remove({'_id': id}, **write_concern)
+
+        _invalidate_when_sent(session, self.__class__, id)
+
+        identity_map = get_identity_map()
+        if identity_map is not None:
+            identity_map.remove(self._meta.db, id)
 
         self._document = {}
+        self._changed = None
+        self._saved = False
 
     @classmethod
     def find(cls, q=None, *qs, **fields):
@@ -181,11 +651,16 @@ class Model(with_metaclass(ModelMetaClass)):
         :type q: :class:`~simon.query.Q`.
         :param \*qs: **DEPRECATED** Use ``q`` instead.
         :type \*qs: \*args.
+        :param fields: (optional) Names of the fields to retrieve.
+        :type fields: str, list, or tuple.
         :param \*\*fields: Keyword arguments specifying the query.
         :type \*\*fields: \*\*kwargs.
         :returns: :class:`~simon.base.QuerySet` -- query set containing
                   objects matching ``query``.
 
+        .. versionchanged:: 0.8.0
+           ``fields`` can be used to limit the fields retrieved
+
         .. versionchanged:: 0.3.0
            ``qs`` is being deprecated in favor of ``q``
 
@@ -197,7 +672,9 @@ class Model(with_metaclass(ModelMetaClass)):
             for filter in qs:
                 q._filter.update(filter._filter)
 
-        return cls._find(q=q, **fields)
+        projection = fields.pop('fields', None)
+
+        return cls._find(q=q, projection=projection, **fields)
 
     @classmethod
     def get(cls, q=None, *qs, **fields):
@@ -211,12 +688,17 @@ class Model(with_metaclass(ModelMetaClass)):
         :type q: :class:`~simon.query.Q`.
         :param \*qs: **DEPRECATED** Use ``q`` instead.
         :type \*qs: \*args.
+        :param fields: (optional) Names of the fields to retrieve.
+        :type fields: str, list, or tuple.
         :param \*\*fields: Keyword arguments specifying the query.
         :type \*\*fields: \*\*kwargs.
         :returns: :class:`~simon.Model` -- object matching ``query``.
         :raises: :class:`~simon.Model.MultipleDocumentsFound`,
                  :class:`~simon.Model.NoDocumentFound`
 
+        .. versionchanged:: 0.8.0
+           ``fields`` can be used to limit the fields retrieved
+
         .. versionchanged:: 0.3.0
            ``qs`` is being deprecated in favor of ``q``
 
@@ -228,7 +710,106 @@ class Model(with_metaclass(ModelMetaClass)):
             for filter in qs:
                 q._filter.update(filter._filter)
 
-        return cls._find(find_one=True, q=q, **fields)
+        projection = fields.pop('fields', None)
+
+        return cls._find(find_one=True, q=q, projection=projection, **fields)
+
+    @classmethod
+    def get_many(cls, ids, missing='skip', as_dict=False, batch_size=1000):
+        """Return the documents with the given ``_id`` values.
+
+        The documents are retrieved with one ``$in`` query for each
+        batch of ``batch_size`` values. Like :meth:`get`, documents
+        already in the identity map or ``Meta.cache`` don't need to come
+        from the database.
+
+        ``missing`` controls what happens to values in ``ids`` that
+        don't match a document. With ``'skip'`` they are left out of the
+        results. With ``'none'`` they are given ``None`` instead of an
+        instance. With ``'raise'``, ``NoDocumentFound`` is raised.
+
+        :param ids: The ``_id`` values of the documents.
+        :type ids: iterable.
+        :param missing: (optional) ``'skip'``, ``'none'``, or
+                        ``'raise'``.
+        :type missing: str.
+        :param as_dict: (optional) Whether or not to return a ``dict``
+                        keyed by ``_id`` rather than a ``list``.
+        :type as_dict: bool.
+        :param batch_size: (optional) The maximum number of values to
+                           send with each query.
+        :type batch_size: int.
+        :returns: list or dict -- the instances, in the same order as
+                  ``ids``.
+        :raises: :class:`~simon.Model.NoDocumentFound`,
+                 :class:`ValueError`
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        if missing not in ('none', 'raise', 'skip'):
+            raise ValueError("missing must be 'none', 'raise', or 'skip'.")
+
+        if batch_size < 1:
+            raise ValueError('batch_size must be greater than 0.')
+
+        # Make sure the _ids are Object IDs, but only if they're typed
+        # as them.
+        if cls._meta.typed_fields['_id'] == ObjectId:
+            ids = [guarantee_object_id(id) for id in ids]
+        else:
+            ids = list(ids)
+
+        identity_map = get_identity_map()
+        cache = cls._meta.cache
+
+        found = {}
+        pending = []
+        requested = set()
+        for id in ids:
+            if id in requested:
+                continue
+            requested.add(id)
+
+            instance = None
+            if identity_map is not None:
+                instance = identity_map.get(cls._meta.db, id)
+            if instance is None and cache is not None:
+                document = cache.get(id)
+                if document is not None:
+                    instance = cls._from_db(document)
+
+            if instance is None:
+                pending.append(id)
+            else:
+                found[id] = instance
+
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            # The generation has to be checked before the documents are
+            # read so that a write made in between isn't missed.
+            if cache is not None:
+                generation = cache.generation()
+            for document in cls._meta.db.find({'_id': {'$in': batch}}):
+                if cache is not None:
+                    cache.set(document['_id'], document, generation)
+                found[document['_id']] = cls._from_db(document)
+
+        if missing == 'raise':
+            not_found = [id for id in pending if id not in found]
+            if not_found:
+                message = "'{0}' matching _ids do not exist: {1}."
+                message = message.format(
+                    cls.__name__, ', '.join(str(id) for id in not_found))
+                raise cls.NoDocumentFound(message)
+
+        if missing == 'skip':
+            ids = [id for id in ids if id in found]
+
+        if as_dict:
+            return dict((id, found.get(id)) for id in ids)
+        return [found.get(id) for id in ids]
 
     @classmethod
     def get_or_create(cls, **fields):
@@ -242,6 +823,23 @@ class Model(with_metaclass(ModelMetaClass)):
         will also be returned to indicate whether or not the document
         was created.
 
+        Finding and creating the document happen in a single trip to
+        the database using an upsert with ``$setOnInsert``. Two calls
+        running at the same time can only be kept from both creating a
+        document by a unique index on the fields in the query; without
+        one, MongoDB may insert a document for each of them. The new
+        document contains the fields from the query that aren't using
+        operators. If more than one document matches the query, one of
+        them is returned.
+
+        When the new document would be missing any of the model's
+        ``required_fields`` or have a field of the wrong type, the
+        document is retrieved with :meth:`get` and created with
+        :meth:`create` instead. ``safe`` and ``w`` only apply when this
+        happens; they are ignored by the upsert, which the database
+        always acknowledges. The upsert can't be queued in a session,
+        so any writes queued before it are sent first.
+
         :param safe: (optional) **DEPRECATED** Use ``w`` instead.
         :type safe: bool.
         :param w: (optional) The number of servers that must receive the
@@ -251,7 +849,11 @@ class Model(with_metaclass(ModelMetaClass)):
         :type \*\*fields: \*\*kwargs.
         :returns: tuple -- the :class:`~simon.Model` and whether the
                   document was created.
-        :raises: :class:`~simon.Model.MultipleDocumentsFound`
+        :raises: :class:`~simon.Model.MultipleDocumentsFound`,
+                 :class:`TypeError`
+
+        .. versionchanged:: 0.8.0
+           Uses a single upsert
 
         """
 
@@ -260,6 +862,55 @@ class Model(with_metaclass(ModelMetaClass)):
             'w': fields.pop('w', None),
         }
 
+        # Use a copy of fields so that they are left intact for get()
+        # and create().
+        query = map_fields(cls._meta.field_map, dict(fields),
+                           flatten_keys=True, with_operators=True)
+
+        # If querying by the _id, make sure it's an Object ID, but only
+        # if it's typed as one.
+        if '_id' in query and cls._meta.typed_fields['_id'] == ObjectId:
+            query['_id'] = guarantee_object_id(query['_id'])
+
+        # Only the fields being matched exactly will be part of a new
+        # document.
+        document = dict((k, v) for k, v in iteritems(query) if not (
+            k[0] == '$' or (isinstance(v, dict) and is_atomic(v))))
+
+        # A new document that would be missing required fields or have
+        # fields of the wrong type can't be inserted this way. Those are
+        # left to get() and create() below, which handle them the same
+        # way they always have.
+        insertable = cls._meta.required.issubset(document)
+        if insertable:
+            try:
+                cls._check_typed_fields(document)
+            except TypeError:
+                insertable = False
+
+        if insertable and cls._meta.auto_timestamp:
+            now = current_datetime()
+            document['created'] = now
+            document['modified'] = now
+
+        # $setOnInsert needs at least one field to set.
+        if insertable and document:
+            # With $setOnInsert, an existing document is returned as is
+            # and a new one is inserted when there isn't one. Either
+            # way it happens atomically in one trip to the database.
+            # The result is needed right away, so the upsert can't be
+            # queued. Anything queued before it has to be sent first.
+            flush_queued(cls._meta.write_behind)
+            result = cls._meta.db.find_and_modify(
+                query, {'$setOnInsert': document}, upsert=True, new=True,
+                full_response=True)
+
+            created = not result['lastErrorObject']['updatedExisting']
+            if created:
+                _invalidate(cls, result['value'].get('_id'))
+
+            return cls._from_db(result['value']), created
+
         try:
             return cls.get(**fields), False
         except cls.NoDocumentFound:
@@ -291,6 +942,9 @@ class Model(with_metaclass(ModelMetaClass)):
         :type field: str.
         :param value: (optional) Value to increment ``field`` by.
         :type value: int.
+        :param reload: (optional) Whether to retrieve the new values
+                       from the database. Defaults to ``Meta.reload``.
+        :type reload: bool.
         :param safe: (optional) **DEPRECATED** Use ``w`` instead.
         :type safe: bool.
         :param w: (optional) The number of servers that must receive the
@@ -301,6 +955,9 @@ class Model(with_metaclass(ModelMetaClass)):
         :type \*\*fields: \*\*kwargs.
         :raises: :class:`TypeError`, :class:`ValueError`
 
+        .. versionchanged:: 0.8.0
+           Added ``reload``
+
         """
 
         write_concern = {
@@ -308,6 +965,8 @@ class Model(with_metaclass(ModelMetaClass)):
             'w': fields.pop('w', None),
         }
 
+        reload = fields.pop('reload', None)
+
         # There needs to be something to update.
         if field is None and not fields:
             raise ValueError('No fields have been specified.')
@@ -322,7 +981,7 @@ class Model(with_metaclass(ModelMetaClass)):
         for k, v in fields.items():
             update[k] = v
 
-        self._update({'$inc': update}, **write_concern)
+        self._update({'$inc': update}, reload=reload, **write_concern)
 
     def pop(self, fields, **kwargs):
         """Perform an atomic pop.
@@ -338,6 +997,9 @@ class Model(with_metaclass(ModelMetaClass)):
 
         :param fields: The names of the fields to pop from.
         :type fields: str, list, or tuple.
+        :param reload: (optional) Whether to retrieve the new values
+                       from the database. Defaults to ``Meta.reload``.
+        :type reload: bool.
         :param safe: (optional) **DEPRECATED** Use ``w`` instead.
         :type safe: bool.
         :param w: (optional) The number of servers that must receive the
@@ -345,6 +1007,9 @@ class Model(with_metaclass(ModelMetaClass)):
         :type w: int.
         :raises: :class:`TypeError`
 
+        .. versionchanged:: 0.8.0
+           Added ``reload``
+
         .. versionadded:: 0.5.0
 
         """
@@ -357,6 +1022,8 @@ class Model(with_metaclass(ModelMetaClass)):
             'w': kwargs.pop('w', None),
         }
 
+        reload = kwargs.pop('reload', None)
+
         if not isinstance(fields, (list, tuple)):
             fields = (fields,)
 
@@ -371,7 +1038,7 @@ class Model(with_metaclass(ModelMetaClass)):
 
             update[field] = direction
 
-        self._update({'$pop': update}, **write_concern)
+        self._update({'$pop': update}, reload=reload, **write_concern)
 
     def pull(self, field=None, value=None, **fields):
         """Perform an atomic pull.
@@ -404,6 +1071,9 @@ class Model(with_metaclass(ModelMetaClass)):
         :type field: str.
         :param value: (optional) Value to pull from ``field``.
         :type value: scalar or list.
+        :param reload: (optional) Whether to retrieve the new values
+                       from the database. Defaults to ``Meta.reload``.
+        :type reload: bool.
         :param safe: (optional) **DEPRECATED** Use ``w`` instead.
         :type safe: bool.
         :param w: (optional) The number of servers that must receive the
@@ -414,6 +1084,9 @@ class Model(with_metaclass(ModelMetaClass)):
         :type \*\*fields: \*\*kwargs.
         :raises: :class:`TypeError`, :class:`ValueError`
 
+        .. versionchanged:: 0.8.0
+           Added ``reload``
+
         .. versionadded:: 0.5.0
 
         """
@@ -423,6 +1096,8 @@ class Model(with_metaclass(ModelMetaClass)):
             'w': fields.pop('w', None),
         }
 
+        reload = fields.pop('reload', None)
+
         # There needs to be something to update.
         if not (field and value) and not fields:
             raise ValueError('No fields have been specified.')
@@ -447,7 +1122,7 @@ class Model(with_metaclass(ModelMetaClass)):
             else:
                 update['$pull'][k] = v
 
-        self._update(update, **write_concern)
+        self._update(update, reload=reload, **write_concern)
 
     def push(self, field=None, value=None, allow_duplicates=True, **fields):
         """Perform an atomic push.
@@ -487,6 +1162,9 @@ class Model(with_metaclass(ModelMetaClass)):
         :param allow_duplicates: (optional) Whether to allow duplicate
                                  values to be added to the list
         :type allow_duplicates: bool.
+        :param reload: (optional) Whether to retrieve the new values
+                       from the database. Defaults to ``Meta.reload``.
+        :type reload: bool.
         :param safe: (optional) **DEPRECATED** Use ``w`` instead.
         :type safe: bool.
         :param w: (optional) The number of servers that must receive the
@@ -497,6 +1175,9 @@ class Model(with_metaclass(ModelMetaClass)):
         :type \*\*fields: \*\*kwargs.
         :raises: :class:`TypeError`, :class:`ValueError`
 
+        .. versionchanged:: 0.8.0
+           Added ``reload``
+
         .. versionadded:: 0.5.0
 
         """
@@ -506,6 +1187,8 @@ class Model(with_metaclass(ModelMetaClass)):
             'w': fields.pop('w', None),
         }
 
+        reload = fields.pop('reload', None)
+
         # There needs to be something to update.
         if not (field and value) and not fields:
             raise ValueError('No fields have been specified.')
@@ -533,7 +1216,7 @@ class Model(with_metaclass(ModelMetaClass)):
             else:
                 update['$push' if allow_duplicates else '$addToSet'][k] = v
 
-        self._update(update, **write_concern)
+        self._update(update, reload=reload, **write_concern)
 
     def raw_update(self, fields, **kwargs):
         """Perform an update using a raw document.
@@ -556,6 +1239,9 @@ class Model(with_metaclass(ModelMetaClass)):
 
         :param fields: The document to save to the database.
         :type fields: dict.
+        :param reload: (optional) Whether to retrieve the new values
+                       from the database. Defaults to ``Meta.reload``.
+        :type reload: bool.
         :param safe: (optional) **DEPRECATED** Use ``w`` instead.
         :type safe: bool.
         :param w: (optional) The number of servers that must receive the
@@ -563,6 +1249,9 @@ class Model(with_metaclass(ModelMetaClass)):
         :type w: int.
         :raises: :class:`TypeError`
 
+        .. versionchanged:: 0.8.0
+           Added ``reload``
+
         """
 
         write_concern = {
@@ -570,7 +1259,9 @@ class Model(with_metaclass(ModelMetaClass)):
             'w': kwargs.pop('w', None),
         }
 
-        self._update(fields, **write_concern)
+        reload = kwargs.pop('reload', None)
+
+        self._update(fields, reload=reload, **write_concern)
 
     def remove_fields(self, fields, **kwargs):
         """Remove the specified fields from the document.
@@ -643,6 +1334,9 @@ class Model(with_metaclass(ModelMetaClass)):
         :type field_from: str.
         :param field_to: (optional) New name for ``field_from``.
         :type field_to: int.
+        :param reload: (optional) Whether to retrieve the new values
+                       from the database. Defaults to ``Meta.reload``.
+        :type reload: bool.
         :param safe: (optional) **DEPRECATED** Use ``w`` instead.
         :type safe: bool.
         :param w: (optional) The number of servers that must receive the
@@ -653,6 +1347,9 @@ class Model(with_metaclass(ModelMetaClass)):
         :type \*\*fields: \*\*kwargs.
         :raises: :class:`TypeError`, :class:`ValueError`
 
+        .. versionchanged:: 0.8.0
+           Added ``reload``
+
         .. versionadded:: 0.5.0
 
         """
@@ -662,6 +1359,8 @@ class Model(with_metaclass(ModelMetaClass)):
             'w': fields.pop('w', None),
         }
 
+        reload = fields.pop('reload', None)
+
         # There needs to be something to update.
         if not (field_from and field_to) and not fields:
             raise ValueError('No fields have been specified.')
@@ -676,7 +1375,7 @@ class Model(with_metaclass(ModelMetaClass)):
         for k, v in fields.items():
             update[k] = v
 
-        self._update({'$rename': update}, **write_concern)
+        self._update({'$rename': update}, reload=reload, **write_concern)
 
     def save(self, **kwargs):
         """Save the document to the database.
@@ -686,6 +1385,13 @@ class Model(with_metaclass(ModelMetaClass)):
         datetime in UTC. ``modified`` will always be set with the
         current datetime in UTC.
 
+        New documents are saved in their entirety. For documents that
+        have been loaded from or saved to the database, only the fields
+        that have been set or deleted since then are sent to the
+        database, through ``$set`` and ``$unset``. Changes made to a
+        ``list`` or ``dict`` in place are picked up as long as the value
+        was retrieved through the instance.
+
         If the model has the ``required_fields`` options set, a
         :class:`TypeError` will be raised if any of the fields have not
         been associated with the instance.
@@ -697,6 +1403,10 @@ class Model(with_metaclass(ModelMetaClass)):
         :type w: int.
         :raises: :class:`TypeError`
 
+        .. versionchanged:: 0.8.0
+           Only fields that have changed are saved for existing
+           documents
+
         .. versionchanged:: 0.4.0
            ``created`` is always added to inserted documents when
            ``auto_timestamp`` is ``True``
@@ -708,6 +1418,10 @@ class Model(with_metaclass(ModelMetaClass)):
             'w': kwargs.pop('w', None),
         }
 
+        if self._saved:
+            self._save_changes(**write_concern)
+            return
+
         # Use a copy of the internal document so _id can be safely
         # removed.
         fields = self._document.copy()
@@ -738,8 +1452,11 @@ class Model(with_metaclass(ModelMetaClass)):
             if self._meta.auto_timestamp:
                 if 'created' in fields:
                     self._document['created'] = fields['created']
-                if 'modified' in fields:
-                    self._document['modified'] = fields['modified']
+                self._document['modified'] = fields['modified']
+
+            # Everything has been saved.
+            self._changed = None
+            self._saved = True
 
     def save_fields(self, fields, **kwargs):
         """Save the specified fields.
@@ -828,7 +1545,34 @@ class Model(with_metaclass(ModelMetaClass)):
     # Database interaction methods
 
     @classmethod
-    def _find(cls, q=None, find_one=False, **fields):
+    def _check_typed_fields(cls, fields):
+        """Check that fields are of the correct type.
+
+        This method checks the fields that are being saved and makes
+        sure they are of the correct type. If a field isn't of the right
+        type, :class:`TypeError` will be raised.
+
+        :param fields: The document to check.
+        :type fields: dict.
+        :raises: :class:`TypeError`
+
+        .. versionchanged:: 0.8.0
+           Moved out of :meth:`_update` so it can be used elsewhere.
+           Only the keys in ``fields`` are checked.
+
+        .. versionadded:: 0.6.0
+
+        """
+
+        invalid = cls._meta.invalid_field(fields)
+        if invalid is not None:
+            message = ("The '{0}' object cannot be updated because "
+                       "its '{1}' field must be {2}.")
+            message = message.format(cls.__name__, *invalid)
+            raise TypeError(message)
+
+    @classmethod
+    def _find(cls, q=None, find_one=False, projection=None, **fields):
         """Return documents in the database.
 
         This method will find documents in the database matching the
@@ -848,6 +1592,8 @@ class Model(with_metaclass(ModelMetaClass)):
         :param find_one: Whether or not the query should only return one
                          document.
         :type find_one: bool.
+        :param projection: (optional) Names of the fields to retrieve.
+        :type projection: str, list, or tuple.
         :param \*\*fields: Keyword arguments specifying the query.
         :type \*\*fields: \*\*kwargs.
         :returns: :class:`~simon.base.Model` or
@@ -856,6 +1602,11 @@ class Model(with_metaclass(ModelMetaClass)):
         :raises: :class:`~simon.Model.MultipleDocumentsFound`,
                  :class:`~simon.Model.NoDocumentFound`
 
+        .. versionchanged:: 0.8.0
+           Added ``projection``
+           ``find_one`` retrieves the document without counting first
+           ``find_one`` by ``_id`` alone uses ``Meta.cache``
+
         .. versionchanged:: 0.6.0
            ``_id`` can be a type other than :class:`~pymongo.ObjectId`
 
@@ -875,29 +1626,78 @@ class Model(with_metaclass(ModelMetaClass)):
         if '_id' in query and cls._meta.typed_fields['_id'] == ObjectId:
             query['_id'] = guarantee_object_id(query['_id'])
 
-        # Find all of the matching documents.
-        docs = cls._meta.db.find(query)
+        # Documents retrieved by their _id alone may not need to come
+        # from the database. Inside of an identity map, the instance the
+        # document was already loaded into can be returned. Otherwise
+        # the document may be in the model's cache.
+        cache = None
+        if find_one and list(query) == ['_id']:
+            identity_map = get_identity_map()
+            if identity_map is not None:
+                instance = identity_map.get(cls._meta.db, query['_id'])
+                if instance is not None:
+                    return instance
+
+            if not projection:
+                cache = cls._meta.cache
+                if cache is not None:
+                    # The generation has to be checked before the cache
+                    # is so that a write made in between isn't missed.
+                    generation = cache.generation()
+                    document = cache.get(query['_id'])
+                    if document is not None:
+                        return cls._from_db(document)
+
+        if projection:
+            # projection can contain a single item as a string. If it's
+            # not a list or tuple, make it one.
+            if not isinstance(projection, (list, tuple)):
+                projection = (projection,)
+
+            projection = map_fields(cls._meta.field_map,
+                                    dict((k, 1) for k in projection),
+                                    flatten_keys=True)
+
+            # Find all of the matching documents, retrieving only the
+            # requested fields.
+            docs = cls._meta.db.find(query, projection)
+        else:
+            # Find all of the matching documents.
+            docs = cls._meta.db.find(query)
 
         if find_one:
-            count = docs.count()
+            # Two documents are enough to know whether more than one
+            # matches. Retrieving them directly, rather than counting
+            # the matches first, takes only one trip to the database.
+            docs = list(docs.limit(2))
 
             exception = None
-            if not count:
+            if not docs:
                 exception = cls.NoDocumentFound
                 message = "'{0}' matching query does not exist."
                 message = message.format(cls.__name__)
-            elif count > 1:
+            elif len(docs) > 1:
                 exception = cls.MultipleDocumentsFound
+                # Only two documents were retrieved, so the exact number
+                # of matches isn't known.
                 message = ("The query returned more than one '{0}'. It "
-                           "returned {1}! The document spec was: {2}.")
-                message = message.format(cls.__name__, count, fields)
+                           "returned at least {1}! The document spec "
+                           "was: {2}.")
+                message = message.format(cls.__name__, len(docs), fields)
 
             if exception:
                 raise exception(message)
 
-            result = cls(**docs[0])
+            if cache is not None:
+                cache.set(query['_id'], docs[0], generation)
+
+            result = cls._from_db(docs[0], partial=bool(projection))
         else:
             result = QuerySet(docs, cls)
+            # Keep the query and projection around so that they can be
+            # built upon.
+            result._spec = query
+            result._fields = projection or None
 
             if cls._meta.sort:
                 # Apply the default sort for the model.
@@ -905,7 +1705,114 @@ class Model(with_metaclass(ModelMetaClass)):
 
         return result
 
-    def _update(self, fields, upsert=False, use_internal=False, **kwargs):
+    @classmethod
+    def _from_db(cls, document, partial=False):
+        """Return an instance for a document from the database.
+
+        Documents that come from the database already use the document
+        keys, so there's no need to map field names or assign the
+        values one at a time like :meth:`__init__` does. The document
+        itself is used as the instance's internal document rather than
+        a copy of it.
+
+        Inside of an identity map, the instance the document was already
+        loaded into is returned if there is one. New instances are added
+        to the map unless ``partial`` is ``True``.
+
+        :param document: The document.
+        :type document: dict.
+        :param partial: (optional) Whether or not the document is missing
+                        fields left out by a projection.
+        :type partial: bool.
+        :returns: :class:`~simon.Model` -- the instance.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        identity_map = get_identity_map()
+        if identity_map is not None:
+            obj = identity_map.get(cls._meta.db, document.get('_id'))
+            if obj is not None:
+                return obj
+
+        obj = cls.__new__(cls)
+        # Going through __setattr__() isn't necessary for _document.
+        object.__setattr__(obj, '_document', document)
+        object.__setattr__(obj, '_changed', None)
+        object.__setattr__(obj, '_saved', True)
+
+        if identity_map is not None and not partial:
+            identity_map.add(cls._meta.db, obj)
+
+        return obj
+
+    def _save_changes(self, **kwargs):
+        """Save the fields that have changed.
+
+        Each key that has been set or removed since the document was
+        loaded or last saved is sent through ``$set`` if it is still in
+        the internal document and ``$unset`` if it isn't. Keys nested
+        within other changed keys are covered by their parents.
+
+        :param \*\*kwargs: The write concern settings.
+        :type \*\*kwargs: \*\*kwargs.
+        :raises: :class:`TypeError`
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        changed = set(self._changed or ())
+        changed.discard('_id')
+
+        if self._meta.auto_timestamp:
+            changed.add('modified')
+
+        # MongoDB won't update a key and one of its nested keys at the
+        # same time. The parent's value contains the nested change.
+        changed = [k for k in changed if not any(
+            k.startswith(''.join((p, '.'))) for p in changed)]
+
+        if not changed:
+            # Nothing has changed.
+            return
+
+        # The values in $set come from the internal document, so
+        # modified needs to be there before deciding between $set and
+        # $unset. Keep the original value around so that it can be
+        # restored if _update() raises an exception.
+        if self._meta.auto_timestamp:
+            original = self._document.get('modified', _missing)
+            self._document['modified'] = current_datetime()
+
+        update = defaultdict(dict)
+        for k in changed:
+            try:
+                get_nested_key(self._document, k)
+            except KeyError:
+                update['$unset'][k] = 1
+            else:
+                update['$set'][k] = 1
+
+        try:
+            self._update(dict(update), use_internal=True, **kwargs)
+        except:
+            if self._meta.auto_timestamp:
+                if original is _missing:
+                    del self._document['modified']
+                else:
+                    self._document['modified'] = original
+
+            # Raise the exception that was caught
+            e = sys.exc_info()
+            reraise(e[0], e[1], e[2])
+
+        # Everything has been saved.
+        self._changed = None
+
+    def _update(self, fields, upsert=False, use_internal=False, reload=None,
+                **kwargs):
         """Update documents in the database.
 
         There are a few actions that need to be done in conjunction with
@@ -919,6 +1826,15 @@ class Model(with_metaclass(ModelMetaClass)):
         - atomic updates that go directly to the database also update
           the instance
 
+        The effects of ``$set``, ``$unset``, and ``$rename`` are applied
+        to the instance directly. The new values of fields changed by
+        other operators, such as ``$inc`` and ``$push``, depend on what
+        is in the database. When ``reload`` is ``True``, the update is
+        performed with ``findAndModify`` so that the new values come
+        back in the same trip to the database. When it is ``False``, the
+        new values are computed from the values associated with the
+        instance.
+
         This method currently supports the following optional settings:
 
         ======== =======================================================
@@ -938,10 +1854,17 @@ class Model(with_metaclass(ModelMetaClass)):
         :param use_internal: (optional) Whether or not to use the values
                              in the internal document.
         :type use_internal: bool.
+        :param reload: (optional) Whether to retrieve the new values
+                       from the database. Defaults to ``Meta.reload``.
+        :type reload: bool.
         :param \*\*kwargs: The optional settings.
         :type \*\*kwargs: \*\*kwargs.
         :raises: :class:`AttributeError`, :class:`TypeError`
 
+        .. versionchanged:: 0.8.0
+           Atomic updates no longer require a second trip to the database
+           Added ``reload``
+
         .. versionchanged:: 0.6.0
            ``typed_fields`` is enforced
            ``_id`` can be a type other than :class:`~pymongo.ObjectId`
@@ -954,47 +1877,7 @@ class Model(with_metaclass(ModelMetaClass)):
         # Save characters
         cls = self.__class__
 
-        def check_typed_fields(fields):
-            """Check that fields are of the correct type.
-
-            This function checks the fields that are being saved and
-            makes sure they are of the correct type. If a field isn't
-            of the right type, :class:`TypeError` will be raised.
-
-            :param fields: The document to check.
-            :type fields: dict.
-            :raises: :class:`TypeError`
-
-            .. versionadded:: 0.6.0
-
-            """
-
-            for k, v in cls._meta.typed_fields.items():
-                if v is None:
-                    # None means the field can be any type. This will
-                    # probably be used most often with _id.
-                    continue
-
-                try:
-                    value = get_nested_key(fields, k)
-                except KeyError:
-                    # Nothing to see here
-                    continue
-
-                if isinstance(v, list):
-                    if all(isinstance(x, v[0]) for x in value):
-                        # All values in the list are of the right type.
-                        continue
-                elif isinstance(value, v):
-                    # The value is of the right type.
-                    continue
-
-                message = ("The '{0}' object cannot be updated because "
-                           "its '{1}' field must be {2}.")
-                message = message.format(cls.__name__, k, v)
-                raise TypeError(message)
-
-        def map_field_names_and_values(fields):
+        def map_field_names_and_values(fields, use_internal=use_internal):
             """Map field names and values.
 
             This function will take care of mapping the keys of
@@ -1008,8 +1891,14 @@ class Model(with_metaclass(ModelMetaClass)):
 
             :param fields: The document containing keys to map.
             :type fields: dict.
+            :param use_internal: (optional) Whether or not to use the
+                                 values in the internal document.
+            :type use_internal: bool.
             :raises: :class:`AttributeError`
 
+            .. versionchanged:: 0.8.0
+               Added ``use_internal``
+
             .. versionadded:: 0.3.0
 
             """
@@ -1047,12 +1936,12 @@ class Model(with_metaclass(ModelMetaClass)):
         # Map all the field names and values
         if is_atomic(fields):
             for k, v in fields.items():
-                fields[k] = map_field_names_and_values(v)
+                # Removed fields aren't in the internal document.
+                fields[k] = map_field_names_and_values(
+                    v, use_internal=use_internal and k != '$unset')
                 if k == '$rename':
                     for field_from, field_to in fields[k].items():
-                        mapped = map_fields(cls._meta.field_map, {field_to: 1},
-                                            flatten_keys=True)
-                        fields[k][field_from] = get_next(iterkeys(mapped))()
+                        fields[k][field_from] = cls._meta.map_key(field_to)
         else:
             fields = map_field_names_and_values(fields)
         # When placing fields in kwargs, make a copy so changes to
@@ -1060,7 +1949,8 @@ class Model(with_metaclass(ModelMetaClass)):
         kwargs['document'] = fields.copy()
 
         # Enforce the required fields
-        if self._meta.required_fields:
+        required = self._meta.required
+        if required:
             has_required_fields = True
 
             if is_atomic(fields):
@@ -1068,17 +1958,15 @@ class Model(with_metaclass(ModelMetaClass)):
                 # being removed, make sure that none of the required
                 # fields are being removed.
                 if '$unset' in fields:
-                    if any(k in self._meta.required_fields for k
-                            in fields['$unset']):
+                    if not required.isdisjoint(fields['$unset']):
                         has_required_fields = False
                 elif '$rename' in fields:
-                    if any(k in self._meta.required_fields for k
-                            in fields['$rename']):
+                    if not required.isdisjoint(fields['$rename']):
                         has_required_fields = False
             else:
                 # For a document replacement, all of the required fields
                 # must appear in the update.
-                if any(k not in fields for k in self._meta.required_fields):
+                if not required.issubset(fields):
                     has_required_fields = False
 
             if not has_required_fields:
@@ -1109,80 +1997,122 @@ class Model(with_metaclass(ModelMetaClass)):
                     elif k != '$unset':
                         # Fields don't need to be checked if they're
                         # being removed.
-                        check_typed_fields(v)
+                        cls._check_typed_fields(v)
             else:
-                check_typed_fields(fields)
+                cls._check_typed_fields(fields)
 
         # Handling the write concern argument has been pushed off to
         # another method that is aware of what PyMongo supports.
         set_write_concern(kwargs, self._meta.write_concern)
 
+        # Only one instance of a document should be in the identity map.
+        # Any other one is out of date once this one has been written.
+        identity_map = get_identity_map()
+        if identity_map is not None and id:
+            other = identity_map.get(cls._meta.db, id)
+            if other is not None and other is not self:
+                identity_map.remove(cls._meta.db, id)
+
+        # Inside of a session, the write is queued so that it can be
+        # sent to the database along with the others when the session
+        # ends. Models using write-behind always queue their writes.
+        session = get_session()
+        if session is None and cls._meta.write_behind:
+            session = cls._meta.write_behind
+
         # Which function are we calling?
         if not id:
             # PyMongo's insert() method calls the argument doc_or_docs
             # instead of document.
             kwargs['doc_or_docs'] = kwargs.pop('document')
             f = cls._meta.db.insert
+            if session is not None:
+                # The insert won't happen right away, so the _id needs
+                # to be assigned now.
+                kwargs['doc_or_docs']['_id'] = ObjectId()
+                f = partial(session.insert, cls._meta.db)
         else:
             if cls._meta.typed_fields['_id'] != ObjectId:
                 # In order to handle inserting documents with custom
                 # values for _id an upsert is needed.
                 kwargs['upsert'] = True
             f = cls._meta.db.update
+            if session is not None:
+                f = partial(session.update, cls._meta.db)
 
-        result = f(**kwargs)
+        if not id or use_internal or not is_atomic(fields):
+            # The instance already has the values that were saved.
+            result = f(**kwargs)
 
-        if not id:
-            # insert() will return the _id
-            self._document['_id'] = result
+            _invalidate_when_sent(session, cls, id)
+
+            if not id:
+                # insert() will return the _id
+                self._document['_id'] = result
+
+                if identity_map is not None:
+                    identity_map.add(cls._meta.db, self)
+
+            return
+
+        if session is not None:
+            # The new values can't be retrieved until the update has
+            # been sent.
+            reload = False
+        elif reload is None:
+            reload = cls._meta.reload
+
+        # The fields whose new values depend on what is in the database
+        # need to be retrieved when reloading.
+        reloaded = {}
+        if reload:
+            for k, v in fields.items():
+                if k == '$rename':
+                    # The values being renamed may not be associated with
+                    # the instance.
+                    reloaded.update((new, 1) for old, new in v.items()
+                                    if not _has_key(self._document, old))
+                elif k not in ('$set', '$unset'):
+                    reloaded.update((x, 1) for x in v)
+
+        if reloaded:
+            # Perform the update and retrieve the new values in a single
+            # trip to the database.
+            doc = cls._meta.db.find_and_modify(
+                kwargs['spec'], kwargs['document'],
+                upsert=kwargs.get('upsert', False), new=True, fields=reloaded)
+        else:
+            f(**kwargs)
+
+        _invalidate_when_sent(session, cls, id)
 
         # For atomic updates, make sure the updates find their way back
         # to the internal document.
-        if not use_internal and is_atomic(fields):
-            # After updating the document in the database, the instance
-            # needs to be updated as well. Depending on the size of the
-            # document, it may be time consuming to reload the entire
-            # thing. Fortunately there is a way to just load the fields
-            # that have been updated. Build a dictionary containing the
-            # keys of the fields that need to be reloaded and retrieve
-            # them from the database. Then apply the new values to the
-            # instance's internal document.
-
-            unset = fields.pop('$unset', None)
-            if unset:
-                # The fields also need to be removed from the object
-                for k, v in unset.items():
-                    if '.' in k:
-                        # If the key contains a ., it is pointing to an
-                        # embedded document, so remove the nested key
-                        # from the dictionary; there is no attribute to
-                        # remove from the instance.
-                        self._document = remove_nested_key(self._document, k)
-                    else:
-                        self._document.pop(k, None)
-
-            rename = fields.get('$rename')
-            if rename:
-                # The old fields need to be removed. The new fields will
-                # be added through the find_one() below.
-                for k in rename:
-                    if '.' in k:
-                        self._document = remove_nested_key(self._document, k)
-                    else:
-                        self._document.pop(k, None)
-                fields['$rename'] = dict((v, 1) for v in itervalues(rename))
-
-            # If the only operation was an $unset, we're done.
-            if not fields:
-                return
-
-            fields = dict((k, 1) for v in itervalues(fields) for k in v)
-            doc = self._meta.db.find_one({'_id': id}, fields)
-
-            # There's no need to update the _id
-            doc.pop('_id', None)
-
-            self._document = update_nested_keys(self._document, doc)
+        for k, v in fields.items():
+            if k == '$set':
+                for key, value in v.items():
+                    set_nested_key(self._document, key, value)
+            elif k == '$unset':
+                for key in v:
+                    _remove_value(self._document, key)
+            elif k == '$rename':
+                for old, new in v.items():
+                    if _has_key(self._document, old):
+                        value = get_nested_key(self._document, old)
+                        _remove_value(self._document, old)
+                        set_nested_key(self._document, new, value)
+            elif not reload:
+                _apply_operator(self._document, k, v)
+
+        if reloaded and doc:
+            for key in reloaded:
+                try:
+                    value = get_nested_key(doc, key)
+                except KeyError:
+                    # The field doesn't exist in the database.
+                    _remove_value(self._document, key)
+                else:
+                    set_nested_key(self._document, key, value)
 
     # String representation methods
 
@@ -1207,6 +2137,7 @@ class Model(with_metaclass(ModelMetaClass)):
         key = self._meta.field_map.get(name, name)
         if key in self._document:
             del self._document[key]
+            _mark_changed(self, key)
 
             # The deletion of the attribute is now complete, get out
             # before an AttributeError is raised by the super delete.
@@ -1220,25 +2151,21 @@ class Model(with_metaclass(ModelMetaClass)):
         # The first thing to look for is nested keys
         if '__' in name or '.' in name:
             if '__' in name:
-                # map_fields() requires a dict, so make a simple one and
-                # then capture the first (only) key in the resulting
-                # dict.
-                mapped_name = map_fields(self.__class__._meta.field_map,
-                                         {name: 1}, flatten_keys=True)
-                mapped_name = get_next(iterkeys(mapped_name))()
+                mapped_name = self._meta.map_key(name)
             else:
                 mapped_name = name
 
             with ignored(AttributeError):
                 # If not, give it a go the normal way.
-                return get_nested_key(self._document, mapped_name)
+                value = get_nested_key(self._document, mapped_name)
+                return self._track_mutable(mapped_name, value)
 
         # If the attribute is a key in the document, use it.
         name = self._meta.field_map.get(name, name)
         if not name in self._document:
             message = "'{0}' object has no attribute '{1}'."
             raise AttributeError(message.format(self.__class__.__name__, name))
-        return self._document[name]
+        return self._track_mutable(name, self._document[name])
 
     def __setattr__(self, name, value):
         """Set a document value."""
@@ -1248,30 +2175,67 @@ class Model(with_metaclass(ModelMetaClass)):
             raise AttributeError(
                 "The '{0}' attribute cannot be overwritten.".format(name))
 
-        if name in self._meta.core_attributes:
+        meta = self._meta
+        if name in meta.fields or name in meta.core_attributes:
             # Set the attribute on the object. Trying to do this with a
-            # simple assignment would result in recursion error.
+            # simple assignment would result in recursion error. For
+            # declared fields, this is where the _Field takes over.
             object.__setattr__(self, name, value)
         else:
-            # Set the attribute in the internal document.
-
-            # map_fields() requires a dict, so make a simple one and
-            # then capture the first (only) key in the resulting
-            # dict.
-            mapped_name = map_fields(self.__class__._meta.field_map, {name: 1},
-                                     flatten_keys=True)
-            mapped_name = get_next(iterkeys(mapped_name))()
-
-            # Build a dictionary that can be applied to the internal
-            # document dictionary with update_nested_keys().  Do this
-            # by iterating through the fields in mapped_name from right
-            # to left.
-            keys = mapped_name.split('.')
-            keys.reverse()
-            for x in keys:
-                value = {x: value}
-
-            self._document = update_nested_keys(self._document, value)
+            self._set_attribute(name, value)
+
+    def _set_attribute(self, name, value):
+        """Set a document value by its attribute name.
+
+        A ``dict`` is merged into the existing value when it is also a
+        ``dict`` rather than replacing it.
+
+        :param name: The attribute name, using ``__`` or ``.`` for
+                     nested keys.
+        :type name: str.
+        :param value: The value.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        mapped_name = self._meta.map_key(name)
+
+        if isinstance(value, dict):
+            try:
+                current = get_nested_key(self._document, mapped_name)
+            except KeyError:
+                current = None
+            if not isinstance(current, dict):
+                current = {}
+
+            # Even without an existing value, the dict is merged into a
+            # new one, the way documents have always been assigned.
+            value = update_nested_keys(current, value)
+
+        set_nested_key(self._document, mapped_name, value)
+        _mark_changed(self, mapped_name)
+
+    def _track_mutable(self, key, value):
+        """Return a value from the document, tracking it if mutable.
+
+        A ``list`` or ``dict`` can be changed in place once it has been
+        retrieved, without going through :meth:`__setattr__`. Rather
+        than risk not saving those changes, the key is treated as
+        changed.
+
+        :param key: The key of the value in the document.
+        :type key: str.
+        :param value: The value.
+        :returns: The value.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        if isinstance(value, (dict, list)):
+            _mark_changed(self, key)
+        return value
 
     # Rich comparison methods
 
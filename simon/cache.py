@@ -0,0 +1,507 @@
+"""Cache documents and query results
+
+.. versionadded:: 0.8.0
+"""
+
+import copy
+import threading
+import time
+
+__all__ = ('DocumentCache', 'QueryCache', 'get_query_cache', 'query_key')
+
+# The positions of the fields in each link of the cache's linked list.
+PREV, NEXT, KEY, EXPIRES, SIZE, VALUE = 0, 1, 2, 3, 4, 5
+
+# The query cache shared by models whose Meta.query_cache is True.
+_query_cache = None
+_shared_lock = threading.Lock()
+
+
+class _Cache(object):
+
+    """A least recently used cache with an optional time to live.
+
+    Each value has a size, and the total size of the values is kept
+    under ``max_size``. When another value is added, the ones that were
+    used least recently are evicted to make room for it.
+
+    Values are copied going in and coming out of the cache, so changes
+    made to them elsewhere don't find their way into it.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._root = []
+        self._reset()
+
+        self._lock = threading.Lock()
+
+    def clear(self):
+        """Remove everything from the cache."""
+
+        with self._lock:
+            self._reset()
+
+    def stats(self):
+        """Return the statistics for the cache.
+
+        :returns: dict -- ``hits``, ``misses``, ``evictions``, and the
+                  ``size`` of the cache.
+
+        """
+
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': self._size,
+            }
+
+    def _append(self, link):
+        """Add a link to the end of the list.
+
+        :param link: The link.
+        :type link: list.
+
+        """
+
+        last = self._root[PREV]
+        link[PREV] = last
+        link[NEXT] = self._root
+        last[NEXT] = self._root[PREV] = link
+        self._links[link[KEY]] = link
+        self._size += link[SIZE]
+
+    def _current_generation(self, key):
+        """Return the generation that a value for a key belongs to.
+
+        The lock must be held.
+
+        :param key: The key.
+        :returns: int -- the generation.
+
+        """
+
+        return 0
+
+    def _get(self, key):
+        """Return the value stored under a key.
+
+        :param key: The key.
+        :returns: a copy of the value, or ``None`` if it isn't in the
+                  cache.
+
+        """
+
+        if not _hashable(key):
+            return None
+
+        with self._lock:
+            link = self._links.get(key)
+            if link is None:
+                self.misses += 1
+                return None
+
+            if link[EXPIRES] is not None and link[EXPIRES] <= time.time():
+                # The value has been in the cache for too long.
+                self._unlink(link)
+                self.misses += 1
+                return None
+
+            # Mark the value as the most recently used.
+            self._unlink(link)
+            self._append(link)
+
+            self.hits += 1
+            value = link[VALUE]
+
+        return copy.deepcopy(value)
+
+    def _remove(self, key):
+        """Remove the value stored under a key.
+
+        :param key: The key.
+
+        """
+
+        if not _hashable(key):
+            return
+
+        with self._lock:
+            link = self._links.get(key)
+            if link is not None:
+                self._unlink(link)
+
+    def _reset(self):
+        """Empty the cache."""
+
+        # The values are kept in a circular doubly linked list in the
+        # order they were used, with the least recently used one right
+        # after the root. _links provides access to them by key.
+        self._root[:] = [self._root, self._root, None, None, 0, None]
+        self._links = {}
+        self._size = 0
+
+    def _set(self, key, value, size, generation=None):
+        """Store a value under a key.
+
+        Values larger than the whole cache aren't stored. Neither are
+        values read during an earlier generation than the current one.
+
+        :param key: The key.
+        :param value: The value.
+        :param size: The size of the value.
+        :type size: int.
+        :param generation: (optional) The generation when the value was
+                           read.
+        :type generation: int.
+
+        """
+
+        if not _hashable(key) or size > self.max_size:
+            return
+
+        if self.ttl is None:
+            expires = None
+        else:
+            expires = time.time() + self.ttl
+
+        value = copy.deepcopy(value)
+
+        with self._lock:
+            # Checking the generation under the lock keeps the value
+            # from being stored after a write that started in between.
+            if (generation is not None and
+                    generation != self._current_generation(key)):
+                return
+
+            link = self._links.get(key)
+            if link is not None:
+                self._unlink(link)
+            self._append([None, None, key, expires, size, value])
+
+            while self._size > self.max_size:
+                self._unlink(self._root[NEXT])
+                self.evictions += 1
+
+    def _unlink(self, link):
+        """Remove a link from the list.
+
+        :param link: The link.
+        :type link: list.
+
+        """
+
+        link[PREV][NEXT] = link[NEXT]
+        link[NEXT][PREV] = link[PREV]
+        del self._links[link[KEY]]
+        self._size -= link[SIZE]
+
+    def __len__(self):
+        return len(self._links)
+
+
+class DocumentCache(_Cache):
+
+    """A least recently used cache of documents, by ``_id``.
+
+    At most ``max_size`` documents are held. When another is added, the
+    one that was used least recently is evicted. When ``ttl`` is set,
+    documents are only used for that many seconds after being added.
+
+    Documents are copied going in and coming out of the cache, so
+    changes made to instances don't find their way into it.
+
+    Each call to :meth:`remove` or :meth:`clear` starts a new
+    generation. A document that was read during an earlier generation
+    is not added.
+
+    The number of hits, misses, and evictions are kept in ``hits``,
+    ``misses``, and ``evictions``. :meth:`stats` returns all of them.
+
+    :param max_size: (optional) The largest number of documents to hold.
+    :type max_size: int.
+    :param ttl: (optional) The number of seconds to hold each document.
+    :type ttl: float.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    def __init__(self, max_size=1000, ttl=None):
+        super(DocumentCache, self).__init__(max_size, ttl)
+
+        self._generation = 0
+
+    def clear(self):
+        """Remove everything from the cache."""
+
+        with self._lock:
+            self._generation += 1
+            self._reset()
+
+    def generation(self):
+        """Return the current generation of the cache.
+
+        :returns: int -- the generation.
+
+        """
+
+        return self._generation
+
+    def get(self, id):
+        """Return the document with an ``_id``.
+
+        :param id: The ``_id`` of the document.
+        :returns: dict -- a copy of the document, or ``None`` if it
+                  isn't in the cache.
+
+        """
+
+        return self._get(id)
+
+    def remove(self, id):
+        """Remove the document with an ``_id`` from the cache.
+
+        :param id: The ``_id`` of the document.
+
+        """
+
+        # The generation changes first so that a document read before
+        # the write can't be added back once it has been removed.
+        with self._lock:
+            self._generation += 1
+
+        self._remove(id)
+
+    def set(self, id, document, generation=None):
+        """Add a document to the cache.
+
+        :param id: The ``_id`` of the document.
+        :param document: The document.
+        :type document: dict.
+        :param generation: (optional) The generation of the cache when
+                           the document was read.
+        :type generation: int.
+
+        """
+
+        self._set(id, document, 1, generation)
+
+    def _current_generation(self, key):
+        return self._generation
+
+
+class QueryCache(_Cache):
+
+    """A least recently used cache of query results.
+
+    Results are stored under the collection they came from and a key
+    describing the query (see :func:`query_key`). The size of each
+    result is the number of documents in it, and at most ``max_size``
+    documents are held across all of the results. When ``ttl`` is set,
+    results are only used for that many seconds after being added.
+
+    :meth:`invalidate` removes all of the results for a collection. It
+    is called whenever a model writes to the collection. Each call
+    starts a new generation for the collection. A result that was read
+    during an earlier generation is not added.
+
+    :param max_size: (optional) The largest number of documents to hold.
+    :type max_size: int.
+    :param ttl: (optional) The number of seconds to hold each result.
+    :type ttl: float.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    def __init__(self, max_size=10000, ttl=None):
+        super(QueryCache, self).__init__(max_size, ttl)
+
+        self._generations = {}
+
+    def get(self, collection, key):
+        """Return the documents matched by a query.
+
+        :param collection: The full name of the collection.
+        :type collection: str.
+        :param key: The key of the query.
+        :type key: tuple.
+        :returns: list -- copies of the documents, or ``None`` if the
+                  result isn't in the cache.
+
+        """
+
+        return self._get((collection, key))
+
+    def generation(self, collection):
+        """Return the current generation of a collection.
+
+        :param collection: The full name of the collection.
+        :type collection: str.
+        :returns: int -- the generation.
+
+        """
+
+        return self._generations.get(collection, 0)
+
+    def invalidate(self, collection):
+        """Remove all of the results for a collection.
+
+        :param collection: The full name of the collection.
+        :type collection: str.
+
+        """
+
+        with self._lock:
+            self._generations[collection] = self.generation(collection) + 1
+            for key in list(self._collections.get(collection, ())):
+                self._unlink(self._links[key])
+
+    def set(self, collection, key, documents, generation=None):
+        """Add the documents matched by a query to the cache.
+
+        :param collection: The full name of the collection.
+        :type collection: str.
+        :param key: The key of the query.
+        :type key: tuple.
+        :param documents: The documents.
+        :type documents: list.
+        :param generation: (optional) The generation of the collection
+                           when the query was started.
+        :type generation: int.
+
+        """
+
+        # Empty results still take up room in the cache. The documents
+        # aren't added if the collection has been written to since they
+        # were read.
+        self._set((collection, key), documents, max(len(documents), 1),
+                  generation)
+
+    def _current_generation(self, key):
+        return self.generation(key[0])
+
+    def _append(self, link):
+        super(QueryCache, self)._append(link)
+
+        collection = link[KEY][0]
+        self._collections.setdefault(collection, set()).add(link[KEY])
+
+    def _reset(self):
+        super(QueryCache, self)._reset()
+
+        # The keys of the results for each collection.
+        self._collections = {}
+
+    def _unlink(self, link):
+        super(QueryCache, self)._unlink(link)
+
+        collection = link[KEY][0]
+        keys = self._collections[collection]
+        keys.discard(link[KEY])
+        if not keys:
+            del self._collections[collection]
+
+
+def get_query_cache():
+    """Return the query cache shared by models.
+
+    The cache is created the first time it's needed. It is used by
+    models whose ``Meta.query_cache`` is ``True``.
+
+    :returns: :class:`QueryCache` -- the cache.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    global _query_cache
+
+    if _query_cache is None:
+        with _shared_lock:
+            if _query_cache is None:
+                _query_cache = QueryCache()
+    return _query_cache
+
+
+def query_key(spec, sorting=None, skip=0, limit=0, fields=None):
+    """Return the key to cache the results of a query under.
+
+    The key is built from a canonical form of the query so that
+    equivalent queries share results no matter what order the keys of
+    their documents were added in.
+
+    :param spec: The query.
+    :type spec: dict.
+    :param sorting: (optional) The sort, as (field, direction) pairs.
+    :type sorting: list.
+    :param skip: (optional) The number of documents skipped.
+    :type skip: int.
+    :param limit: (optional) The largest number of documents returned.
+    :type limit: int.
+    :param fields: (optional) The projection.
+    :type fields: dict.
+    :returns: tuple -- the key, or ``None`` if the query can't be
+              cached.
+
+    """
+
+    try:
+        key = (_freeze(spec or {}), _freeze(sorting or []), skip, limit,
+               _freeze(fields or {}))
+    except TypeError:
+        # Something in the query can't be hashed or ordered.
+        return None
+
+    if not _hashable(key):
+        return None
+
+    return key
+
+
+def _freeze(value):
+    """Return a hashable, canonical form of a value.
+
+    :param value: The value.
+    :returns: the canonical form.
+    :raises: :class:`TypeError`
+
+    """
+
+    if isinstance(value, dict):
+        # Tag the items so that a document can't collide with a list
+        # of pairs.
+        return ('dict', tuple(sorted((k, _freeze(v))
+                                     for k, v in value.items())))
+    if isinstance(value, (list, tuple)):
+        return ('list', tuple(_freeze(v) for v in value))
+    # Values that compare equal can still match different documents,
+    # such as True and 1, so they're tagged with their types too.
+    return (type(value).__name__, value)
+
+
+def _hashable(key):
+    """Return whether a value can be used as a key.
+
+    :param key: The value.
+    :returns: bool -- ``True`` if ``key`` is hashable.
+
+    """
+
+    try:
+        hash(key)
+    except TypeError:
+        return False
+    return True
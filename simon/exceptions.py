@@ -20,3 +20,17 @@ class MultipleDocumentsFound(Exception):
 class NoDocumentFound(Exception):
 
     """Raised when an object matching a query is not found."""
+
+
+class FlushError(Exception):
+
+    """Raised when writes queued in a session fail.
+
+    ``errors`` contains a ``dict`` for each failed operation, with the
+    ``index`` of the operation in the session, the ``operation``
+    itself, and the ``message`` and ``code`` reported by the database.
+    """
+
+    def __init__(self, message, errors=None):
+        super(FlushError, self).__init__(message)
+        self.errors = errors or []
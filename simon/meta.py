@@ -6,9 +6,11 @@ import warnings
 
 from bson import ObjectId
 
-from ._compat import iterkeys, itervalues
+from ._compat import iteritems, iterkeys, itervalues
+from .cache import DocumentCache, QueryCache, get_query_cache
 from .connection import get_database, pymongo_supports_mongoclient
-from .utils import map_fields
+from .sessions import get_write_behind
+from .utils import get_nested_key, map_fields, map_key
 
 __all__ = ('Meta',)
 
@@ -19,17 +21,35 @@ class Meta(object):
 
     _db = None
 
+    # The names of the fields given a descriptor by ModelMetaClass.
+    fields = frozenset()
+
+    # The translations of attribute names to document keys, along with
+    # the name looked up in field_map and what it held at the time.
+    _keys = None
+
+    # The compiled required_fields and typed_fields, and the options
+    # they were compiled from.
+    _required = None
+    _typed = None
+    _validated = None
+
     def __init__(self, meta):
         self.meta = meta
 
         # Set all the default option values.
         self.auto_timestamp = True
+        self.cache = None
+        self.counters = None
         self.database = 'default'
         self.field_map = {}
         self.map_id = True
+        self.query_cache = None
+        self.reload = True
         self.required_fields = None
         self.sort = None
         self.typed_fields = {}
+        self.write_behind = False
 
         if pymongo_supports_mongoclient:
             self.write_concern = 1
@@ -53,9 +73,10 @@ class Meta(object):
                     del meta_attrs[name]
 
             # Add the known attributes to the instance
-            for name in ('auto_timestamp', 'collection', 'database',
-                         'field_map', 'map_id', 'required_fields', 'sort',
-                         'typed_fields'):
+            for name in ('auto_timestamp', 'cache', 'collection',
+                         'counters', 'database', 'field_map', 'map_id',
+                         'query_cache', 'reload', 'required_fields',
+                         'sort', 'typed_fields', 'write_behind'):
                 if name in meta_attrs:
                     setattr(self, name, meta_attrs.pop(name))
 
@@ -88,8 +109,11 @@ class Meta(object):
         # Get the list of the attributes associated with the class.
         # These will make up the list of reserved words that cannot be
         # used for keys.
-        self.core_attributes = tuple(chain(iterkeys(cls.__dict__),
-                                          ('_document',)))
+        # __dict__ is only here for the first class that adds it, so
+        # it's left out to keep subclasses the same.
+        self.core_attributes = tuple(chain(
+            (k for k in iterkeys(cls.__dict__) if k != '__dict__'),
+            ('_changed', '_document', '_saved')))
 
         # field_map must be a valid mapping
         if not isinstance(self.field_map, Mapping):
@@ -99,6 +123,10 @@ class Meta(object):
             # If map_id is True and id isn't in field_map, add it.
             self.field_map['id'] = '_id'
 
+        # Translate the names in field_map ahead of time.
+        for name in list(self.field_map):
+            self.map_key(name)
+
         # Any of the methods that check for required fields are looking
         # for something like a list or tuple of fields, not a string
         # of one field. If a single field name has been provided as a
@@ -137,6 +165,155 @@ class Meta(object):
         if '_id' not in self.typed_fields:
             self.typed_fields['_id'] = ObjectId
 
+        # cache can be a cache of its own, a dict of settings for a new
+        # one, or True to use the default settings.
+        if self.cache is True:
+            self.cache = DocumentCache()
+        elif isinstance(self.cache, Mapping):
+            self.cache = DocumentCache(**self.cache)
+
+        # query_cache can be a cache of its own, a dict of settings for
+        # a new one, or True to use the shared one.
+        if self.query_cache is True:
+            self.query_cache = get_query_cache()
+        elif isinstance(self.query_cache, Mapping):
+            self.query_cache = QueryCache(**self.query_cache)
+
+        # write_behind can be a queue of its own or True to use the
+        # shared one.
+        if self.write_behind is True:
+            self.write_behind = get_write_behind()
+
+        # Compile the checks for required_fields and typed_fields now
+        # rather than each time a document is written.
+        self._compile_validators()
+
+    def map_key(self, name):
+        """Return the document key for an attribute name.
+
+        This is the same as :func:`~simon.utils.map_key` using the
+        ``field_map``, but the translation of each name is kept. The
+        ``field_map`` is still checked every time, so changes made to
+        it, including those made in place, are picked up right away.
+
+        :param name: The attribute name, using ``__`` or ``.`` for
+                     nested keys.
+        :type name: str.
+        :returns: str -- the document key, using ``.`` for nested keys.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        if self._keys is None:
+            self._keys = {}
+
+        try:
+            lookup, mapped, key = self._keys[name]
+        except KeyError:
+            pass
+        else:
+            if self.field_map.get(lookup, name) == mapped:
+                return key
+
+        key = map_key(self.field_map, name)
+        if len(self._keys) < 10000:
+            lookup = name.replace('__', '.')
+            self._keys[name] = lookup, self.field_map.get(lookup, name), key
+        return key
+
+    def invalid_field(self, fields):
+        """Return the first field in a document with the wrong type.
+
+        Only the keys in ``fields`` are looked at, so the cost depends
+        on the size of the document rather than on ``typed_fields``.
+
+        :param fields: The document to check, with either nested
+                       documents or ``.`` for nested keys.
+        :type fields: dict.
+        :returns: tuple -- the key and the type it must be, or ``None``
+                  if all of the fields are of the right type.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        self._compile_validators()
+
+        typed, nested = self._typed
+        if not typed:
+            return None
+
+        for key, value in iteritems(fields):
+            check = typed.get(key)
+            if check is not None and not check(value):
+                return key, self.typed_fields[key]
+
+            # Typed fields can be inside a nested document.
+            if key in nested and isinstance(value, Mapping):
+                for path, name in nested[key]:
+                    try:
+                        inner = get_nested_key(value, path)
+                    except KeyError:
+                        continue
+                    if not typed[name](inner):
+                        return name, self.typed_fields[name]
+
+        return None
+
+    @property
+    def required(self):
+        """Return the ``required_fields`` as a ``frozenset``.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        self._compile_validators()
+
+        return self._required
+
+    def _compile_validators(self):
+        """Prepare ``required_fields`` and ``typed_fields`` for use.
+
+        The work is done once, and again only if either option is
+        replaced.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        options = (self.required_fields, self.typed_fields)
+        if (self._validated is not None and
+                self._validated[0] is options[0] and
+                self._validated[1] is options[1]):
+            return
+
+        required = self.required_fields or ()
+        if not isinstance(required, (list, tuple)):
+            required = (required,)
+        self._required = frozenset(required)
+
+        # A check for each typed field, and the typed fields that are
+        # nested inside each key, along with their paths from there.
+        typed = {}
+        nested = {}
+        for name, type_ in iteritems(self.typed_fields):
+            if type_ is None:
+                # None means the field can be any type.
+                continue
+
+            typed[name] = _type_check(type_)
+
+            keys = name.split('.')
+            for i in range(1, len(keys)):
+                prefix = '.'.join(keys[:i])
+                path = '.'.join(keys[i:])
+                nested.setdefault(prefix, []).append((path, name))
+        self._typed = (typed, nested)
+
+        self._validated = options
+
     @property
     def db(self):
         """Return the :class:`~pymongo.collection.Collection`."""
@@ -154,3 +331,22 @@ class Meta(object):
 
     def __unicode__(self):
         return u'{0}.Meta'.format(self.class_name)
+
+
+def _type_check(type_):
+    """Return a function that checks values against a typed field.
+
+    :param type_: The type of the field, or a list containing the type
+                  of its items.
+    :type type_: type or list.
+    :returns: function -- returns ``True`` if a value is of the right
+              type.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    if isinstance(type_, list):
+        item_type = type_[0]
+        return lambda value: all(isinstance(x, item_type) for x in value)
+    return lambda value: isinstance(value, type_)
@@ -1,9 +1,15 @@
 """Query functionality"""
 
+import base64
+import copy
+
+from bson import BSON
 import pymongo
 
-from ._compat import get_next, iterkeys, range
-from .utils import ignored, map_fields
+from ._compat import get_next, iteritems, iterkeys, itervalues, str_types
+from .cache import query_key
+from .sessions import flush_queued, get_identity_map
+from .utils import get_nested_key, map_fields, set_write_concern
 
 __all__ = ('Q', 'QuerySet')
 
@@ -116,7 +122,82 @@ class QuerySet(object):
 
         self._items = []
 
+        # Whether every document has been loaded, either from the cursor
+        # or from the query cache.
+        self._complete = False
+
+        # The skip and limit applied to the cursor through skip() and
+        # limit(). __getitem__() needs them to translate indexes into
+        # new values for the cursor.
+        self._skip = 0
+        self._limit = 0
+
+        # The query and projection used to create the cursor. They're
+        # needed to build new cursors for keyset pagination and
+        # projections.
+        self._spec = None
+        self._fields = None
+
+        # _sorting is the sort waiting to be applied to the cursor.
+        # _ordering is the sort in effect, whether or not it has been
+        # applied yet.
         self._sorting = None
+        self._ordering = None
+
+        # When set through values() or values_list(), _row_factory
+        # turns each document into the row returned in its place.
+        self._row_factory = None
+
+        # When the model has a query cache and the results aren't in
+        # it, the documents are collected as they're loaded so that
+        # they can be added once the cursor runs out.
+        self._cache_key = None
+        self._cache_generation = None
+        self._cache_documents = None
+
+    def after(self, last):
+        """Return the documents that come after ``last``.
+
+        This provides keyset pagination. Rather than skipping over the
+        documents on earlier pages--which requires the database to walk
+        through all of them--the values of the sort fields in ``last``
+        are used to build a query for the documents that follow it.
+        Retrieving a page deep into the results costs the same as
+        retrieving the first one.
+
+        The sort of the :class:`QuerySet` is used to order the
+        documents. ``_id`` is added to the end of the sort, if it isn't
+        already part of it, so that documents with the same values for
+        the sort fields are never skipped or repeated. Any skip or
+        limit applied to the :class:`QuerySet` is not carried over.
+
+        ``last`` can be a document, a :class:`~simon.Model` instance,
+        or a token returned by :meth:`page_by`. :class:`ValueError`
+        will be raised for a token that wasn't created for the same
+        sort.
+
+        :param last: The last document that has been seen.
+        :type last: dict, :class:`~simon.Model`, or str.
+        :returns: :class:`QuerySet` -- the documents after ``last``.
+        :raises: :class:`TypeError`, :class:`ValueError`
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        if not self._cursor:
+            raise TypeError(
+                "The '{0}' has no cursor associated with it.".format(
+                    self.__class__.__name__))
+
+        sorting = self._keyset_sorting()
+
+        if isinstance(last, str_types):
+            values = _decode_token(last, sorting)
+        else:
+            values = _sort_values(last, sorting)
+
+        return self._keyset(sorting, values)
 
     def count(self):
         """Return the number of documents in the :class:`QuerySet`.
@@ -134,6 +215,11 @@ class QuerySet(object):
                 "The '{0}' has no cursor associated with it.".format(
                     self.__class__.__name__))
 
+        # The results may already be in the query cache.
+        if (self._count is None and not self._items and
+                self._cache_documents is None):
+            self._load_cached()
+
         # Store the count interally so that the call doesn't need to
         # be made over and over
         if self._count is None:
@@ -143,6 +229,48 @@ class QuerySet(object):
             self._count = self._cursor.count(with_limit_and_skip=True)
         return self._count
 
+    def delete(self, **kwargs):
+        """Delete all of the documents matched by the :class:`QuerySet`.
+
+        The documents are removed with a single ``remove`` using the
+        query that created the :class:`QuerySet`. Instances that have
+        already been retrieved are not changed. The ``remove`` can't be
+        queued in a session, so any writes queued before it are sent
+        first.
+
+        If no cursor has been associated with the query set, or if it
+        has been limited through :meth:`skip`, :meth:`limit`, or
+        slicing, ``TypeError`` will be raised.
+
+        :param safe: (optional) **DEPRECATED** Use ``w`` instead.
+        :type safe: bool.
+        :param w: (optional) The number of servers that must receive the
+                  update for it to be successful.
+        :type w: int.
+        :returns: int -- the number of documents deleted, or ``None``
+                  when write concern is disabled.
+        :raises: :class:`TypeError`
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        spec = self._write_spec()
+
+        write_concern = {
+            'safe': kwargs.pop('safe', None),
+            'w': kwargs.pop('w', None),
+        }
+
+        self._set_write_concern(write_concern)
+
+        self._flush_queued()
+        result = self._cursor.collection.remove(spec, **write_concern)
+
+        self._clear_cache()
+
+        return result['n'] if result else None
+
     def distinct(self, key):
         """Return distinct values for ``key`` in the :class:`QuerySet`.
 
@@ -161,6 +289,135 @@ class QuerySet(object):
 
         return self._cursor.distinct(key)
 
+    def exclude(self, *fields):
+        """Leave fields out of the documents in the :class:`QuerySet`.
+
+        The fields will not be transferred from the database. Calling
+        ``exclude()`` on a :class:`QuerySet` that already has fields
+        excluded will exclude the new fields as well. Calling it on one
+        that is limited by :meth:`only` will remove the fields from
+        those being retrieved.
+
+        ..
+
+            >>> qs.exclude('comments')
+
+        :param \*fields: Names of the fields to exclude.
+        :type \*fields: \*args.
+        :returns: :class:`QuerySet` -- the documents without the fields.
+        :raises: :class:`TypeError`
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        excluded = self._map_projection(fields, 0)
+
+        projection = dict(self._fields or {})
+        if any(itervalues(projection)):
+            # The projection lists the fields to include, so excluding
+            # a field means no longer including it. _id is the only
+            # field that can be excluded alongside included fields.
+            for k in excluded:
+                if k == '_id':
+                    projection[k] = 0
+                else:
+                    projection.pop(k, None)
+
+            if not any(itervalues(projection)):
+                # Everything that was included has been excluded.
+                # Keep _id so that the projection doesn't turn into an
+                # exclusion of _id.
+                projection['_id'] = 1
+        else:
+            projection.update(excluded)
+
+        return self._project(projection)
+
+    def increment(self, field=None, value=1, **fields):
+        """Perform an atomic increment on all of the documents.
+
+        This works like :meth:`~simon.Model.increment`, but every
+        document matched by the :class:`QuerySet` is updated with a
+        single ``update``.
+
+        If no fields are indicated--either through ``field`` or through
+        ``**fields``, a :class:`ValueError` will be raised.
+
+        :param field: (optional) Name of the field to increment.
+        :type field: str.
+        :param value: (optional) Value to increment ``field`` by.
+        :type value: int.
+        :param safe: (optional) **DEPRECATED** Use ``w`` instead.
+        :type safe: bool.
+        :param w: (optional) The number of servers that must receive the
+                  update for it to be successful.
+        :type w: int.
+        :param \*\*fields: Keyword arguments specifying fields and
+                           increment values.
+        :type \*\*fields: \*\*kwargs.
+        :returns: int -- the number of documents updated, or ``None``
+                  when write concern is disabled.
+        :raises: :class:`TypeError`, :class:`ValueError`
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        write_concern = {
+            'safe': fields.pop('safe', None),
+            'w': fields.pop('w', None),
+        }
+
+        if field is not None:
+            fields[field] = value
+
+        return self._update({'$inc': fields}, **write_concern)
+
+    def iterator(self, batch_size=None):
+        """Iterate through the documents without caching them.
+
+        Iterating over a :class:`QuerySet` directly stores every
+        document in an internal cache so that it can be iterated over
+        again or indexed without going back to the database. When
+        scanning through a large number of documents that will only be
+        used once, that cache can grow to consume a lot of memory.
+
+        ``iterator()`` works on a clone of the cursor and yields each
+        document as it is retrieved, without storing it, so memory usage
+        remains constant regardless of the number of documents. The
+        internal cache of the :class:`QuerySet` is neither used nor
+        filled.
+
+        :param batch_size: (optional) The number of documents to
+                           retrieve from the database with each trip.
+        :type batch_size: int.
+        :returns: generator -- the documents.
+        :raises: :class:`TypeError`.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        if not self._cursor:
+            raise TypeError(
+                "The '{0}' has no cursor associated with it.".format(
+                    self.__class__.__name__))
+
+        # Make sure to clone the cursor so as not to alter the original
+        cursor = self._cursor.clone()
+
+        if self._sorting:
+            # The sort hasn't been applied to the original cursor yet,
+            # so it needs to be applied to the clone.
+            cursor.sort(self._sorting)
+
+        if batch_size:
+            cursor.batch_size(batch_size)
+
+        for item in cursor:
+            yield self._hydrate(item)
+
     def limit(self, limit):
         """Apply a limit to the documents in the :class:`QuerySet`.
 
@@ -172,7 +429,96 @@ class QuerySet(object):
         """
 
         # Make sure to clone the cursor so as not to alter the original
-        return QuerySet(self._cursor.clone().limit(limit), self._cls)
+        qs = self._clone(self._cursor.clone().limit(limit))
+        qs._limit = limit
+
+        return qs
+
+    def only(self, *fields):
+        """Limit the fields in the documents in the :class:`QuerySet`.
+
+        Only the specified fields (and ``_id``) will be transferred from
+        the database. Any fields previously specified through
+        ``only()`` or :meth:`exclude` are replaced.
+
+        ..
+
+            >>> qs.only('name', 'email')
+
+        .. note::
+           Instances loaded this way only contain some of the fields.
+           :meth:`~simon.Model.save` only sends the fields that have
+           changed, so the others are left alone.
+
+        :param \*fields: Names of the fields to include.
+        :type \*fields: \*args.
+        :returns: :class:`QuerySet` -- the documents with only the
+                  fields.
+        :raises: :class:`TypeError`
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        return self._project(self._map_projection(fields, 1))
+
+    def page_by(self, size, token=None):
+        """Return a page of documents and a token for the next page.
+
+        Pages are built through keyset pagination (see :meth:`after`)
+        so every page costs the same to retrieve, no matter how far
+        into the results it is.
+
+        ..
+
+            >>> users, token = User.all().sort('name').page_by(20)
+            >>> users, token = User.all().sort('name').page_by(20, token)
+
+        The token is opaque and should be passed back to
+        :meth:`page_by` (or :meth:`after`) on a :class:`QuerySet` with
+        the same sort. When there are no more pages, ``None`` is
+        returned in place of the token.
+
+        :param size: The number of documents on each page.
+        :type size: int.
+        :param token: (optional) The token from the previous page.
+        :type token: str.
+        :returns: tuple -- the documents on the page and the token for
+                  the next page.
+        :raises: :class:`TypeError`, :class:`ValueError`
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        if size < 1:
+            raise ValueError('The page size must be at least 1.')
+
+        if not self._cursor:
+            raise TypeError(
+                "The '{0}' has no cursor associated with it.".format(
+                    self.__class__.__name__))
+
+        sorting = self._keyset_sorting()
+
+        if token is None:
+            qs = self._keyset(sorting)
+        else:
+            qs = self._keyset(sorting, _decode_token(token, sorting))
+
+        # The token is built from the values in the last document, so
+        # load the documents as they come from the database and convert
+        # them afterward.
+        qs._cls = None
+        qs._row_factory = None
+        docs = qs[:size]
+        items = [self._hydrate(doc) for doc in docs]
+
+        # A short page means there's nothing left.
+        if len(items) < size:
+            return items, None
+
+        return items, _encode_token(sorting, _sort_values(docs[-1], sorting))
 
     def skip(self, skip):
         """Skip a number of documents in the :class:`QuerySet`.
@@ -184,7 +530,10 @@ class QuerySet(object):
         """
 
         # Make sure to clone the cursor so as not to alter the original
-        return QuerySet(self._cursor.clone().skip(skip), self._cls)
+        qs = self._clone(self._cursor.clone().skip(skip))
+        qs._skip = skip
+
+        return qs
 
     def sort(self, *fields):
         """Sort the documents in the :class:`QuerySet`.
@@ -226,13 +575,256 @@ class QuerySet(object):
             sorting.append((field, direction))
 
         # Make sure to clone the cursor so as not to alter the original
-        qs = QuerySet(self._cursor.clone(), self._cls)
+        qs = self._clone(self._cursor.clone())
 
         # Add the sorting so that _fill_to() can apply it later.
         qs._sorting = sorting
+        qs._ordering = sorting
+
+        return qs
+
+    def update(self, **fields):
+        """Perform an atomic update on all of the documents.
+
+        The fields are set on every document matched by the
+        :class:`QuerySet` with a single ``update`` using the query that
+        created the :class:`QuerySet`. Field names are mapped and
+        ``typed_fields`` is enforced the same way as
+        :meth:`~simon.Model.update`. Instances that have already been
+        retrieved are not changed.
+
+        If no cursor has been associated with the query set, or if it
+        has been limited through :meth:`skip`, :meth:`limit`, or
+        slicing, ``TypeError`` will be raised. If no fields are
+        specified, ``ValueError`` will be raised.
+
+        :param safe: (optional) **DEPRECATED** Use ``w`` instead.
+        :type safe: bool.
+        :param w: (optional) The number of servers that must receive the
+                  update for it to be successful.
+        :type w: int.
+        :param \*\*fields: The fields to update.
+        :type \*\*fields: \*\*kwargs.
+        :returns: int -- the number of documents updated, or ``None``
+                  when write concern is disabled.
+        :raises: :class:`TypeError`, :class:`ValueError`
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        write_concern = {
+            'safe': fields.pop('safe', None),
+            'w': fields.pop('w', None),
+        }
+
+        return self._update({'$set': fields}, **write_concern)
+
+    def values(self, *fields):
+        """Return the documents as ``dict`` objects.
+
+        Creating a model instance for every document takes time. When
+        only the values are needed, ``values()`` returns each document
+        as a ``dict`` instead.
+
+        When fields are specified, only they are retrieved from the
+        database (replacing any projection from :meth:`only` or
+        :meth:`exclude`) and each ``dict`` contains them under the names
+        they were given. Fields missing from a document are ``None``.
+        Otherwise each ``dict`` contains the entire document, with keys
+        in ``field_map`` renamed to their attribute names.
+
+        ..
+
+            >>> User.all().values('name', 'email')
+            [{'name': 'Simon', 'email': 'simon@example.com'}]
+
+        :param \*fields: (optional) Names of the fields to include.
+        :type \*fields: \*args.
+        :returns: :class:`QuerySet` -- the documents as ``dict`` objects.
+        :raises: :class:`TypeError`
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        if not self._cursor:
+            raise TypeError(
+                "The '{0}' has no cursor associated with it.".format(
+                    self.__class__.__name__))
+
+        if fields:
+            # Map the names once rather than for every document.
+            keys = self._map_keys(fields)
+
+            def row_factory(document):
+                return dict(zip(fields, _get_values(document, keys)))
+
+            qs = self.only(*fields)
+        else:
+            names = {}
+            if self._cls:
+                # Only keys at the top level of the document can be
+                # renamed.
+                names = dict((v, k) for k, v in
+                             iteritems(self._cls._meta.field_map)
+                             if '.' not in v)
+
+            def row_factory(document):
+                return dict((names.get(k, k), v)
+                            for k, v in iteritems(document))
+
+            # Make sure to clone the cursor so as not to alter the
+            # original
+            qs = self._clone(self._cursor.clone())
+
+        qs._row_factory = row_factory
+
+        return qs
+
+    def values_list(self, *fields, **kwargs):
+        """Return the values of fields in the documents as tuples.
+
+        Like :meth:`values`, but each document is returned as a
+        ``tuple`` containing the values of the fields in the order they
+        were specified. Only the fields are retrieved from the database.
+        Fields missing from a document are ``None``.
+
+        When a single field is specified, ``flat`` can be set to
+        ``True`` to return its values rather than one item tuples.
+
+        ..
+
+            >>> User.all().values_list('name', 'email')
+            [('Simon', 'simon@example.com')]
+            >>> User.all().values_list('name', flat=True)
+            ['Simon']
+
+        :param \*fields: Names of the fields to include.
+        :type \*fields: \*args.
+        :param flat: (optional) Whether to return the values of a single
+                     field.
+        :type flat: bool.
+        :returns: :class:`QuerySet` -- the values in the documents.
+        :raises: :class:`TypeError`
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        flat = kwargs.pop('flat', False)
+        if kwargs:
+            raise TypeError('Unexpected keyword arguments: {0}.'.format(
+                ', '.join(kwargs)))
+
+        if not fields:
+            raise TypeError('At least one field must be specified.')
+        if flat and len(fields) > 1:
+            raise TypeError("'flat' can only be used with a single field.")
+
+        qs = self.values(*fields)
+
+        # Map the names once rather than for every document.
+        keys = self._map_keys(fields)
+
+        if flat:
+            def row_factory(document):
+                return _get_values(document, keys)[0]
+        else:
+            def row_factory(document):
+                return tuple(_get_values(document, keys))
+
+        qs._row_factory = row_factory
+
+        return qs
+
+    def _build_cursor(self, spec, fields=None):
+        """Return a new cursor from the collection of the current one.
+
+        :param spec: The query.
+        :type spec: dict.
+        :param fields: (optional) The projection.
+        :type fields: dict.
+        :returns: :class:`~pymongo.cursor.Cursor` -- the new cursor.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        collection = self._cursor.collection
+
+        # Only pass the projection along if there is one. Otherwise all
+        # of the fields would be excluded.
+        if fields:
+            return collection.find(spec, fields)
+        return collection.find(spec)
+
+    def _clear_cache(self):
+        """Clear the caches of the model class, if it has them.
+
+        There's no way to know which documents were changed by a write
+        to all of the documents in the :class:`QuerySet`, so all of the
+        cached documents are removed. All of the query results for the
+        collection are removed as well, along with the collection's
+        instances in the current identity map.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        identity_map = get_identity_map()
+        if identity_map is not None:
+            identity_map.clear(self._cursor.collection)
+
+        if self._cls and self._cls._meta.cache is not None:
+            self._cls._meta.cache.clear()
+
+        if self._cls and self._cls._meta.query_cache is not None:
+            self._cls._meta.query_cache.invalidate(
+                self._cursor.collection.full_name)
+
+    def _clone(self, cursor):
+        """Return a new :class:`QuerySet` sharing this one's settings.
+
+        :param cursor: The cursor for the new :class:`QuerySet`.
+        :type cursor: :class:`~pymongo.cursor.Cursor`.
+        :returns: :class:`QuerySet` -- the new query set.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        qs = QuerySet(cursor, self._cls)
+        qs._skip = self._skip
+        qs._limit = self._limit
+        qs._spec = self._spec
+        qs._fields = self._fields
+        qs._sorting = self._sorting
+        qs._ordering = self._ordering
+        qs._row_factory = self._row_factory
 
         return qs
 
+    def _collect(self, document):
+        """Hold on to a document to add to the query cache.
+
+        The document is copied, since the instance it's loaded into can
+        change it before the cursor runs out. Once the results are too
+        big for the cache, they're no longer collected.
+
+        :param document: The document.
+        :type document: dict.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        if len(self._cache_documents) >= self._cls._meta.query_cache.max_size:
+            self._cache_documents = None
+            return
+
+        self._cache_documents.append(copy.deepcopy(document))
+
     def _fill_to(self, index):
         """Build the cache of documents retrieved from the cursor.
 
@@ -242,9 +834,18 @@ class QuerySet(object):
         iterated over, any documents before the requested one must be
         loaded.
 
+        Documents are loaded until either ``index`` is reached or the
+        cursor runs out of documents. Once the cursor has run out, the
+        number of documents is known and will be used by
+        :meth:`count` instead of asking the database.
+
         :param index: Index to fill the cache to.
         :type index: int.
 
+        .. versionchanged:: 0.8.0
+           The cursor is consumed until it runs out rather than calling
+           :meth:`count` first
+
         .. versionchanged:: 0.3.0
            Processes the sorting when documents are first fetched
 
@@ -255,81 +856,526 @@ class QuerySet(object):
         if index < len(self._items):
             return
 
+        # Once every document has been loaded, whether from the cursor
+        # or the query cache, there's nothing more to read.
+        if self._complete:
+            return
+
+        # Before anything is loaded, check the model's query cache.
+        if not self._items and self._cache_documents is None:
+            if self._load_cached():
+                return
+
         if self._sorting:
             # If there's a sort, apply it...
             self._cursor.sort(self._sorting)
             # and remove it so it won't happen again.
             self._sorting = None
 
-        # If the specified index is beyond the total number of
-        # documents, load until the last document
-        if index >= self.count():
-            # Because count() has been called, _count can be used to
-            # avoid the overhead of calling a function
-            index = self._count - 1
-
         # Iterate over all documents between the last one loaded and
-        # the one specified by index. If the :class:`QuerySet` has a
-        # model class, store an instance of the class in the cache,
-        # otherwise store the raw document
-        with ignored(StopIteration):
-            # StopIteration should never happen because of the check at
-            # the top of this method, but it's here just in case
-            # something crazy happens, like a document is added to the
-            # cursor (since new documents can suddenly appear in a
-            # cursor) during iteration.
-            for x in range(len(self._items), index + 1):
+        # the one specified by index, storing whatever _hydrate() turns
+        # each one into in the cache.
+        try:
+            while len(self._items) <= index:
                 item = get_next(self._cursor)()
-                if self._cls:
-                    item = self._cls(**item)
-                self._items.append(item)
+                if self._cache_documents is not None:
+                    self._collect(item)
+                self._items.append(self._hydrate(item))
+        except StopIteration:
+            # The cursor has run out of documents, which means all of
+            # them are in the cache. There's no longer any need to ask
+            # the database how many there are.
+            self._count = len(self._items)
+            self._complete = True
+
+            if self._cache_documents is not None:
+                self._cls._meta.query_cache.set(
+                    self._cursor.collection.full_name, self._cache_key,
+                    self._cache_documents, self._cache_generation)
+                self._cache_documents = None
+
+    def _flush_queued(self):
+        """Send any queued writes before writing to the documents.
+
+        Writes to all of the documents in the :class:`QuerySet` can't
+        be queued in a session, so the writes queued before them are
+        sent first, including those waiting in the model class's
+        write-behind queue.
+
+        :raises: :class:`~simon.exceptions.FlushError`
+
+        .. versionadded:: 0.8.0
 
-    def __getitem__(self, k):
-        """Return an item or slice from the :class:`QuerySet`."""
+        """
 
-        # If k is a slice, set the bound to either the slice's stop
-        # attribute. If there is no value for stop, use the total
-        # number of items in the QuerySet
-        if isinstance(k, slice):
-            if k.stop is not None:
-                bound = int(k.stop)
+        flush_queued(self._cls._meta.write_behind if self._cls else None)
+
+    def _hydrate(self, document):
+        """Return what to use in place of a document from the cursor.
+
+        Documents are turned into rows when :meth:`values` or
+        :meth:`values_list` has been used, and into instances when the
+        :class:`QuerySet` has a model class. Otherwise the raw document
+        is used.
+
+        :param document: The document.
+        :type document: dict.
+        :returns: The row, :class:`~simon.Model` instance, or document.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        if self._row_factory:
+            return self._row_factory(document)
+        if self._cls:
+            # Documents missing fields can't be shared through the
+            # identity map.
+            return self._cls._from_db(document, partial=bool(self._fields))
+        return document
+
+    def _is_exhausted(self):
+        """Return whether all documents have been loaded from the cursor.
+
+        :returns: bool -- ``True`` if the cache contains every document.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        return self._count is not None and len(self._items) >= self._count
+
+    def _keyset(self, sorting, values=None):
+        """Return a new :class:`QuerySet` for keyset pagination.
+
+        The new :class:`QuerySet` is sorted by ``sorting``. When
+        ``values`` is provided, only documents that come after those
+        values for the sort fields will be included.
+
+        :param sorting: The (field, direction) pairs to sort by.
+        :type sorting: list.
+        :param values: (optional) The values of the sort fields in the
+                       last document that has been seen.
+        :type values: list.
+        :returns: :class:`QuerySet` -- the documents.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        spec = self._query_spec()
+
+        if values is not None:
+            # For a sort of (a, b, c), a document comes after another
+            # when a is past its a, or a matches and b is past its b,
+            # or a and b match and c is past its c.
+            conditions = []
+            for i, (key, direction) in enumerate(sorting):
+                value = values[i]
+
+                # Null and missing values sort before all others, but
+                # $gt and $lt don't match them. In an ascending sort,
+                # everything that isn't null comes after null. In a
+                # descending sort, null comes after everything else.
+                if direction == pymongo.ASCENDING:
+                    if value is None:
+                        past = [{'$ne': None}]
+                    else:
+                        past = [{'$gt': value}]
+                elif value is None:
+                    past = []
+                elif key == '_id':
+                    # _id can't be null.
+                    past = [{'$lt': value}]
+                else:
+                    past = [{'$lt': value}, None]
+
+                for match in past:
+                    condition = dict((k, v) for (k, d), v in
+                                     zip(sorting[:i], values[:i]))
+                    condition[key] = match
+                    conditions.append(condition)
+
+            after = {Q.OR: conditions}
+            spec = {Q.AND: [spec, after]} if spec else after
+
+        # The values of the sort fields are needed to build the query
+        # for the next page, so they can't be left out by a projection.
+        fields = self._fields
+        if fields:
+            fields = dict(fields)
+            if any(itervalues(fields)):
+                fields.update((key, 1) for key, direction in sorting)
             else:
-                bound = self.count()
-        # If k isn't a slice, make sure it's a valid value and use
-        # it as the bound
+                for key, direction in sorting:
+                    fields.pop(key, None)
+
+        # Skip and limit don't carry over to the new cursor.
+        qs = QuerySet(self._build_cursor(spec, fields), self._cls)
+        qs._spec = spec
+        qs._fields = fields
+        qs._sorting = sorting
+        qs._ordering = sorting
+        qs._row_factory = self._row_factory
+
+        return qs
+
+    def _keyset_sorting(self):
+        """Return the sort to use for keyset pagination.
+
+        :returns: list -- the (field, direction) pairs to sort by.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        sorting = list(self._ordering or ())
+
+        # Without a unique field at the end of the sort, documents with
+        # the same values for the sort fields could be skipped.
+        if '_id' not in (key for key, direction in sorting):
+            sorting.append(('_id', pymongo.ASCENDING))
+
+        return sorting
+
+    def _load_cached(self):
+        """Load the documents from the model's query cache.
+
+        The results are looked up by the collection and a key built from
+        the query, sort, skip, limit, and projection. If they aren't in
+        the cache, the documents loaded from the cursor will be collected
+        so that they can be added.
+
+        :returns: bool -- ``True`` if the documents were in the cache.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        # Without the query there's nothing to tell the results apart
+        # from those of any other query.
+        if not (self._cls and self._cursor) or self._spec is None:
+            return False
+
+        query_cache = self._cls._meta.query_cache
+        if query_cache is None:
+            return False
+
+        key = query_key(self._spec, self._ordering, self._skip, self._limit,
+                        self._fields)
+        if key is None:
+            return False
+
+        collection = self._cursor.collection.full_name
+
+        # The generation has to be checked before the cache is so that
+        # a write made in between isn't missed.
+        generation = query_cache.generation(collection)
+        documents = query_cache.get(collection, key)
+        if documents is None:
+            self._cache_key = key
+            self._cache_generation = generation
+            self._cache_documents = []
+            return False
+
+        self._items = [self._hydrate(document) for document in documents]
+        self._count = len(self._items)
+        self._complete = True
+
+        return True
+
+    def _map_keys(self, fields):
+        """Return the document keys for field names.
+
+        :param fields: Names of the fields.
+        :type fields: list.
+        :returns: list -- the keys, in the same order as ``fields``.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        # If the QuerySet has a model class, check for the fields in the
+        # class's field map.
+        if not self._cls:
+            return list(fields)
+
+        return [self._cls._meta.map_key(field) for field in fields]
+
+    def _map_projection(self, fields, value):
+        """Return a projection document for field names.
+
+        :param fields: Names of the fields.
+        :type fields: list.
+        :param value: ``1`` to include the fields, ``0`` to exclude them.
+        :type value: int.
+        :returns: dict -- the projection.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        projection = dict((field, value) for field in fields)
+
+        # If the QuerySet has a model class, check for the fields in the
+        # class's field map.
+        if self._cls:
+            projection = map_fields(self._cls._meta.field_map, projection,
+                                    flatten_keys=True)
+
+        return projection
+
+    def _project(self, fields):
+        """Return a new :class:`QuerySet` using a projection.
+
+        :param fields: The projection.
+        :type fields: dict.
+        :returns: :class:`QuerySet` -- the documents.
+        :raises: :class:`TypeError`
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        if not self._cursor:
+            raise TypeError(
+                "The '{0}' has no cursor associated with it.".format(
+                    self.__class__.__name__))
+
+        # The projection can't be changed on an existing cursor, so a new
+        # one is needed.
+        cursor = self._build_cursor(self._query_spec(), fields)
+        if self._skip:
+            cursor.skip(self._skip)
+        if self._limit:
+            cursor.limit(self._limit)
+
+        qs = self._clone(cursor)
+        qs._fields = fields
+        # Any sort that has already been applied to the original cursor
+        # needs to be applied to the new one.
+        qs._sorting = self._ordering
+
+        return qs
+
+    def _query_spec(self):
+        """Return the query used to create the :class:`QuerySet`.
+
+        Anything that builds a new query from this one needs the
+        original. A :class:`QuerySet` created directly from a cursor
+        doesn't know it, and using an empty query in its place would
+        match every document in the collection.
+
+        :returns: dict -- the query.
+        :raises: :class:`TypeError`
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        if self._spec is None:
+            raise TypeError(
+                "The '{0}' doesn't know the query it was created "
+                "with.".format(self.__class__.__name__))
+
+        return self._spec
+
+    def _set_write_concern(self, options):
+        """Apply the model's write concern to ``options``.
+
+        :param options: The write concern settings.
+        :type options: dict.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        if self._cls:
+            set_write_concern(options, self._cls._meta.write_concern)
+        else:
+            set_write_concern(options, None)
+
+    def _slice(self, start, stop):
+        """Return a new :class:`QuerySet` for a range of documents.
+
+        Rather than loading every document up to ``stop`` into the
+        cache, the range is applied to a clone of the cursor through
+        ``skip`` and ``limit`` so that only the requested documents are
+        retrieved from the database. Any skip and limit already applied
+        to the :class:`QuerySet` are taken into account.
+
+        :param start: Index of the first document.
+        :type start: int.
+        :param stop: Index after the last document, or ``None`` for all
+                     remaining documents.
+        :type stop: int.
+        :returns: :class:`QuerySet` or list -- the documents in the
+                  range, or an empty list if the range is empty.
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        # The range can't extend beyond the limit that is already in
+        # place.
+        if self._limit:
+            stop = self._limit if stop is None else min(stop, self._limit)
+
+        if stop is None:
+            # A limit of 0 is the same as no limit.
+            limit = 0
         else:
-            if k < 0:
+            limit = stop - start
+            if limit <= 0:
+                # There are no documents in the range. Don't bother
+                # with the database.
+                return []
+
+        skip = self._skip + start
+
+        # Make sure to clone the cursor so as not to alter the original
+        qs = self._clone(self._cursor.clone().skip(skip).limit(limit))
+        qs._skip = skip
+        qs._limit = limit
+
+        return qs
+
+    def _update(self, fields, **kwargs):
+        """Update all of the documents matched by the :class:`QuerySet`.
+
+        When the :class:`QuerySet` has a model class, field names are
+        mapped according to its ``Meta.field_map`` and its
+        ``Meta.typed_fields`` are enforced.
+
+        :param fields: The update to perform.
+        :type fields: dict.
+        :param \*\*kwargs: The write concern settings.
+        :type \*\*kwargs: \*\*kwargs.
+        :returns: int -- the number of documents updated, or ``None``
+                  when write concern is disabled.
+        :raises: :class:`TypeError`, :class:`ValueError`
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        # There needs to be something to update.
+        if not any(itervalues(fields)):
+            raise ValueError('No fields have been specified.')
+
+        spec = self._write_spec()
+
+        if self._cls:
+            for k, v in iteritems(fields):
+                fields[k] = map_fields(self._cls._meta.field_map, v,
+                                       flatten_keys=True)
+                self._cls._check_typed_fields(fields[k])
+
+        self._set_write_concern(kwargs)
+
+        self._flush_queued()
+        result = self._cursor.collection.update(spec, fields, multi=True,
+                                                **kwargs)
+
+        self._clear_cache()
+
+        return result['n'] if result else None
+
+    def _write_spec(self):
+        """Return the query to use for writes to the documents.
+
+        Writes go to every document matching the query, so the
+        :class:`QuerySet` can't have been limited by a skip or a limit.
+
+        :returns: dict -- the query.
+        :raises: :class:`TypeError`
+
+        .. versionadded:: 0.8.0
+
+        """
+
+        if not self._cursor:
+            raise TypeError(
+                "The '{0}' has no cursor associated with it.".format(
+                    self.__class__.__name__))
+
+        if self._skip or self._limit:
+            raise TypeError(
+                "The '{0}' cannot be written to once a skip or limit has "
+                "been applied.".format(self.__class__.__name__))
+
+        return self._query_spec()
+
+    def __getitem__(self, k):
+        """Return an item or slice from the :class:`QuerySet`.
+
+        Documents that have already been loaded are returned from the
+        internal cache. Anything else is retrieved from the database
+        using ``skip`` and ``limit`` so that the documents before the
+        requested ones don't need to be loaded. Slices are always
+        returned as a ``list``.
+
+        .. versionchanged:: 0.8.0
+           Documents that haven't been loaded are retrieved with
+           ``skip`` and ``limit``
+
+        """
+
+        if isinstance(k, slice):
+            if ((k.start is not None and k.start < 0) or
+                    (k.stop is not None and k.stop < 0)):
                 raise TypeError('Negative indexing is not supported.')
-            elif k >= self.count():
-                if self._cls:
-                    message = "No such item in '{0}' for '{1}' object".format(
-                        self.__class__.__name__,
-                        self._cls.__name__ if self._cls else
-                        self.__class__.__name__)
-                else:
-                    message = "No such item in '{0}'".format(
-                        self.__class__.__name__)
-                raise IndexError(message)
 
-            bound = k + 1
+            # If everything that was asked for has already been loaded,
+            # use the cache.
+            if self._is_exhausted() or (k.stop is not None and
+                                        k.stop <= len(self._items)):
+                return self._items[k]
+
+            qs = self._slice(int(k.start or 0),
+                             None if k.stop is None else int(k.stop))
+
+            # Steps can't be handled by the database, so load the range
+            # and step through it here. The documents are read through
+            # an iterator so that list() doesn't ask the QuerySet for
+            # its length, which would count them in the database.
+            return list(iter(qs))[::k.step]
 
-        # bound will contain the number, not the index, of the last
-        # requested document. Load all documents up to and including
-        # the last bound now.
-        self._fill_to(bound - 1)
+        if k < 0:
+            raise TypeError('Negative indexing is not supported.')
 
-        return self._items[k]
+        if k < len(self._items):
+            return self._items[k]
+
+        if not self._is_exhausted():
+            # Load just the requested document.
+            for item in self._slice(k, k + 1):
+                return item
+
+        # There is no document at k.
+        if self._cls:
+            message = "No such item in '{0}' for '{1}' object".format(
+                self.__class__.__name__, self._cls.__name__)
+        else:
+            message = "No such item in '{0}'".format(self.__class__.__name__)
+        raise IndexError(message)
 
     def __iter__(self):
         """Iterate through the documents in the cursor."""
 
-        for x in range(0, self.count()):
+        x = 0
+        while True:
             # Fetch the document from the cursor if it hasn't already
             # been loaded
             if len(self._items) <= x:
                 self._fill_to(x)
 
+                if len(self._items) <= x:
+                    # The cursor has run out of documents.
+                    return
+
             yield self._items[x]
+            x += 1
 
     def __len__(self):
         """Return the length of the :class:`QuerySet`."""
@@ -338,3 +1384,94 @@ class QuerySet(object):
             return self.count()
         except TypeError:
             return 0
+
+
+def _decode_token(token, sorting):
+    """Return the sort values stored in a continuation token.
+
+    :param token: The token created by :func:`_encode_token`.
+    :type token: str.
+    :param sorting: The sort the token is expected to be used with.
+    :type sorting: list.
+    :returns: list -- the values of the sort fields.
+    :raises: :class:`ValueError`
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    try:
+        data = BSON(base64.urlsafe_b64decode(token.encode('ascii'))).decode()
+    except Exception:
+        raise ValueError('Invalid pagination token.')
+
+    # BSON has no tuples, so the sort comes back as lists.
+    if data.get('s') != [list(x) for x in sorting]:
+        raise ValueError('The pagination token was created with a '
+                         'different sort.')
+
+    return data['v']
+
+
+def _encode_token(sorting, values):
+    """Return a continuation token for keyset pagination.
+
+    The sort and the values of the sort fields are encoded as BSON so
+    that types such as :class:`~bson.objectid.ObjectId` and
+    :class:`~datetime.datetime` survive the round trip.
+
+    :param sorting: The (field, direction) pairs being sorted by.
+    :type sorting: list.
+    :param values: The values of the sort fields.
+    :type values: list.
+    :returns: str -- the token.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    data = BSON.encode({'s': [list(x) for x in sorting], 'v': values})
+    return base64.urlsafe_b64encode(data).decode('ascii')
+
+
+def _get_values(document, keys):
+    """Return the values of keys in a document.
+
+    :param document: The document or model instance.
+    :type document: dict or :class:`~simon.Model`.
+    :param keys: The keys, using ``.`` for nested keys.
+    :type keys: list.
+    :returns: list -- the values, ``None`` for missing keys.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    # Models keep their values in the internal document.
+    document = getattr(document, '_document', document)
+
+    values = []
+    for key in keys:
+        try:
+            values.append(get_nested_key(document, key))
+        except KeyError:
+            values.append(None)
+
+    return values
+
+
+def _sort_values(document, sorting):
+    """Return the values of the sort fields in a document.
+
+    :param document: The document or model instance.
+    :type document: dict or :class:`~simon.Model`.
+    :param sorting: The (field, direction) pairs being sorted by.
+    :type sorting: list.
+    :returns: list -- the values of the sort fields.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    # Documents without a key sort as if its value were null.
+    return _get_values(document, [key for key, direction in sorting])
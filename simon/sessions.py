@@ -0,0 +1,1032 @@
+"""Batch writes into a unit of work
+
+Inside of a session, the writes performed by models are queued instead
+of being sent to the database right away. When the session ends, the
+queued writes are sent together, in order, as bulk operations.
+
+Models with ``Meta.write_behind`` enabled queue their writes all the
+time. A background thread sends them to the database.
+
+Counters accumulate increments in memory and send their sums to the
+database periodically.
+
+Inside of an identity map, each document is loaded into a single
+instance no matter how many times it's retrieved.
+
+.. versionadded:: 0.8.0
+"""
+
+import atexit
+from contextlib import contextmanager
+import logging
+try:
+    import queue
+except ImportError:
+    # Python 2
+    import Queue as queue
+import threading
+import time
+
+from pymongo.errors import OperationFailure
+try:
+    # pymongo 2.7+
+    from pymongo.errors import BulkWriteError
+except ImportError:
+    BulkWriteError = None
+
+from ._compat import iteritems
+from .exceptions import FlushError
+from .utils import is_atomic
+
+__all__ = ('Counter', 'Counters', 'IdentityMap', 'Session', 'WriteBehind',
+           'flush_queued', 'get_counters', 'get_identity_map', 'get_session',
+           'get_write_behind', 'identity_map', 'session', 'FlushError')
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+_counters = None
+_write_behind = None
+_shared_lock = threading.Lock()
+
+
+class Counter(object):
+
+    """A field of a document whose increments are aggregated.
+
+    Instances are created by :meth:`~simon.Model.counter`.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    def __init__(self, counters, collection, id, field, on_flush=None,
+                 **write_concern):
+        """Create a new counter.
+
+        :param counters: The aggregator to add increments to.
+        :type counters: :class:`Counters`.
+        :param collection: The collection containing the document.
+        :type collection: :class:`~pymongo.collection.Collection`.
+        :param id: The ``_id`` of the document.
+        :param field: The name of the field in the document.
+        :type field: str.
+        :param on_flush: (optional) A function to call once the
+                         increments have been sent.
+        :type on_flush: callable.
+        :param \*\*write_concern: The write concern settings.
+        :type \*\*write_concern: \*\*kwargs.
+
+        """
+
+        self.counters = counters
+        self.collection = collection
+        self.id = id
+        self.field = field
+        self.on_flush = on_flush
+        self.write_concern = write_concern
+
+    def add(self, value=1):
+        """Add to the counter.
+
+        :param value: (optional) The amount to add.
+        :type value: int.
+
+        """
+
+        self.counters.add(self.collection, self.id, self.field, value,
+                          on_flush=self.on_flush, **self.write_concern)
+
+
+class Counters(object):
+
+    """Increments accumulated in memory and sent to the database together.
+
+    Rather than sending an ``$inc`` to the database each time a counter
+    is added to, the increments are summed for each field of each
+    document. The sums are sent, with one ``$inc`` for each document,
+    ``interval`` seconds after the first increment or once ``threshold``
+    increments have been added, whichever comes first.
+
+    Sending happens either in a background thread or in the thread that
+    added the increment that reached ``threshold``. When it fails,
+    ``on_error`` is called with the exception. The exception is logged
+    if there is no ``on_error``. The increments that were being sent
+    are not retried.
+
+    Any increments that haven't been sent when the interpreter exits are
+    sent first.
+
+    :param interval: (optional) The number of seconds to hold increments.
+    :type interval: float.
+    :param threshold: (optional) The number of increments to hold.
+    :type threshold: int.
+    :param on_error: (optional) A function to call with exceptions.
+    :type on_error: callable.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    def __init__(self, interval=1.0, threshold=1000, on_error=None):
+        self.interval = interval
+        self.threshold = threshold
+        self.on_error = on_error
+
+        # The summed increments for each document, along with the
+        # collection, write concern, and on_flush function to use with
+        # them.
+        self._pending = {}
+        self._count = 0
+
+        self._lock = threading.Lock()
+        self._timer = None
+        self._registered = False
+
+    def add(self, collection, id, field, value=1, on_flush=None,
+            **write_concern):
+        """Add an increment.
+
+        :param collection: The collection containing the document.
+        :type collection: :class:`~pymongo.collection.Collection`.
+        :param id: The ``_id`` of the document.
+        :param field: The name of the field in the document.
+        :type field: str.
+        :param value: (optional) The amount to add.
+        :type value: int.
+        :param on_flush: (optional) A function to call once the
+                         document's increments have been sent.
+        :type on_flush: callable.
+        :param \*\*write_concern: The write concern settings.
+        :type \*\*write_concern: \*\*kwargs.
+
+        """
+
+        with self._lock:
+            key = (collection.full_name, id)
+            if key not in self._pending:
+                self._pending[key] = (collection, {}, write_concern,
+                                      on_flush)
+
+            fields = self._pending[key][1]
+            fields[field] = fields.get(field, 0) + value
+
+            self._count += 1
+            full = self._count >= self.threshold
+
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.interval, self._send)
+                self._timer.daemon = True
+                self._timer.start()
+
+                if not self._registered:
+                    # Timers are daemon threads that are stopped when
+                    # the interpreter exits. Make sure nothing is lost.
+                    atexit.register(self._send)
+                    self._registered = True
+
+        if full:
+            self._send()
+
+    def flush(self):
+        """Send all of the accumulated increments to the database.
+
+        :raises: :class:`~simon.exceptions.FlushError`
+
+        """
+
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+            self._count = 0
+
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not pending:
+            return
+
+        session = Session()
+        for key, value in iteritems(pending):
+            collection, fields, write_concern, on_flush = value
+
+            # The key is the collection's name and the document's _id.
+            session.update(collection, {'_id': key[1]}, {'$inc': fields},
+                           **write_concern)
+            if on_flush is not None:
+                session.on_flush(on_flush)
+        session.flush()
+
+    def _send(self):
+        """Send the accumulated increments, reporting any errors."""
+
+        try:
+            self.flush()
+        except Exception as e:
+            if self.on_error is not None:
+                self.on_error(e)
+            else:
+                logger.exception('Counters could not be sent.')
+
+
+class IdentityMap(object):
+
+    """The instances loaded within a scope, by collection and ``_id``.
+
+    Instances are created by :func:`identity_map`.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    def __init__(self):
+        """Create a new, empty identity map."""
+
+        self._instances = {}
+
+    def add(self, collection, instance):
+        """Add an instance to the map.
+
+        Any other instance for the same document is replaced.
+
+        :param collection: The collection containing the document.
+        :type collection: :class:`~pymongo.collection.Collection`.
+        :param instance: The instance.
+        :type instance: :class:`~simon.Model`.
+
+        """
+
+        key = _document_key(collection, instance._document)
+        if key is not None:
+            self._instances[key] = instance
+
+    def clear(self, collection=None):
+        """Remove all of the instances from the map.
+
+        :param collection: (optional) Only remove the instances of the
+                           documents in this collection.
+        :type collection: :class:`~pymongo.collection.Collection`.
+
+        """
+
+        if collection is None:
+            self._instances = {}
+            return
+
+        for key in list(self._instances):
+            if key[0] == collection.full_name:
+                del self._instances[key]
+
+    def get(self, collection, id):
+        """Return the instance for a document.
+
+        :param collection: The collection containing the document.
+        :type collection: :class:`~pymongo.collection.Collection`.
+        :param id: The ``_id`` of the document.
+        :returns: :class:`~simon.Model` -- the instance, or ``None`` if
+                  the document hasn't been loaded.
+
+        """
+
+        key = _document_key(collection, {'_id': id})
+        if key is None:
+            return None
+        return self._instances.get(key)
+
+    def remove(self, collection, id):
+        """Remove the instance for a document from the map.
+
+        :param collection: The collection containing the document.
+        :type collection: :class:`~pymongo.collection.Collection`.
+        :param id: The ``_id`` of the document.
+
+        """
+
+        key = _document_key(collection, {'_id': id})
+        if key is not None:
+            self._instances.pop(key, None)
+
+    def __len__(self):
+        return len(self._instances)
+
+
+class Session(object):
+
+    """A queue of writes to send to the database together.
+
+    Writes are kept in the order they were added. When an atomic update
+    is added for a document whose last queued write is also an atomic
+    update, the two are merged into one if they are compatible:
+    ``$set`` keeps the newest value, ``$inc`` adds the values together,
+    and any operator can be combined with another that updates
+    different fields.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    def __init__(self):
+        """Create a new, empty session."""
+
+        self._operations = []
+
+        # The last update queued for each document, so that later
+        # updates can be merged into it.
+        self._updates = {}
+
+        # The functions to call once the writes have been sent.
+        self._callbacks = []
+
+    def clear(self):
+        """Discard all of the queued writes."""
+
+        self._operations = []
+        self._updates = {}
+        self._callbacks = []
+
+    def flush(self):
+        """Send all of the queued writes to the database.
+
+        Consecutive writes to the same collection with the same write
+        concern are sent as a single ordered bulk operation. With
+        versions of PyMongo that don't support bulk operations (prior
+        to 2.7), the writes are sent one at a time.
+
+        Writes stop at the first one that fails. The queue is emptied
+        either way. The functions added with :meth:`on_flush` are called
+        afterward, even when a write fails, because the writes before
+        it have already been sent.
+
+        :raises: :class:`~simon.exceptions.FlushError`
+
+        """
+
+        operations = self._operations
+        callbacks = self._callbacks
+        self.clear()
+
+        try:
+            index = 0
+            for run in _runs(operations):
+                if BulkWriteError is not None:
+                    errors = _execute_bulk(run)
+                else:
+                    errors = _execute_each(run)
+
+                if errors:
+                    for error in errors:
+                        error['operation'] = run[error['index']]
+                        error['index'] += index
+                    message = ('{0} write(s) failed while flushing the '
+                               'session.')
+                    raise FlushError(message.format(len(errors)), errors)
+
+                index += len(run)
+        finally:
+            for callback in callbacks:
+                callback()
+
+    def insert(self, collection, doc_or_docs, **write_concern):
+        """Queue an insert.
+
+        Like PyMongo's ``insert()``, this accepts a single document or
+        a ``list`` of them. The documents must already have an ``_id``.
+
+        :param collection: The collection to insert into.
+        :type collection: :class:`~pymongo.collection.Collection`.
+        :param doc_or_docs: The document(s) to insert.
+        :type doc_or_docs: dict or list.
+        :param \*\*write_concern: The write concern settings.
+        :type \*\*write_concern: \*\*kwargs.
+        :returns: The ``_id`` (or list of them) of the document(s).
+
+        """
+
+        if isinstance(doc_or_docs, dict):
+            docs = [doc_or_docs]
+        else:
+            docs = doc_or_docs
+
+        for document in docs:
+            self._add('insert', collection, {'_id': document['_id']},
+                      document, False, write_concern)
+
+        if isinstance(doc_or_docs, dict):
+            return doc_or_docs['_id']
+        return [document['_id'] for document in docs]
+
+    def remove(self, collection, spec, **write_concern):
+        """Queue the removal of a single document.
+
+        :param collection: The collection to remove from.
+        :type collection: :class:`~pymongo.collection.Collection`.
+        :param spec: The query for the document.
+        :type spec: dict.
+        :param \*\*write_concern: The write concern settings.
+        :type \*\*write_concern: \*\*kwargs.
+
+        """
+
+        self._add('remove', collection, spec, None, False, write_concern)
+
+    def on_flush(self, callback):
+        """Call a function once the queued writes have been sent.
+
+        The function is discarded along with the writes if they are
+        never sent.
+
+        :param callback: The function, which takes no arguments.
+        :type callback: callable.
+
+        """
+
+        self._callbacks.append(callback)
+
+    def update(self, collection, spec, document, upsert=False,
+               **write_concern):
+        """Queue an update of a single document.
+
+        :param collection: The collection to update.
+        :type collection: :class:`~pymongo.collection.Collection`.
+        :param spec: The query for the document.
+        :type spec: dict.
+        :param document: The update to perform.
+        :type document: dict.
+        :param upsert: (optional) Whether or not to insert the document
+                       if it doesn't exist.
+        :type upsert: bool.
+        :param \*\*write_concern: The write concern settings.
+        :type \*\*write_concern: \*\*kwargs.
+
+        """
+
+        key = _document_key(collection, spec)
+
+        previous = self._updates.get(key)
+        if (previous and previous['upsert'] == upsert and
+                previous['write_concern'] == write_concern):
+            merged = _merge(previous['document'], document)
+            if merged is not None:
+                previous['document'] = merged
+                return
+
+        self._add('update', collection, spec, document, upsert,
+                  write_concern)
+
+    def _add(self, name, collection, spec, document, upsert, write_concern):
+        """Add an operation to the queue.
+
+        :param name: The type of write.
+        :type name: str.
+        :param collection: The collection to write to.
+        :type collection: :class:`~pymongo.collection.Collection`.
+        :param spec: The query for the document.
+        :type spec: dict.
+        :param document: The document to write.
+        :type document: dict.
+        :param upsert: Whether or not to insert the document if it
+                       doesn't exist.
+        :type upsert: bool.
+        :param write_concern: The write concern settings.
+        :type write_concern: dict.
+
+        """
+
+        operation = {
+            'name': name,
+            'collection': collection,
+            'spec': spec,
+            'document': document,
+            'upsert': upsert,
+            'write_concern': write_concern,
+        }
+        self._operations.append(operation)
+
+        key = _document_key(collection, spec)
+        if key is None:
+            return
+
+        if name == 'update':
+            self._updates[key] = operation
+        else:
+            # Later updates can't be merged into updates that came
+            # before an insert or remove of the same document.
+            self._updates.pop(key, None)
+
+    def __len__(self):
+        return len(self._operations)
+
+
+class WriteBehind(object):
+
+    """A queue of writes sent to the database by a background thread.
+
+    Writes are added to the queue and the caller returns right away. A
+    background thread takes writes off of the queue, merges and groups
+    them in a :class:`Session`, and sends them to the database. It sends
+    a batch once ``batch_size`` writes have been collected or
+    ``interval`` seconds have passed since the first one.
+
+    The queue holds at most ``maxsize`` writes. When it is full, adding
+    a write blocks until there is room, so that callers can't get too
+    far ahead of the database.
+
+    When a batch fails, ``on_error`` is called with the exception. The
+    exception is logged if there is no ``on_error``. Either way the
+    thread moves on to the next batch.
+
+    Any writes still queued when the interpreter exits are sent first.
+
+    :param maxsize: (optional) The largest number of writes to hold.
+    :type maxsize: int.
+    :param batch_size: (optional) The largest number of writes to send
+                       at once.
+    :type batch_size: int.
+    :param interval: (optional) The number of seconds to wait for more
+                     writes before sending a batch.
+    :type interval: float.
+    :param on_error: (optional) A function to call with exceptions.
+    :type on_error: callable.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    def __init__(self, maxsize=10000, batch_size=1000, interval=0.1,
+                 on_error=None):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.on_error = on_error
+
+        self._queue = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def flush(self):
+        """Wait until all of the queued writes have been sent."""
+
+        self._queue.join()
+
+    def insert(self, collection, doc_or_docs, **write_concern):
+        """Queue an insert.
+
+        See :meth:`Session.insert`.
+
+        """
+
+        self._put('insert', collection, doc_or_docs, **write_concern)
+
+        if isinstance(doc_or_docs, dict):
+            return doc_or_docs['_id']
+        return [document['_id'] for document in doc_or_docs]
+
+    def remove(self, collection, spec, **write_concern):
+        """Queue the removal of a single document.
+
+        See :meth:`Session.remove`.
+
+        """
+
+        self._put('remove', collection, spec, **write_concern)
+
+    def on_flush(self, callback):
+        """Call a function once the writes queued so far have been sent.
+
+        See :meth:`Session.on_flush`.
+
+        """
+
+        self._put('on_flush', callback)
+
+    def update(self, collection, spec, document, upsert=False,
+               **write_concern):
+        """Queue an update of a single document.
+
+        See :meth:`Session.update`.
+
+        """
+
+        self._put('update', collection, spec, document, upsert=upsert,
+                  **write_concern)
+
+    def _put(self, name, *args, **kwargs):
+        """Add a write to the queue, starting the thread if needed.
+
+        :param name: The name of the :class:`Session` method to call.
+        :type name: str.
+        :param \*args: The positional arguments for the method.
+        :type \*args: \*args.
+        :param \*\*kwargs: The keyword arguments for the method.
+        :type \*\*kwargs: \*\*kwargs.
+
+        """
+
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    thread = threading.Thread(target=self._run)
+                    thread.daemon = True
+                    thread.start()
+
+                    # Daemon threads are stopped when the interpreter
+                    # exits. Make sure they finish their work first.
+                    atexit.register(self.flush)
+
+                    self._thread = thread
+
+        # This will block when the queue is full.
+        self._queue.put((name, args, kwargs))
+
+    def _run(self):
+        """Send batches of writes to the database forever."""
+
+        while True:
+            self._send(self._take())
+
+    def _send(self, writes):
+        """Send writes to the database.
+
+        :param writes: The writes taken from the queue.
+        :type writes: list.
+
+        """
+
+        session = Session()
+        try:
+            for name, args, kwargs in writes:
+                getattr(session, name)(*args, **kwargs)
+            session.flush()
+        except Exception as e:
+            if self.on_error is not None:
+                self.on_error(e)
+            else:
+                logger.exception('Write-behind writes could not be sent.')
+        finally:
+            for _ in writes:
+                self._queue.task_done()
+
+    def _take(self):
+        """Take the next batch of writes off of the queue.
+
+        :returns: list -- the writes.
+
+        """
+
+        # Wait as long as it takes for the first write, but only up to
+        # interval for the rest of the batch. Writes that are already
+        # queued are always taken.
+        writes = [self._queue.get()]
+        deadline = time.time() + self.interval
+
+        while len(writes) < self.batch_size:
+            timeout = deadline - time.time()
+
+            try:
+                if timeout > 0:
+                    writes.append(self._queue.get(timeout=timeout))
+                else:
+                    writes.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return writes
+
+
+def flush_queued(write_behind=None):
+    """Send the writes that are waiting to be sent.
+
+    Writes that can't be queued, such as those that change many
+    documents at once, are sent to the database right away. The writes
+    queued before them are sent first so that they all happen in the
+    order they were made.
+
+    :param write_behind: (optional) A write-behind queue to wait for
+                         along with the current session.
+    :type write_behind: :class:`WriteBehind`.
+    :raises: :class:`~simon.exceptions.FlushError`
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    current = get_session()
+    if current is not None:
+        current.flush()
+
+    if write_behind:
+        write_behind.flush()
+
+
+def get_counters():
+    """Return the counter aggregator shared by models.
+
+    The aggregator is created the first time it's needed. It is used by
+    models that don't have ``Meta.counters`` of their own.
+
+    :returns: :class:`Counters` -- the aggregator.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    global _counters
+
+    if _counters is None:
+        with _shared_lock:
+            if _counters is None:
+                _counters = Counters()
+    return _counters
+
+
+def get_identity_map():
+    """Return the identity map in use by the current thread.
+
+    :returns: :class:`IdentityMap` -- the identity map, or ``None`` if
+              there isn't one.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    return getattr(_local, 'identity_map', None)
+
+
+def get_session():
+    """Return the session in progress for the current thread.
+
+    :returns: :class:`Session` -- the session, or ``None`` if there
+              isn't one.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    return getattr(_local, 'session', None)
+
+
+def get_write_behind():
+    """Return the write-behind queue shared by models.
+
+    The queue is created the first time it's needed. It is used by
+    models whose ``Meta.write_behind`` is ``True``.
+
+    :returns: :class:`WriteBehind` -- the queue.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    global _write_behind
+
+    if _write_behind is None:
+        with _shared_lock:
+            if _write_behind is None:
+                _write_behind = WriteBehind()
+    return _write_behind
+
+
+@contextmanager
+def identity_map():
+    """Load each document into a single instance.
+
+    Inside of the ``with`` block, retrieving a document that has already
+    been loaded returns the instance it was loaded into rather than a
+    new one. Getting a document by its ``_id`` alone doesn't go to the
+    database at all once it has been loaded.
+
+    Identity maps can be nested. A nested identity map is the same as
+    the outermost one.
+
+    :returns: :class:`IdentityMap` -- the identity map.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    current = get_identity_map()
+    if current is not None:
+        yield current
+        return
+
+    current = _local.identity_map = IdentityMap()
+    try:
+        yield current
+    finally:
+        _local.identity_map = None
+
+
+@contextmanager
+def session():
+    """Queue writes and send them to the database together.
+
+    Inside of the ``with`` block, inserts, updates, and deletes
+    performed by models are queued rather than sent to the database.
+    They are flushed when the block exits. If the block raises an
+    exception, the queued writes are discarded instead.
+
+    Writes that can't be queued, such as
+    :meth:`~simon.query.QuerySet.update` and
+    :meth:`~simon.query.QuerySet.delete`, flush the writes queued
+    before them and are then sent right away.
+
+    Sessions can be nested. Writes inside of a nested session are
+    added to the outermost one and sent when it ends.
+
+    :returns: :class:`Session` -- the session.
+    :raises: :class:`~simon.exceptions.FlushError`
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    current = get_session()
+    if current is not None:
+        yield current
+        return
+
+    current = _local.session = Session()
+    try:
+        yield current
+    finally:
+        _local.session = None
+
+    current.flush()
+
+
+def _document_key(collection, spec):
+    """Return a key identifying the document matched by ``spec``.
+
+    :param collection: The collection containing the document.
+    :type collection: :class:`~pymongo.collection.Collection`.
+    :param spec: The query for the document.
+    :type spec: dict.
+    :returns: tuple -- the key, or ``None`` if there isn't a usable
+              ``_id`` in ``spec``.
+
+    """
+
+    id = spec.get('_id')
+    if id is None:
+        return None
+
+    key = (collection.full_name, id)
+    try:
+        hash(key)
+    except TypeError:
+        # Values like embedded documents can't be used.
+        return None
+    return key
+
+
+def _execute_bulk(operations):
+    """Send operations to the database as an ordered bulk operation.
+
+    :param operations: The operations, all for the same collection and
+                       write concern.
+    :type operations: list.
+    :returns: list -- the errors reported by the database.
+
+    """
+
+    bulk = operations[0]['collection'].initialize_ordered_bulk_op()
+
+    for operation in operations:
+        if operation['name'] == 'insert':
+            bulk.insert(operation['document'])
+            continue
+
+        view = bulk.find(operation['spec'])
+        if operation['name'] == 'remove':
+            view.remove_one()
+            continue
+
+        if operation['upsert']:
+            view = view.upsert()
+        if is_atomic(operation['document']):
+            view.update_one(operation['document'])
+        else:
+            view.replace_one(operation['document'])
+
+    try:
+        bulk.execute(operations[0]['write_concern'] or None)
+    except BulkWriteError as e:
+        return [{'index': error['index'], 'message': error.get('errmsg'),
+                 'code': error.get('code')}
+                for error in e.details.get('writeErrors', [])]
+
+    return []
+
+
+def _execute_each(operations):
+    """Send operations to the database one at a time.
+
+    :param operations: The operations, all for the same collection and
+                       write concern.
+    :type operations: list.
+    :returns: list -- the error reported by the database, if any.
+
+    """
+
+    for index, operation in enumerate(operations):
+        collection = operation['collection']
+        write_concern = operation['write_concern']
+
+        try:
+            if operation['name'] == 'insert':
+                collection.insert(operation['document'], **write_concern)
+            elif operation['name'] == 'remove':
+                collection.remove(operation['spec'], **write_concern)
+            else:
+                collection.update(operation['spec'], operation['document'],
+                                  upsert=operation['upsert'],
+                                  **write_concern)
+        except OperationFailure as e:
+            return [{'index': index, 'message': str(e),
+                     'code': getattr(e, 'code', None)}]
+
+    return []
+
+
+def _merge(document, update):
+    """Merge two atomic updates into one.
+
+    :param document: The earlier update.
+    :type document: dict.
+    :param update: The later update.
+    :type update: dict.
+    :returns: dict -- the merged update, or ``None`` if the updates
+              can't be combined.
+
+    """
+
+    if not (is_atomic(document) and is_atomic(update)):
+        return None
+
+    # Copy everything so the original updates are left alone in case
+    # they can't be merged.
+    merged = dict((k, dict(v)) for k, v in iteritems(document))
+
+    for operator, fields in iteritems(update):
+        current = merged.setdefault(operator, {})
+
+        for k, v in iteritems(fields):
+            # A field can only be touched by one operator.
+            if any(_overlaps(k, other) for name, other in iteritems(merged)
+                   if name != operator):
+                return None
+
+            if k in current:
+                if operator == '$set':
+                    current[k] = v
+                elif operator == '$inc':
+                    current[k] += v
+                elif operator != '$unset':
+                    return None
+            elif _overlaps(k, current):
+                # One of the fields is embedded within the other.
+                return None
+            else:
+                current[k] = v
+
+    return merged
+
+
+def _overlaps(key, fields):
+    """Check whether ``key`` refers to the same data as any of ``fields``.
+
+    :param key: The key, using ``.`` for nested keys.
+    :type key: str.
+    :param fields: The other keys.
+    :type fields: iterable.
+    :returns: bool -- ``True`` if the keys overlap.
+
+    """
+
+    return any(k == key or k.startswith(key + '.') or
+               key.startswith(k + '.') for k in fields)
+
+
+def _runs(operations):
+    """Group consecutive operations that can be sent together.
+
+    :param operations: The operations.
+    :type operations: list.
+    :returns: generator -- lists of operations for the same collection
+              and write concern.
+
+    """
+
+    run = []
+    for operation in operations:
+        if run and (
+                run[-1]['collection'].full_name !=
+                operation['collection'].full_name or
+                run[-1]['write_concern'] != operation['write_concern']):
+            yield run
+            run = []
+        run.append(operation)
+
+    if run:
+        yield run
@@ -41,8 +41,9 @@ from bson import ObjectId
 from .connection import pymongo_supports_mongoclient
 
 __all__ = ('current_datetime', 'get_nested_key', 'guarantee_object_id',
-           'ignored', 'is_atomic', 'map_fields', 'parse_kwargs',
-           'remove_nested_key', 'set_write_concern', 'update_nested_keys')
+           'ignored', 'is_atomic', 'map_fields', 'map_key', 'parse_kwargs',
+           'remove_nested_key', 'set_nested_key', 'set_write_concern',
+           'update_nested_keys')
 
 
 # The logical operators are needed when mapping fields. The values
@@ -50,6 +51,21 @@ __all__ = ('current_datetime', 'get_nested_key', 'guarantee_object_id',
 # the utils module to depend on other modules.
 _logicals = ('$and', '$or')
 
+# The operators that can be appended to keys with __, and the ones that
+# need to be cased when they are.
+_operators = frozenset(('addToSet', 'addtoset', 'all', 'avg', 'elemMatch',
+                        'elemmatch', 'exists', 'first', 'gt', 'gte', 'in',
+                        'last', 'lt', 'lte', 'max', 'min', 'ne', 'near',
+                        'nin', 'push', 'size', 'sum'))
+_operators_cased = {'addtoset': 'addToSet', 'elemmatch': 'elemMatch'}
+
+# map_fields() is called for nearly every attribute access and query,
+# usually with the same handful of keys. The string handling done to
+# translate each key is remembered, up to _max_memo_size of them.
+_mapped_keys = {}
+_parsed_operators = {}
+_max_memo_size = 10000
+
 
 def current_datetime():
     """Get the current datetime in UTC formatted for MongoDB.
@@ -266,6 +282,10 @@ def map_fields(field_map, fields, with_operators=False, flatten_keys=False):
     :returns: dict -- key/value pairs renamed based on ``cls``'s
               ``field_map`` mapping.
 
+    .. versionchanged:: 0.8.0
+       The translations of keys are remembered
+       ``__not`` no longer strips the end of the key before it
+
     .. versionchanged:: 0.7.0
        ``$group`` operators are supported
        All lowercase operators are supported
@@ -273,42 +293,20 @@ def map_fields(field_map, fields, with_operators=False, flatten_keys=False):
     """
 
     if with_operators:
-        operators = ('addToSet', 'addtoset', 'all', 'avg', 'elemMatch',
-                     'elemmatch', 'exists', 'first', 'gt', 'gte', 'in', 'last',
-                     'lt', 'lte', 'max', 'min', 'ne', 'near', 'nin', 'push',
-                     'size', 'sum')
-        operators_cased = {'addtoset': 'addToSet', 'elemmatch': 'elemMatch'}
+        for k, v in list(fields.items()):
+            parsed = _parse_operator(k)
+            if parsed is None:
+                continue
 
-        for k, v in fields.items():
-            # To figure out if a key includes an operator, split it
-            # into two pieces. The first piece will be the actual key
-            # and the second will be the operator.
-            operator = k.rsplit('__', 1)
-
-            if len(operator) == 2:
-                if operator[1] in operators:
-                    # If there is an operator, add the actual key to
-                    # the fields dictionary, giving it a value that is
-                    # a dictionary using the MongoDB operator as its key
-                    # and remove the original key and operator
-                    # combination from the fields dictionary.
-                    if operator[0].endswith('__not'):
-                        # If $not is being used, the query needs to be
-                        # restructured a little, so let's trick the
-                        # line that adds the operator to the query.
-                        v = {'${0}'.format(operator[1]): v}
-                        operator = operator[0].rstrip('__not'), 'not'
-
-                    # Operators are case sensitive as camel case.
-                    # Because the operators are intended to be used as
-                    # kwargs, writing them as such will appear out of
-                    # place. This check allows the operators to be
-                    # specified using lowercase.
-                    if operator[1] in operators_cased:
-                        operator[1] = operators_cased[operator[1]]
-
-                    fields[operator[0]] = {'${0}'.format(operator[1]): v}
-                    del fields[k]
+            # If there is an operator, add the actual key to the fields
+            # dictionary, giving it a value that is a dictionary using
+            # the MongoDB operator as its key and remove the original
+            # key and operator combination from the fields dictionary.
+            key, operator, inner = parsed
+            if inner:
+                v = {inner: v}
+            fields[key] = {operator: v}
+            del fields[k]
 
     second_pass = False
 
@@ -328,37 +326,13 @@ def map_fields(field_map, fields, with_operators=False, flatten_keys=False):
                                 with_operators=with_operators,
                                 flatten_keys=flatten_keys) for x in v]
         else:
-            if '__' in k:
-                second_pass = True
-            # If the attribute contains __, use a . instead as this is
-            # the syntax for mapping embedded keys. If a . exists in the
-            # new key, second_pass should be set to True because
-            # parse_kwargs() should be run
-            k = field_map.get(k.replace('__', '.'), k)
-            if '.' in k:
+            k, nested = _map_key(field_map, k, flatten_keys)
+            if nested:
                 second_pass = True
 
-        mapped_fields[k.replace('.', '__')] = v
-
-    if flatten_keys:
-        # Flattened keys are not nested and are written out with .s as
-        # the delimiter between each level
-        fields = {}
-        for k, v in mapped_fields.items():
-            # A __ at either the beginning or end of a key name should
-            # not be replaced by a ., to prevent this from happening,
-            # the replacement should only happen on the characters
-            # between the first and last ones.
-            #
-            # If a key is only one character long, there is obviously
-            # no chance of a __ and therefore no need to process the
-            # key. It's important to check for this because k[0] and
-            # k[-1] would both return the single character.
-            if len(k) > 1:
-                k = ''.join([k[0], k[1:-1].replace('__', '.'), k[-1]])
-            fields[k] = v
-        mapped_fields = fields
-    elif second_pass:
+        mapped_fields[k] = v
+
+    if second_pass and not flatten_keys:
         # At this point a second pass is needed, put the fields through
         # the kwarg parser and then see if any of the top level fields
         # need to be mapped
@@ -373,6 +347,29 @@ def map_fields(field_map, fields, with_operators=False, flatten_keys=False):
     return mapped_fields
 
 
+def map_key(field_map, key):
+    """Map a single attribute name to a document key.
+
+    This is the same as calling :func:`map_fields` with ``flatten_keys``
+    set and taking the only key of the result, without building any
+    dictionaries.
+
+    :param field_map: Key/value pairs defining the field map.
+    :type field_map: dict.
+    :param key: The attribute name, using ``__`` or ``.`` for nested
+                keys.
+    :type key: str.
+    :returns: str -- the document key, using ``.`` for nested keys.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    if key in _logicals:
+        return key
+    return _map_key(field_map, key, True)[0]
+
+
 def parse_kwargs(**kwargs):
     """Parse embedded documents from dictionary keys.
 
@@ -452,6 +449,46 @@ def remove_nested_key(original, key):
     return original
 
 
+def set_nested_key(original, key, value):
+    """Set the value of a key within a nested dictionary.
+
+    Nested keys should be specified using a ``.`` as the delimiter. Any
+    dictionaries along the way that don't exist, or that aren't
+    dictionaries, are created. Unlike :func:`update_nested_keys`,
+    ``value`` replaces whatever was there rather than being merged
+    with it.
+
+    If ``original`` is not a dictionary, a :class:`TypeError` will be
+    raised.
+
+    :param original: The original dictionary to be updated.
+    :type original: dict.
+    :param key: The key to be set.
+    :type key: str.
+    :param value: The value.
+    :returns: dict -- the updated dictionary
+    :raises: :class:`TypeError`
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    if not isinstance(original, collections.Mapping):
+        raise TypeError("'original' must be a dict.")
+
+    document = original
+    if '.' in key:
+        keys = key.split('.')
+        key = keys.pop()
+        for k in keys:
+            if not isinstance(document.get(k), collections.Mapping):
+                document[k] = {}
+            document = document[k]
+    document[key] = value
+
+    return original
+
+
 def set_write_concern_as_safe(options, force_write_concern):
     """Set the safe parameter for write concern.
 
@@ -552,3 +589,119 @@ def update_nested_keys(original, updates):
         else:
             original[k] = updates[k]
     return original
+
+
+def _map_key(field_map, key, flatten_keys):
+    """Return the document key for an attribute name.
+
+    ``field_map`` is always consulted, so changes made to it are picked
+    up right away. What is remembered is the rest of the translation,
+    by the name, the value found in ``field_map``, and
+    ``flatten_keys``.
+
+    :param field_map: Key/value pairs defining the field map.
+    :type field_map: dict.
+    :param key: The attribute name.
+    :type key: str.
+    :param flatten_keys: Whether nested keys should use ``.``.
+    :type flatten_keys: bool.
+    :returns: tuple -- the key, and whether it's for an embedded
+              document.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    # If the attribute contains __, use a . instead as this is the
+    # syntax for mapping embedded keys.
+    mapped = field_map.get(key.replace('__', '.'), key)
+
+    memo_key = (key, mapped, flatten_keys)
+    try:
+        return _mapped_keys[memo_key]
+    except KeyError:
+        pass
+
+    nested = '__' in key
+
+    # If a . exists in the new key, it's for an embedded document, too.
+    if '.' in mapped:
+        nested = True
+    mapped = mapped.replace('.', '__')
+
+    # Flattened keys are not nested and are written out with .s as the
+    # delimiter between each level. A __ at either the beginning or end
+    # of a key name should not be replaced by a ., so the replacement
+    # only happens on the characters between the first and last ones.
+    # A key that is only one character long can't contain a __.
+    if flatten_keys and len(mapped) > 1:
+        mapped = ''.join([mapped[0], mapped[1:-1].replace('__', '.'),
+                          mapped[-1]])
+
+    result = mapped, nested
+    _remember(_mapped_keys, memo_key, result)
+    return result
+
+
+def _parse_operator(key):
+    """Split an operator appended to a key with ``__`` from the key.
+
+    :param key: The key.
+    :type key: str.
+    :returns: tuple -- the key, the MongoDB operator, and the operator
+              it wraps (``$not`` wraps another one, otherwise this is
+              ``None``), or ``None`` if the key has no operator.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    try:
+        return _parsed_operators[key]
+    except KeyError:
+        pass
+
+    # To figure out if a key includes an operator, split it into two
+    # pieces. The first piece will be the actual key and the second
+    # will be the operator.
+    parts = key.rsplit('__', 1)
+
+    result = None
+    if len(parts) == 2 and parts[1] in _operators:
+        field, operator = parts
+
+        # Operators are case sensitive as camel case. Because the
+        # operators are intended to be used as kwargs, writing them as
+        # such will appear out of place. This check allows the
+        # operators to be specified using lowercase.
+        operator = '${0}'.format(_operators_cased.get(operator, operator))
+
+        if field.endswith('__not'):
+            # If $not is being used, the operator is wrapped in it.
+            result = field[:-len('__not')], '$not', operator
+        else:
+            result = field, operator, None
+
+    _remember(_parsed_operators, key, result)
+    return result
+
+
+def _remember(memo, key, value):
+    """Add a value to a memo, making room for it if needed.
+
+    Rather than tracking which entries were used least recently, the
+    memo is emptied once it's full. Any keys that are still in use are
+    quickly added back.
+
+    :param memo: The memo.
+    :type memo: dict.
+    :param key: The key.
+    :param value: The value.
+
+    .. versionadded:: 0.8.0
+
+    """
+
+    if len(memo) >= _max_memo_size:
+        memo.clear()
+    memo[key] = value
@@ -11,7 +11,8 @@ import warnings
 from bson.son import SON
 import mock
 
-from simon import Model, connection
+from simon import Model, connection, sessions
+from simon.cache import QueryCache
 from simon.query import Q
 
 from .utils import AN_OBJECT_ID, ModelFactory, skip_with_py3
@@ -231,13 +232,114 @@ class TestModel(unittest.TestCase):
     def test_get_or_create_create(self):
         """Test the `get_or_create()` method for creating documents."""
 
-        with mock.patch.object(DefaultModel, 'get') as get:
-            with mock.patch.object(DefaultModel, 'create') as create:
-                get.side_effect = DefaultModel.NoDocumentFound
+        with mock.patch.object(DefaultModel._meta.db,
+                               'find_and_modify') as find_and_modify:
+            with mock.patch('simon.base.current_datetime') as now:
+                now.return_value = datetime(2012, 12, 21)
+
+                find_and_modify.return_value = {
+                    'value': {'_id': AN_OBJECT_ID, 'a': 1},
+                    'lastErrorObject': {'updatedExisting': False},
+                }
+
+                m, created = DefaultModel.get_or_create(_id=AN_OBJECT_ID, a=1,
+                                                        b__gt=2)
+
+                find_and_modify.assert_called_with(
+                    {'_id': AN_OBJECT_ID, 'a': 1, 'b': {'$gt': 2}},
+                    {'$setOnInsert': {'_id': AN_OBJECT_ID, 'a': 1,
+                                      'created': datetime(2012, 12, 21),
+                                      'modified': datetime(2012, 12, 21)}},
+                    upsert=True, new=True, full_response=True)
+
+                self.assertEqual(m._document, {'_id': AN_OBJECT_ID, 'a': 1})
+                self.assertTrue(created)
+
+    def test_get_or_create_create_query_cache(self):
+        ("Test that `get_or_create()` removes the collection's results "
+         "from the query cache when creating a document.")
+
+        CachedModel = ModelFactory('CachedModel', query_cache=QueryCache())
+        collection = CachedModel._meta.db.full_name
+
+        with mock.patch.object(CachedModel._meta.db,
+                               'find_and_modify') as find_and_modify:
+            find_and_modify.return_value = {
+                'value': {'_id': AN_OBJECT_ID, 'a': 1},
+                'lastErrorObject': {'updatedExisting': True},
+            }
+
+            CachedModel._meta.query_cache.set(collection, (), [])
+            CachedModel.get_or_create(_id=AN_OBJECT_ID, a=1)
+
+            # Nothing was written, so the results are still good.
+            self.assertEqual(len(CachedModel._meta.query_cache), 1)
+
+            find_and_modify.return_value['lastErrorObject'] = {
+                'updatedExisting': False,
+            }
+
+            CachedModel.get_or_create(_id=AN_OBJECT_ID, a=1)
+
+            self.assertEqual(len(CachedModel._meta.query_cache), 0)
+
+    def test_get_or_create_session(self):
+        ("Test that `get_or_create()` sends the writes queued before "
+         "it first.")
+
+        m = DefaultModel(a=1)
+
+        with mock.patch.object(DefaultModel._meta.db,
+                               'find_and_modify') as find_and_modify:
+            with mock.patch.object(DefaultModel._meta.db, 'insert') as insert:
+                find_and_modify.return_value = {
+                    'value': {'_id': AN_OBJECT_ID, 'a': 1},
+                    'lastErrorObject': {'updatedExisting': True},
+                }
+
+                def check(*args, **kwargs):
+                    self.assertTrue(insert.called)
+                    return find_and_modify.return_value
+                find_and_modify.side_effect = check
+
+                with mock.patch('simon.sessions.BulkWriteError', None):
+                    with sessions.session() as session:
+                        m.save()
+                        DefaultModel.get_or_create(a=1)
+
+                        self.assertEqual(len(session), 0)
+
+                self.assertEqual(insert.call_count, 1)
+                self.assertTrue(find_and_modify.called)
+
+    def test_get_or_create_get(self):
+        """Test the `get_or_create()` method for getting documents."""
+
+        with mock.patch.object(DefaultModel._meta.db,
+                               'find_and_modify') as find_and_modify:
+            find_and_modify.return_value = {
+                'value': {'_id': AN_OBJECT_ID, 'a': 1},
+                'lastErrorObject': {'updatedExisting': True},
+            }
+
+            m, created = DefaultModel.get_or_create(_id=AN_OBJECT_ID)
+
+            self.assertEqual(m._document, {'_id': AN_OBJECT_ID, 'a': 1})
+            self.assertFalse(created)
+
+    def test_get_or_create_required_fields(self):
+        ("Test that `get_or_create()` uses `get()` and `create()` "
+         "without the required fields.")
+
+        RequiredModel = ModelFactory('RequiredModel', required_fields=('b',))
+
+        with mock.patch.object(RequiredModel, 'get') as get:
+            with mock.patch.object(RequiredModel, 'create') as create:
+                get.side_effect = RequiredModel.NoDocumentFound
 
                 create.return_value = mock.Mock()
 
-                m, created = DefaultModel.get_or_create(_id=AN_OBJECT_ID)
+                m, created = RequiredModel.get_or_create(_id=AN_OBJECT_ID)
 
                 get.assert_called_with(_id=AN_OBJECT_ID)
                 # Because get_or_create() is being called without
@@ -247,15 +349,10 @@ class TestModel(unittest.TestCase):
 
                 self.assertTrue(created)
 
-    def test_get_or_create_get(self):
-        """Test the `get_or_create()` method for getting documents."""
-
-        with mock.patch.object(DefaultModel, 'get') as get:
+            get.side_effect = None
             get.return_value = mock.Mock()
 
-            m, created = DefaultModel.get_or_create(_id=AN_OBJECT_ID)
-
-            get.assert_called_with(_id=AN_OBJECT_ID)
+            m, created = RequiredModel.get_or_create(_id=AN_OBJECT_ID)
 
             self.assertFalse(created)
 
@@ -300,11 +397,13 @@ class TestModel(unittest.TestCase):
         with mock.patch.object(DefaultModel, '_update') as _update:
             m.increment('a')
 
-            _update.assert_called_with({'$inc': {'a': 1}}, safe=None, w=None)
+            _update.assert_called_with({'$inc': {'a': 1}}, reload=None,
+                                       safe=None, w=None)
 
             m.increment('a', 2)
 
-            _update.assert_called_with({'$inc': {'a': 2}}, safe=None, w=None)
+            _update.assert_called_with({'$inc': {'a': 2}}, reload=None,
+                                       safe=None, w=None)
 
     def test_increment_multiple(self):
         """Test the `increment()` method with multiple fields."""
@@ -314,8 +413,8 @@ class TestModel(unittest.TestCase):
         with mock.patch.object(DefaultModel, '_update') as _update:
             m.increment(a=1, b=2)
 
-            _update.assert_called_with({'$inc': {'a': 1, 'b': 2}}, safe=None,
-                                       w=None)
+            _update.assert_called_with({'$inc': {'a': 1, 'b': 2}}, reload=None,
+                                       safe=None, w=None)
 
     def test_increment_valueerror(self):
         """Test that `increment()` raises `ValueError`."""
@@ -368,15 +467,18 @@ class TestModel(unittest.TestCase):
         with mock.patch.object(DefaultModel, '_update') as _update:
             m.pop('a')
 
-            _update.assert_called_with({'$pop': {'a': 1}}, safe=None, w=None)
+            _update.assert_called_with({'$pop': {'a': 1}}, reload=None,
+                                       safe=None, w=None)
 
             m.pop(['a'])
 
-            _update.assert_called_with({'$pop': {'a': 1}}, safe=None, w=None)
+            _update.assert_called_with({'$pop': {'a': 1}}, reload=None,
+                                       safe=None, w=None)
 
             m.pop('-a')
 
-            _update.assert_called_with({'$pop': {'a': -1}}, safe=None, w=None)
+            _update.assert_called_with({'$pop': {'a': -1}}, reload=None,
+                                       safe=None, w=None)
 
     def test_pop_multiple(self):
         """Test the `pop()` method with multiple fields."""
@@ -386,18 +488,18 @@ class TestModel(unittest.TestCase):
         with mock.patch.object(DefaultModel, '_update') as _update:
             m.pop(('a', 'b'))
 
-            _update.assert_called_with({'$pop': {'a': 1, 'b': 1}}, safe=None,
-                                       w=None)
+            _update.assert_called_with({'$pop': {'a': 1, 'b': 1}}, reload=None,
+                                       safe=None, w=None)
 
             m.pop(('a', '-b'))
 
-            _update.assert_called_with({'$pop': {'a': 1, 'b': -1}}, safe=None,
-                                       w=None)
+            _update.assert_called_with({'$pop': {'a': 1, 'b': -1}},
+                                       reload=None, safe=None, w=None)
 
             m.pop(('-a', '-b'))
 
             _update.assert_called_with({'$pop': {'a': -1, 'b': -1}},
-                                       safe=None, w=None)
+                                       reload=None, safe=None, w=None)
 
     def test_pull(self):
         """Test the `pull()` method."""
@@ -407,21 +509,23 @@ class TestModel(unittest.TestCase):
         with mock.patch.object(DefaultModel, '_update') as _update:
             m.pull('a', 1)
 
-            _update.assert_called_with({'$pull': {'a': 1}}, safe=None, w=None)
+            _update.assert_called_with({'$pull': {'a': 1}}, reload=None,
+                                       safe=None, w=None)
 
             m.pull('a', [1, 2])
 
-            _update.assert_called_with({'$pullAll': {'a': [1, 2]}}, safe=None,
-                                       w=None)
+            _update.assert_called_with({'$pullAll': {'a': [1, 2]}},
+                                       reload=None, safe=None, w=None)
 
             m.pull(a=2)
 
-            _update.assert_called_with({'$pull': {'a': 2}}, safe=None, w=None)
+            _update.assert_called_with({'$pull': {'a': 2}}, reload=None,
+                                       safe=None, w=None)
 
             m.pull(a=[2, 3])
 
-            _update.assert_called_with({'$pullAll': {'a': [2, 3]}}, safe=None,
-                                       w=None)
+            _update.assert_called_with({'$pullAll': {'a': [2, 3]}},
+                                       reload=None, safe=None, w=None)
 
     def test_pull_multiple(self):
         """Test the `pull()` method with multiple fields."""
@@ -431,20 +535,20 @@ class TestModel(unittest.TestCase):
         with mock.patch.object(DefaultModel, '_update') as _update:
             m.pull(a=1, b=2)
 
-            _update.assert_called_with({'$pull': {'a': 1, 'b': 2}}, safe=None,
-                                       w=None)
+            _update.assert_called_with({'$pull': {'a': 1, 'b': 2}},
+                                       reload=None, safe=None, w=None)
 
             m.pull(a=1, b=[2, 3])
 
             _update.assert_called_with({'$pull': {'a': 1},
                                         '$pullAll': {'b': [2, 3]}},
-                                       safe=None, w=None)
+                                       reload=None, safe=None, w=None)
 
             m.pull(a=[1, 2], b=[3, 4])
 
             _update.assert_called_with({'$pullAll': {'a': [1, 2],
                                                      'b': [3, 4]}},
-                                       safe=None, w=None)
+                                       reload=None, safe=None, w=None)
 
     def test_pull_valueerror(self):
         """Test that `pull()` raises `ValueError`."""
@@ -465,21 +569,23 @@ class TestModel(unittest.TestCase):
         with mock.patch.object(DefaultModel, '_update') as _update:
             m.push('a', 1)
 
-            _update.assert_called_with({'$push': {'a': 1}}, safe=None, w=None)
+            _update.assert_called_with({'$push': {'a': 1}}, reload=None,
+                                       safe=None, w=None)
 
             m.push('a', [1, 2])
 
-            _update.assert_called_with({'$pushAll': {'a': [1, 2]}}, safe=None,
-                                       w=None)
+            _update.assert_called_with({'$pushAll': {'a': [1, 2]}},
+                                       reload=None, safe=None, w=None)
 
             m.push(a=2)
 
-            _update.assert_called_with({'$push': {'a': 2}}, safe=None, w=None)
+            _update.assert_called_with({'$push': {'a': 2}}, reload=None,
+                                       safe=None, w=None)
 
             m.push(a=[2, 3])
 
-            _update.assert_called_with({'$pushAll': {'a': [2, 3]}}, safe=None,
-                                       w=None)
+            _update.assert_called_with({'$pushAll': {'a': [2, 3]}},
+                                       reload=None, safe=None, w=None)
 
     def tet_push_addtoset(self):
         """Test the `push()` method with `$addToSet`."""
@@ -515,20 +621,20 @@ class TestModel(unittest.TestCase):
         with mock.patch.object(DefaultModel, '_update') as _update:
             m.push(a=1, b=2)
 
-            _update.assert_called_with({'$push': {'a': 1, 'b': 2}}, safe=None,
-                                       w=None)
+            _update.assert_called_with({'$push': {'a': 1, 'b': 2}},
+                                       reload=None, safe=None, w=None)
 
             m.push(a=1, b=[2, 3])
 
             _update.assert_called_with({'$push': {'a': 1},
                                         '$pushAll': {'b': [2, 3]}},
-                                       safe=None, w=None)
+                                       reload=None, safe=None, w=None)
 
             m.push(a=[1, 2], b=[3, 4])
 
             _update.assert_called_with({'$pushAll': {'a': [1, 2],
                                                      'b': [3, 4]}},
-                                       safe=None, w=None)
+                                       reload=None, safe=None, w=None)
 
     def test_push_multiple_addto_set(self):
         ("Test the `push()` method with multiple fields with "
@@ -540,19 +646,19 @@ class TestModel(unittest.TestCase):
             m.push(a=1, b=2, allow_duplicates=False)
 
             _update.assert_called_with({'$addToSet': {'a': 1, 'b': 2}},
-                                       safe=None, w=None)
+                                       reload=None, safe=None, w=None)
 
             m.push(a=1, b=[2, 3], allow_duplicates=False)
 
             _update.assert_called_with({'$addToSet': {'a': 1,
                                                       'b': {'$each': [2, 3]}}},
-                                       safe=None, w=None)
+                                       reload=None, safe=None, w=None)
 
             m.push(a=[1, 2], b=[3, 4], allow_duplicates=False)
 
             _update.assert_called_with({'$addToSet': {'a': {'$each': [1, 2]},
                                                       'b': {'$each': [3, 4]}}},
-                                       safe=None, w=None)
+                                       reload=None, safe=None, w=None)
 
     def test_push_valueerror(self):
         """Test that `push()` raises `ValueError`."""
@@ -573,7 +679,8 @@ class TestModel(unittest.TestCase):
         with mock.patch.object(DefaultModel, '_update') as _update:
             m.raw_update({'$set': {'a': 1}})
 
-            _update.assert_called_with({'$set': {'a': 1}}, safe=None, w=None)
+            _update.assert_called_with({'$set': {'a': 1}}, reload=None,
+                                       safe=None, w=None)
 
     def test_remove_fields(self):
         """Test the `remove_fields()` method."""
@@ -604,8 +711,8 @@ class TestModel(unittest.TestCase):
         with mock.patch.object(DefaultModel, '_update') as _update:
             m.rename('a', 'b')
 
-            _update.assert_called_with({'$rename': {'a': 'b'}}, safe=None,
-                                       w=None)
+            _update.assert_called_with({'$rename': {'a': 'b'}}, reload=None,
+                                       safe=None, w=None)
 
     def test_rename_multiple(self):
         """Test the `rename()` method with multiple fields."""
@@ -616,7 +723,7 @@ class TestModel(unittest.TestCase):
             m.rename(a='b', c='d')
 
             _update.assert_called_with({'$rename': {'a': 'b', 'c': 'd'}},
-                                       safe=None, w=None)
+                                       reload=None, safe=None, w=None)
 
     def test_rename_valueerror(self):
         """Test that `rename()` raises `ValueError`."""
@@ -660,6 +767,111 @@ class TestModel(unittest.TestCase):
             _update.assert_called_with({'a': 1}, safe=None, w=None,
                                        upsert=True)
 
+    def test_save_id(self):
+        ("Test that `save()` saves new documents with an `_id` in their "
+         "entirety.")
+
+        TestModel = ModelFactory('TestModel', auto_timestamp=False)
+
+        m = TestModel(_id=AN_OBJECT_ID, a=1)
+
+        with mock.patch.object(TestModel, '_update') as _update:
+            m.save()
+
+            _update.assert_called_with({'a': 1}, safe=None, w=None,
+                                       upsert=True)
+
+            # Once it's been saved, only the changes are saved.
+            m.a = 2
+            m.save()
+
+            _update.assert_called_with({'$set': {'a': 1}},
+                                       use_internal=True, safe=None, w=None)
+
+    def test_save_id_required_fields(self):
+        ("Test that `save()` enforces `required_fields` for new "
+         "documents with an `_id`.")
+
+        TestModel = ModelFactory('TestModel', required_fields=('b',),
+                                 typed_fields={'_id': None})
+
+        m = TestModel(_id='a', a=1)
+
+        with mock.patch.object(TestModel._meta.db, 'update') as update:
+            with self.assertRaises(TypeError):
+                m.save()
+
+            self.assertFalse(update.called)
+
+    def test_save_changed(self):
+        """Test that `save()` only saves fields that have changed."""
+
+        TestModel = ModelFactory('TestModel', auto_timestamp=False)
+
+        m = TestModel._from_db({'_id': AN_OBJECT_ID, 'a': 1, 'b': 2, 'c': 3})
+
+        # Nothing is tracked until something changes.
+        self.assertIsNone(m._changed)
+
+        m.a = 4
+        del m.b
+
+        with mock.patch.object(TestModel, '_update') as _update:
+            m.save()
+
+            _update.assert_called_with({'$set': {'a': 1}, '$unset': {'b': 1}},
+                                       use_internal=True, safe=None, w=None)
+
+        self.assertFalse(m._changed)
+
+    def test_save_changed_mutable(self):
+        """Test that `save()` saves mutable fields that were retrieved."""
+
+        TestModel = ModelFactory('TestModel', auto_timestamp=False)
+
+        m = TestModel._from_db({'_id': AN_OBJECT_ID, 'a': [1], 'b': 1})
+        m.a.append(2)
+        m.b
+
+        with mock.patch.object(TestModel, '_update') as _update:
+            m.save()
+
+            _update.assert_called_with({'$set': {'a': 1}}, use_internal=True,
+                                       safe=None, w=None)
+
+    def test_save_changed_nested(self):
+        """Test that `save()` doesn't save keys within changed keys."""
+
+        TestModel = ModelFactory('TestModel', auto_timestamp=False)
+
+        m = TestModel._from_db({'_id': AN_OBJECT_ID, 'a': {'b': 1, 'c': 1}})
+        m.a__b = 2
+
+        with mock.patch.object(TestModel, '_update') as _update:
+            m.save()
+
+            _update.assert_called_with({'$set': {'a.b': 1}},
+                                       use_internal=True, safe=None, w=None)
+
+            m.a__c = 2
+            m.a['d'] = 3
+            m.save()
+
+            _update.assert_called_with({'$set': {'a': 1}}, use_internal=True,
+                                       safe=None, w=None)
+
+    def test_save_changed_nothing(self):
+        """Test that `save()` doesn't save documents without changes."""
+
+        TestModel = ModelFactory('TestModel', auto_timestamp=False)
+
+        m = TestModel._from_db({'_id': AN_OBJECT_ID, 'a': 1})
+
+        with mock.patch.object(TestModel, '_update') as _update:
+            m.save()
+
+            _update.assert_not_called()
+
     def test_save_exception(self):
         """Test that `save()` raises the exception it catches."""
 
@@ -729,6 +941,21 @@ class TestModel(unittest.TestCase):
             self.assertNotIn('created', m2._document)
             self.assertIsInstance(m2._document['modified'], datetime)
 
+    def test_save_timestamps_missing(self):
+        ("Test that `save()` sets `modified` for documents that don't "
+         "have it.")
+
+        m = DefaultModel._from_db({'_id': AN_OBJECT_ID, 'a': 1})
+        m.a = 2
+
+        with mock.patch.object(DefaultModel, '_update') as _update:
+            m.save()
+
+            _update.assert_called_with({'$set': {'a': 1, 'modified': 1}},
+                                       use_internal=True, safe=None, w=None)
+
+        self.assertIsInstance(m._document['modified'], datetime)
+
     def test_save_timestamps_reset(self):
         ("Test that `save()` properly resets timestamps after an "
          "exception.")
@@ -799,6 +1026,25 @@ class TestModel(unittest.TestCase):
         self.assertIn('real', m._document)
         self.assertEqual(m._document['real'], 1)
 
+    def test_setattr_merge(self):
+        ("Test that `__setattr__()` merges documents into existing "
+         "ones.")
+
+        m = DefaultModel()
+
+        value = {'b': 1}
+        m.a = value
+        m.a = {'c': {'d': 1}}
+        m.a__c = {'e': 2}
+        self.assertEqual(m._document['a'], {'b': 1, 'c': {'d': 1, 'e': 2}})
+        self.assertEqual(value, {'b': 1})
+
+        # Other values are replaced.
+        m.a__c = 1
+        self.assertEqual(m._document['a'], {'b': 1, 'c': 1})
+        m.a__c = {'f': 3}
+        self.assertEqual(m._document['a'], {'b': 1, 'c': {'f': 3}})
+
     def test_str(self):
         """Test the `__str__()` method."""
 
@@ -892,6 +1138,110 @@ class TestModelMetaClass(unittest.TestCase):
         self.assertTrue(hasattr(DefaultModel, 'MultipleDocumentsFound'))
         self.assertTrue(hasattr(DefaultModel, 'NoDocumentFound'))
 
+    def test_fields(self):
+        """Test the `_meta.fields` attribute."""
+
+        class FieldModel(Model):
+            class Meta:
+                field_map = {'fake': 'real', 'x': 'location.x'}
+                typed_fields = {'a': int, 'save': int}
+
+        self.assertEqual(FieldModel._meta.fields,
+                         frozenset(['_id', 'a', 'fake', 'id']))
+        self.assertEqual(FieldModel.fake.key, 'real')
+        self.assertEqual(FieldModel.id.key, '_id')
+
+        m = FieldModel()
+
+        m.fake = 1
+        self.assertEqual(m._document, {'real': 1})
+        self.assertEqual(m._changed, set(['real']))
+        self.assertEqual(m.fake, 1)
+
+        del m.fake
+        self.assertEqual(m._document, {})
+        with self.assertRaises(AttributeError):
+            m.fake
+        with self.assertRaises(AttributeError):
+            del m.fake
+
+        # Documents are still merged.
+        m.a = {'b': 1}
+        m.a = {'c': 2}
+        self.assertEqual(m._document['a'], {'b': 1, 'c': 2})
+
+        # Mutable values are still tracked.
+        m._changed.clear()
+        m.a
+        self.assertEqual(m._changed, set(['a']))
+
+        m.x = 3
+        self.assertEqual(m._document['location'], {'x': 3})
+
+        # A field_map given after the class was created is still used.
+        SubModel = ModelFactory('SubModel', spec=FieldModel,
+                                field_map={'fake': 'other'})
+
+        m = SubModel(fake=1)
+        self.assertEqual(m._document, {'other': 1})
+        self.assertEqual(m.fake, 1)
+
+        m.fake = 2
+        self.assertEqual(m._document, {'other': 2})
+
+        # So are changes made to the field_map in place.
+        SubModel._meta.field_map['fake'] = 'changed'
+
+        m = SubModel._from_db({'changed': 1})
+        self.assertEqual(m.fake, 1)
+
+        m.fake = 2
+        self.assertEqual(m._document, {'changed': 2})
+
+    def test_slots(self):
+        """Test that the document is kept in slots."""
+
+        self.assertEqual(DefaultModel.__slots__, ('__dict__',))
+
+        m = DefaultModel(a=1)
+        self.assertEqual(m.__dict__, {})
+        self.assertEqual(m._document, {'a': 1})
+
+        class MethodModel(Model):
+            def method(self):
+                return 1
+
+        # Instances can still override the attributes of the class.
+        m = MethodModel()
+        m.method = lambda: 2
+        self.assertEqual(m.method(), 2)
+        self.assertEqual(MethodModel().method(), 1)
+
+        class AttributeModel(Model):
+            attribute = 1
+
+        m = AttributeModel()
+        m.attribute = 2
+        self.assertEqual(m.attribute, 2)
+        self.assertEqual(AttributeModel.attribute, 1)
+
+        # Subclasses share the __dict__ of their parents.
+        class SubModel(AttributeModel):
+            pass
+
+        self.assertEqual(SubModel.__slots__, ())
+
+        class SlotsModel(Model):
+            __slots__ = ('attribute',)
+
+        # __dictoffset__ is 0 when instances have no __dict__.
+        self.assertEqual(SlotsModel.__dictoffset__, 0)
+
+        m = SlotsModel()
+        m.attribute = 1
+        self.assertEqual(m.attribute, 1)
+        self.assertEqual(m._document, {})
+
     def test_subclassed(self):
         """Test a subclassed model."""
 
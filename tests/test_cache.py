@@ -0,0 +1,251 @@
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from simon.cache import DocumentCache, QueryCache, query_key
+
+from .utils import AN_OBJECT_ID
+
+
+class TestDocumentCache(unittest.TestCase):
+    """Test the :class:`~simon.cache.DocumentCache` class."""
+
+    def setUp(self):
+        self.cache = DocumentCache(max_size=2)
+
+    def test_clear(self):
+        """Test the `clear()` method."""
+
+        self.cache.set(1, {'_id': 1})
+        self.cache.set(2, {'_id': 2})
+
+        self.cache.clear()
+
+        self.assertEqual(len(self.cache), 0)
+        self.assertIsNone(self.cache.get(1))
+
+    def test_get(self):
+        """Test the `get()` method."""
+
+        self.cache.set(AN_OBJECT_ID, {'_id': AN_OBJECT_ID, 'a': 1})
+
+        self.assertEqual(self.cache.get(AN_OBJECT_ID),
+                         {'_id': AN_OBJECT_ID, 'a': 1})
+        self.assertIsNone(self.cache.get(1))
+
+    def test_get_copy(self):
+        """Test that `get()` returns a copy of the document."""
+
+        self.cache.set(1, {'_id': 1, 'a': [1]})
+
+        document = self.cache.get(1)
+        document['a'].append(2)
+
+        self.assertEqual(self.cache.get(1), {'_id': 1, 'a': [1]})
+
+    def test_get_ttl(self):
+        """Test that `get()` doesn't return expired documents."""
+
+        cache = DocumentCache(ttl=30)
+
+        with mock.patch('simon.cache.time') as time:
+            time.time.return_value = 100
+            cache.set(1, {'_id': 1})
+
+            time.time.return_value = 129
+            self.assertEqual(cache.get(1), {'_id': 1})
+
+            time.time.return_value = 130
+            self.assertIsNone(cache.get(1))
+
+        self.assertEqual(len(cache), 0)
+
+    def test_lru(self):
+        """Test that the least recently used document is evicted."""
+
+        self.cache.set(1, {'_id': 1})
+        self.cache.set(2, {'_id': 2})
+
+        # Using the first document makes the second the least recently
+        # used one.
+        self.cache.get(1)
+        self.cache.set(3, {'_id': 3})
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get(2))
+        self.assertEqual(self.cache.get(1), {'_id': 1})
+        self.assertEqual(self.cache.get(3), {'_id': 3})
+
+    def test_remove(self):
+        """Test the `remove()` method."""
+
+        self.cache.set(1, {'_id': 1})
+
+        self.cache.remove(1)
+        self.cache.remove(2)
+
+        self.assertIsNone(self.cache.get(1))
+
+    def test_set(self):
+        """Test the `set()` method."""
+
+        document = {'_id': 1, 'a': 1}
+        self.cache.set(1, document)
+
+        # Changes made after the document was added aren't cached.
+        document['a'] = 2
+        self.assertEqual(self.cache.get(1), {'_id': 1, 'a': 1})
+
+        # Setting a document again replaces it.
+        self.cache.set(1, document)
+        self.assertEqual(self.cache.get(1), {'_id': 1, 'a': 2})
+        self.assertEqual(len(self.cache), 1)
+
+    def test_set_generation(self):
+        """Test that `set()` skips documents from an old generation."""
+
+        generation = self.cache.generation()
+        self.cache.remove(1)
+
+        self.cache.set(1, {'_id': 1}, generation)
+        self.assertIsNone(self.cache.get(1))
+
+        generation = self.cache.generation()
+        self.cache.clear()
+
+        self.cache.set(1, {'_id': 1}, generation)
+        self.assertIsNone(self.cache.get(1))
+
+        generation = self.cache.generation()
+        self.cache.set(1, {'_id': 1}, generation)
+        self.assertEqual(self.cache.get(1), {'_id': 1})
+
+    def test_set_unhashable(self):
+        """Test `set()` with an `_id` that can't be cached."""
+
+        self.cache.set({'a': 1}, {'_id': {'a': 1}})
+
+        self.assertEqual(len(self.cache), 0)
+        self.assertIsNone(self.cache.get({'a': 1}))
+
+    def test_stats(self):
+        """Test the `stats()` method."""
+
+        self.cache.set(1, {'_id': 1})
+        self.cache.set(2, {'_id': 2})
+        self.cache.set(3, {'_id': 3})
+
+        self.cache.get(1)
+        self.cache.get(2)
+        self.cache.get(3)
+
+        self.assertEqual(self.cache.stats(), {
+            'hits': 2,
+            'misses': 1,
+            'evictions': 1,
+            'size': 2,
+        })
+
+
+class TestQueryCache(unittest.TestCase):
+    """Test the :class:`~simon.cache.QueryCache` class."""
+
+    def setUp(self):
+        self.cache = QueryCache(max_size=3)
+
+    def test_get(self):
+        """Test the `get()` method."""
+
+        self.cache.set('test.a', 1, [{'_id': 1}, {'_id': 2}])
+
+        self.assertEqual(self.cache.get('test.a', 1),
+                         [{'_id': 1}, {'_id': 2}])
+        self.assertIsNone(self.cache.get('test.a', 2))
+        self.assertIsNone(self.cache.get('test.b', 1))
+
+    def test_invalidate(self):
+        """Test the `invalidate()` method."""
+
+        self.cache.set('test.a', 1, [{'_id': 1}])
+        self.cache.set('test.a', 2, [])
+        self.cache.set('test.b', 1, [{'_id': 1}])
+
+        self.cache.invalidate('test.a')
+
+        self.assertIsNone(self.cache.get('test.a', 1))
+        self.assertIsNone(self.cache.get('test.a', 2))
+        self.assertEqual(self.cache.get('test.b', 1), [{'_id': 1}])
+
+    def test_max_size(self):
+        """Test that the size of a result is its number of documents."""
+
+        self.cache.set('test.a', 1, [{'_id': 1}, {'_id': 2}])
+        self.cache.set('test.a', 2, [{'_id': 3}, {'_id': 4}])
+
+        self.assertIsNone(self.cache.get('test.a', 1))
+        self.assertEqual(self.cache.stats()['size'], 2)
+
+        # Results bigger than the cache aren't added.
+        self.cache.set('test.a', 3, [{'_id': x} for x in range(4)])
+
+        self.assertIsNone(self.cache.get('test.a', 3))
+        self.assertEqual(self.cache.get('test.a', 2),
+                         [{'_id': 3}, {'_id': 4}])
+
+    def test_set_generation(self):
+        """Test that `set()` skips results from an old generation."""
+
+        generation = self.cache.generation('test.a')
+        self.cache.invalidate('test.a')
+
+        self.cache.set('test.a', 1, [{'_id': 1}], generation)
+        self.assertIsNone(self.cache.get('test.a', 1))
+
+        generation = self.cache.generation('test.a')
+        self.cache.set('test.a', 1, [{'_id': 1}], generation)
+        self.assertEqual(self.cache.get('test.a', 1), [{'_id': 1}])
+
+
+class TestQueryKey(unittest.TestCase):
+    """Test the :func:`~simon.cache.query_key` function."""
+
+    def test_query_key(self):
+        """Test the `query_key()` function."""
+
+        key = query_key({'a': 1, 'b': {'$in': [1, 2]}}, [('a', 1)], 10, 5)
+
+        # The order of the keys doesn't matter.
+        self.assertEqual(
+            query_key({'b': {'$in': [1, 2]}, 'a': 1}, [('a', 1)], 10, 5),
+            key)
+
+        # Everything else does.
+        self.assertNotEqual(
+            query_key({'a': 1, 'b': {'$in': [1, 2]}}, [('a', -1)], 10, 5),
+            key)
+        self.assertNotEqual(
+            query_key({'a': 1, 'b': {'$in': [1, 2]}}, [('a', 1)], 0, 5),
+            key)
+        self.assertNotEqual(
+            query_key({'a': 1, 'b': {'$in': [1, 2]}}, [('a', 1)], 10, 5,
+                      {'a': 1}),
+            key)
+
+    def test_query_key_types(self):
+        ("Test that `query_key()` tells apart values that are equal but "
+         "of different types.")
+
+        self.assertNotEqual(query_key({'a': True}), query_key({'a': 1}))
+        self.assertNotEqual(query_key({'a': False}), query_key({'a': 0}))
+        self.assertNotEqual(query_key({'a': [1]}), query_key({'a': [True]}))
+
+    def test_query_key_unhashable(self):
+        """Test `query_key()` with a query that can't be cached."""
+
+        self.assertIsNone(query_key({'a': set([1])}))
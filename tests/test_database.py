@@ -12,8 +12,9 @@ from bson import ObjectId
 import mock
 import pymongo
 
-from simon import connection, query
+from simon import connection, query, sessions
 from simon._compat import PY2
+from simon.cache import DocumentCache, QueryCache
 
 from .utils import AN_OBJECT_ID, AN_OBJECT_ID_STR, ModelFactory
 
@@ -61,6 +62,156 @@ class TestDatabase(unittest.TestCase):
         self.assertEqual(m.b, 2)
         self.assertEqual(m._document['b'], 2)
 
+    def test_bulk_create(self):
+        """Test the `bulk_create()` method."""
+
+        AN_OBJECT_ID2 = ObjectId()
+        AN_OBJECT_ID3 = ObjectId()
+
+        m = DefaultModel(a=1)
+
+        with mock.patch.object(DefaultModel._meta.db, 'insert') as insert:
+            with mock.patch('simon.base.current_datetime') as now:
+                now.side_effect = ['now1', 'now2']
+                insert.side_effect = [[AN_OBJECT_ID, AN_OBJECT_ID2],
+                                      [AN_OBJECT_ID3]]
+
+                ms = DefaultModel.bulk_create([m, {'a': 2}, {'a': 3}],
+                                              batch_size=2)
+
+                self.assertEqual(insert.call_count, 2)
+                insert.assert_any_call(doc_or_docs=[
+                    {'a': 1, 'created': 'now1', 'modified': 'now1',
+                     '_id': AN_OBJECT_ID},
+                    {'a': 2, 'created': 'now1', 'modified': 'now1',
+                     '_id': AN_OBJECT_ID2},
+                ], **wc_on)
+                insert.assert_called_with(doc_or_docs=[
+                    {'a': 3, 'created': 'now2', 'modified': 'now2',
+                     '_id': AN_OBJECT_ID3},
+                ], **wc_on)
+
+        self.assertEqual(len(ms), 3)
+        self.assertIs(ms[0], m)
+        self.assertEqual(ms[0]._document['_id'], AN_OBJECT_ID)
+        self.assertEqual(ms[1]._document['_id'], AN_OBJECT_ID2)
+        self.assertEqual(ms[2]._document['_id'], AN_OBJECT_ID3)
+        self.assertEqual(ms[2]._document['a'], 3)
+        self.assertEqual(ms[2]._document['created'], 'now2')
+        self.assertFalse(m._changed)
+
+    def test_bulk_create_required_fields(self):
+        """Test that `bulk_create()` enforces `required_fields`."""
+
+        with mock.patch.object(RequiredModel._meta.db, 'insert') as insert:
+            with self.assertRaises(TypeError):
+                RequiredModel.bulk_create([{'a': 1, 'b': 2}, {'a': 1}])
+
+            self.assertFalse(insert.called)
+
+    def test_bulk_create_typed_fields(self):
+        """Test that `bulk_create()` enforces `typed_fields`."""
+
+        with mock.patch.object(TypedModel._meta.db, 'insert') as insert:
+            with self.assertRaises(TypeError):
+                TypedModel.bulk_create([{'a': 1}, {'a': 'b'}])
+
+            self.assertFalse(insert.called)
+
+    def test_bulk_create_session(self):
+        """Test the `bulk_create()` method inside of a session."""
+
+        with mock.patch.object(DefaultModel._meta.db, 'insert') as insert:
+            with mock.patch.object(sessions.Session, 'flush'):
+                with sessions.session() as session:
+                    ms = DefaultModel.bulk_create([{'a': 1}, {'a': 2}])
+
+            self.assertFalse(insert.called)
+
+        self.assertEqual(len(session), 2)
+        self.assertEqual([x['name'] for x in session._operations],
+                         ['insert', 'insert'])
+
+        # The _ids are assigned right away.
+        for m, operation in zip(ms, session._operations):
+            self.assertIsInstance(m._document['_id'], ObjectId)
+            self.assertEqual(operation['document']['_id'], m._document['_id'])
+
+    def test_bulk_create_write_behind(self):
+        """Test the `bulk_create()` method with `write_behind`."""
+
+        write_behind = mock.Mock()
+        WriteBehindModel = ModelFactory('WriteBehindModel',
+                                        write_behind=write_behind)
+        write_behind.insert.side_effect = lambda c, docs, **kw: [
+            x['_id'] for x in docs]
+
+        with mock.patch.object(WriteBehindModel._meta.db, 'insert') as insert:
+            m, = WriteBehindModel.bulk_create([{'a': 1}])
+
+            self.assertFalse(insert.called)
+
+        write_behind.insert.assert_called_with(
+            WriteBehindModel._meta.db, [m._document], **wc_on)
+        self.assertTrue(write_behind.on_flush.called)
+
+    def test_bulk_create_write_concern(self):
+        """Test that `bulk_create()` respects write concern."""
+
+        UnsafeModel = ModelFactory('UnsafeModel', safe=False)
+
+        with mock.patch.object(UnsafeModel._meta.db, 'insert') as insert:
+            insert.return_value = [AN_OBJECT_ID]
+
+            UnsafeModel.bulk_create([{'a': 1}])
+            args, kwargs = insert.call_args
+            self.assertEqual(dict((k, kwargs[k]) for k in wc_off), wc_off)
+
+            UnsafeModel.bulk_create([{'a': 1}], w=1)
+            args, kwargs = insert.call_args
+            self.assertEqual(dict((k, kwargs[k]) for k in wc_on), wc_on)
+
+    def test_counter(self):
+        """Test the `counter()` method."""
+
+        counters = mock.Mock()
+        CountedModel = ModelFactory('CountedModel', counters=counters,
+                                    field_map={'fake': 'real'})
+
+        m = CountedModel(_id=AN_OBJECT_ID)
+
+        m.counter('fake').add(2)
+
+        counters.add.assert_called_with(CountedModel._meta.db, AN_OBJECT_ID,
+                                        'real', 2, on_flush=mock.ANY,
+                                        **wc_on)
+
+    def test_counter_cache(self):
+        ("Test that `counter()` removes the document from the cache "
+         "once the increments have been sent.")
+
+        counters = mock.Mock()
+        CachedModel = ModelFactory('CachedModel', cache=DocumentCache(),
+                                   counters=counters)
+        CachedModel._meta.cache.set(AN_OBJECT_ID, {'_id': AN_OBJECT_ID})
+
+        m = CachedModel(_id=AN_OBJECT_ID)
+        m.counter('a').add()
+
+        self.assertIsNotNone(CachedModel._meta.cache.get(AN_OBJECT_ID))
+
+        counters.add.call_args[1]['on_flush']()
+
+        self.assertIsNone(CachedModel._meta.cache.get(AN_OBJECT_ID))
+
+    def test_counter_typeerror(self):
+        """Test that `counter()` raises `TypeError`."""
+
+        m = DefaultModel(a=1)
+
+        with self.assertRaises(TypeError):
+            m.counter('a')
+
     def test_delete(self):
         """Test the `delete()` method."""
 
@@ -71,6 +222,68 @@ class TestDatabase(unittest.TestCase):
 
             remove.assert_called_with({'_id': AN_OBJECT_ID}, **wc_on)
 
+    def test_delete_cache(self):
+        """Test that `delete()` removes the document from the cache."""
+
+        CachedModel = ModelFactory('CachedModel', cache=DocumentCache())
+        CachedModel._meta.cache.set(AN_OBJECT_ID, {'_id': AN_OBJECT_ID})
+
+        m = CachedModel(_id=AN_OBJECT_ID)
+
+        with mock.patch.object(CachedModel._meta.db, 'remove'):
+            m.delete()
+
+        self.assertIsNone(CachedModel._meta.cache.get(AN_OBJECT_ID))
+
+    def test_delete_identity_map(self):
+        """Test the `delete()` method inside of an identity map."""
+
+        with mock.patch.object(DefaultModel._meta.db, 'remove'):
+            with sessions.identity_map() as identity_map:
+                m = DefaultModel._from_db({'_id': AN_OBJECT_ID})
+
+                m.delete()
+
+                self.assertIsNone(identity_map.get(DefaultModel._meta.db,
+                                                   AN_OBJECT_ID))
+
+    def test_delete_session(self):
+        """Test the `delete()` method inside of a session."""
+
+        m = DefaultModel(_id=AN_OBJECT_ID)
+
+        with mock.patch.object(DefaultModel._meta.db, 'remove') as remove:
+            with mock.patch.object(sessions.Session, 'flush'):
+                with sessions.session() as session:
+                    m.delete()
+
+            self.assertFalse(remove.called)
+
+        self.assertEqual(session._operations[0]['name'], 'remove')
+        self.assertEqual(session._operations[0]['spec'],
+                         {'_id': AN_OBJECT_ID})
+
+    def test_delete_session_cache(self):
+        ("Test that `delete()` inside of a session removes the document "
+         "from the cache once the session has been flushed.")
+
+        CachedModel = ModelFactory('CachedModel', cache=DocumentCache())
+        CachedModel._meta.cache.set(AN_OBJECT_ID, {'_id': AN_OBJECT_ID})
+
+        m = CachedModel(_id=AN_OBJECT_ID)
+
+        with mock.patch('simon.sessions.BulkWriteError', None):
+            with mock.patch.object(CachedModel._meta.db, 'remove') as remove:
+                with sessions.session():
+                    m.delete()
+
+                    self.assertIsNotNone(
+                        CachedModel._meta.cache.get(AN_OBJECT_ID))
+
+                self.assertTrue(remove.called)
+
+        self.assertIsNone(CachedModel._meta.cache.get(AN_OBJECT_ID))
+
     def test_delete_typeerror(self):
         """Test that `delete()` raises `TypeError`."""
 
@@ -99,6 +312,120 @@ class TestDatabase(unittest.TestCase):
             m.delete(w=1)
             remove.assert_called_with({'_id': AN_OBJECT_ID}, **wc_on)
 
+    def test_get_many(self):
+        """Test the `get_many()` method."""
+
+        UntypedModel = ModelFactory('UntypedModel',
+                                    typed_fields={'_id': None})
+
+        with mock.patch.object(UntypedModel._meta.db, 'find') as find:
+            find.side_effect = [
+                [{'_id': 3, 'a': 3}, {'_id': 1, 'a': 1}],
+                [{'_id': 4, 'a': 4}],
+            ]
+
+            actual = UntypedModel.get_many([1, 2, 3, 1, 4], batch_size=3)
+
+            find.assert_has_calls([
+                mock.call({'_id': {'$in': [1, 2, 3]}}),
+                mock.call({'_id': {'$in': [4]}}),
+            ])
+
+        self.assertEqual([m.a for m in actual], [1, 3, 1, 4])
+        self.assertIs(actual[0], actual[2])
+
+    def test_get_many_as_dict(self):
+        """Test the `get_many()` method with `as_dict`."""
+
+        UntypedModel = ModelFactory('UntypedModel',
+                                    typed_fields={'_id': None})
+
+        with mock.patch.object(UntypedModel._meta.db, 'find') as find:
+            find.return_value = [{'_id': 1, 'a': 1}]
+
+            actual = UntypedModel.get_many([1, 2], as_dict=True)
+            self.assertEqual(list(actual), [1])
+            self.assertEqual(actual[1].a, 1)
+
+            actual = UntypedModel.get_many([1, 2], as_dict=True,
+                                           missing='none')
+            self.assertEqual(sorted(actual), [1, 2])
+            self.assertIsNone(actual[2])
+
+    def test_get_many_cache(self):
+        """Test the `get_many()` method with a cache."""
+
+        CachedModel = ModelFactory('CachedModel', cache=DocumentCache())
+        CachedModel._meta.cache.set(AN_OBJECT_ID, {'_id': AN_OBJECT_ID})
+
+        with mock.patch.object(CachedModel._meta.db, 'find') as find:
+            actual = CachedModel.get_many([AN_OBJECT_ID_STR])
+
+            self.assertFalse(find.called)
+
+        self.assertEqual(actual[0]._document, {'_id': AN_OBJECT_ID})
+
+    def test_get_many_cache_invalidated(self):
+        ("Test that `get_many()` doesn't cache documents read during a "
+         "write.")
+
+        CachedModel = ModelFactory('CachedModel', cache=DocumentCache())
+
+        def find(spec):
+            # The document is written while it's being read.
+            CachedModel._meta.cache.remove(AN_OBJECT_ID)
+            return [{'_id': AN_OBJECT_ID, 'a': 1}]
+
+        with mock.patch.object(CachedModel._meta.db, 'find') as find_mock:
+            find_mock.side_effect = find
+
+            CachedModel.get_many([AN_OBJECT_ID])
+
+        self.assertIsNone(CachedModel._meta.cache.get(AN_OBJECT_ID))
+
+    def test_get_many_identity_map(self):
+        ("Test the `get_many()` method inside of an identity map.")
+
+        with mock.patch.object(DefaultModel._meta.db, 'find') as find:
+            find.return_value = [{'_id': AN_OBJECT_ID, 'a': 1}]
+
+            with sessions.identity_map():
+                m = DefaultModel.get_many([AN_OBJECT_ID])[0]
+
+                self.assertIs(DefaultModel.get_many([AN_OBJECT_ID])[0], m)
+                self.assertIs(DefaultModel.get(_id=AN_OBJECT_ID), m)
+
+            self.assertEqual(find.call_count, 1)
+
+    def test_get_many_missing(self):
+        """Test the `get_many()` method with missing documents."""
+
+        UntypedModel = ModelFactory('UntypedModel',
+                                    typed_fields={'_id': None})
+
+        with mock.patch.object(UntypedModel._meta.db, 'find') as find:
+            find.return_value = [{'_id': 2, 'a': 2}]
+
+            actual = UntypedModel.get_many([1, 2, 3])
+            self.assertEqual([m.a for m in actual], [2])
+
+            actual = UntypedModel.get_many([1, 2, 3], missing='none')
+            self.assertIsNone(actual[0])
+            self.assertEqual(actual[1].a, 2)
+            self.assertIsNone(actual[2])
+
+            with self.assertRaises(UntypedModel.NoDocumentFound):
+                UntypedModel.get_many([1, 2, 3], missing='raise')
+
+    def test_get_many_valueerror(self):
+        """Test that `get_many()` raises `ValueError`."""
+
+        with self.assertRaises(ValueError):
+            DefaultModel.get_many([], missing='ignore')
+
+        with self.assertRaises(ValueError):
+            DefaultModel.get_many([], batch_size=0)
+
     def test__find(self):
         """Test the `_find()` method."""
 
@@ -126,23 +453,102 @@ class TestDatabase(unittest.TestCase):
 
         with mock.patch.object(DefaultModel._meta.db, 'find') as find:
             QuerySet = mock.MagicMock(spec=query.QuerySet)
-            QuerySet.__getitem__.return_value = {'_id': AN_OBJECT_ID}
-            QuerySet.count.return_value = 1
+            QuerySet.limit.return_value = [{'_id': AN_OBJECT_ID}]
 
             find.return_value = QuerySet
 
             m = DefaultModel._find(find_one=True, _id=AN_OBJECT_ID)
 
             find.assert_called_with({'_id': AN_OBJECT_ID})
+            QuerySet.limit.assert_called_with(2)
+            QuerySet.count.assert_not_called()
 
             self.assertEqual(m._document['_id'], AN_OBJECT_ID)
 
+    def test__find_find_one_cache(self):
+        """Test the `_find()` method with `find_one` and a cache."""
+
+        CachedModel = ModelFactory('CachedModel', cache=DocumentCache())
+
+        with mock.patch.object(CachedModel._meta.db, 'find') as find:
+            QuerySet = mock.MagicMock(spec=query.QuerySet)
+            QuerySet.limit.return_value = [{'_id': AN_OBJECT_ID, 'a': 1}]
+
+            find.return_value = QuerySet
+
+            m1 = CachedModel._find(find_one=True, _id=AN_OBJECT_ID)
+            m2 = CachedModel._find(find_one=True, _id=AN_OBJECT_ID)
+
+            # Only the first call needs to go to the database.
+            self.assertEqual(find.call_count, 1)
+            self.assertEqual(m2._document, {'_id': AN_OBJECT_ID, 'a': 1})
+            self.assertIsNot(m1, m2)
+
+            # Other queries aren't cached.
+            CachedModel._find(find_one=True, a=1)
+            CachedModel._find(find_one=True, _id=AN_OBJECT_ID, a=1)
+            CachedModel._find(find_one=True, projection=['a'],
+                              _id=AN_OBJECT_ID)
+
+            self.assertEqual(find.call_count, 4)
+
+        self.assertEqual(CachedModel._meta.cache.stats(), {
+            'hits': 1,
+            'misses': 1,
+            'evictions': 0,
+            'size': 1,
+        })
+
+    def test__find_find_one_cache_invalidated(self):
+        ("Test that `_find()` doesn't cache a document read during a "
+         "write.")
+
+        CachedModel = ModelFactory('CachedModel', cache=DocumentCache())
+
+        def limit(n):
+            # The document is written while it's being read.
+            CachedModel._meta.cache.remove(AN_OBJECT_ID)
+            return [{'_id': AN_OBJECT_ID, 'a': 1}]
+
+        with mock.patch.object(CachedModel._meta.db, 'find') as find:
+            find.return_value.limit.side_effect = limit
+
+            CachedModel._find(find_one=True, _id=AN_OBJECT_ID)
+
+        self.assertIsNone(CachedModel._meta.cache.get(AN_OBJECT_ID))
+
+    def test__find_find_one_identity_map(self):
+        ("Test the `_find()` method with `find_one` inside of an "
+         "identity map.")
+
+        with mock.patch.object(DefaultModel._meta.db, 'find') as find:
+            QuerySet = mock.MagicMock(spec=query.QuerySet)
+            QuerySet.limit.return_value = [{'_id': AN_OBJECT_ID, 'a': 1}]
+
+            find.return_value = QuerySet
+
+            with sessions.identity_map():
+                m1 = DefaultModel._find(find_one=True, _id=AN_OBJECT_ID)
+                m2 = DefaultModel._find(find_one=True, _id=AN_OBJECT_ID)
+
+                # Only the first call needs to go to the database.
+                self.assertEqual(find.call_count, 1)
+                self.assertIs(m1, m2)
+
+                # Queries on other fields still go to the database, but
+                # the loaded instance is used.
+                m3 = DefaultModel._find(find_one=True, a=1)
+
+                self.assertEqual(find.call_count, 2)
+                self.assertIs(m3, m1)
+
     def test__find_find_one_multipledocumentsfound(self):
         """Test that `_find()` raises `MultipleDocumentsFound`."""
 
         with mock.patch.object(DefaultModel._meta.db, 'find') as find:
             QuerySet = mock.MagicMock(spec=query.QuerySet)
-            QuerySet.count.return_value = 2
+            QuerySet.limit.return_value = [{'_id': AN_OBJECT_ID},
+                                           {'_id': AN_OBJECT_ID}]
 
             find.return_value = QuerySet
             with self.assertRaises(DefaultModel.MultipleDocumentsFound) as e:
@@ -154,7 +560,7 @@ class TestDatabase(unittest.TestCase):
             expected = "The query returned more than one 'DefaultModel'."
             self.assertIn(expected, actual)
 
-            expected = "It returned 2!"
+            expected = "It returned at least 2!"
             self.assertIn(expected, actual)
 
             expected = "The document spec was:"
@@ -174,7 +580,7 @@ class TestDatabase(unittest.TestCase):
 
         with mock.patch.object(DefaultModel._meta.db, 'find') as find:
             QuerySet = mock.MagicMock(spec=query.QuerySet)
-            QuerySet.count.return_value = 0
+            QuerySet.limit.return_value = []
 
             find.return_value = QuerySet
             with self.assertRaises(DefaultModel.NoDocumentFound) as e:
@@ -236,6 +642,35 @@ class TestDatabase(unittest.TestCase):
 
                 find.assert_called_with({'_id': 1})
 
+    def test__find_projection(self):
+        """Test the `_find()` method with `projection`."""
+
+        with mock.patch.object(MappedModel._meta.db, 'find') as find:
+            qs = MappedModel._find(projection=['fake', 'a__b'],
+                                   _id=AN_OBJECT_ID)
+
+            find.assert_called_with({'_id': AN_OBJECT_ID},
+                                    {'real': 1, 'a.b': 1})
+            self.assertEqual(qs._fields, {'real': 1, 'a.b': 1})
+
+            MappedModel._find(projection='fake')
+
+            find.assert_called_with({}, {'real': 1})
+
+    def test__find_find_one_projection(self):
+        """Test the `_find()` method with `find_one` and `projection`."""
+
+        with mock.patch.object(DefaultModel._meta.db, 'find') as find:
+            QuerySet = mock.MagicMock(spec=query.QuerySet)
+            QuerySet.limit.return_value = [{'_id': AN_OBJECT_ID}]
+
+            find.return_value = QuerySet
+
+            DefaultModel._find(find_one=True, projection=['a'],
+                               _id=AN_OBJECT_ID)
+
+            find.assert_called_with({'_id': AN_OBJECT_ID}, {'a': 1})
+
     def test__find_q(self):
         """Test the `_find()` method with a `Q` object."""
 
@@ -258,6 +693,15 @@ class TestDatabase(unittest.TestCase):
 
                 find.assert_called_with({'a': 1})
 
+    def test__find_spec(self):
+        """Test that `_find()` keeps the query on the `QuerySet`."""
+
+        with mock.patch.object(MappedModel._meta.db, 'find') as find:
+            qs = MappedModel._find(fake=1)
+
+            find.assert_called_with({'real': 1})
+            self.assertEqual(qs._spec, {'real': 1})
+
     def test__find_sorted(self):
         """Test the `_find()` method with a sort."""
 
@@ -283,6 +727,35 @@ class TestDatabase(unittest.TestCase):
                 SortedDescModel._find()
                 QuerySet().sort.assert_called_with('-a')
 
+    def test__from_db(self):
+        """Test the `_from_db()` method."""
+
+        document = {'_id': AN_OBJECT_ID, 'real': 1, 'a': {'b': 2}}
+
+        m = MappedModel._from_db(document)
+
+        self.assertIsInstance(m, MappedModel)
+        self.assertIs(m._document, document)
+        self.assertEqual(m.fake, 1)
+        self.assertEqual(m.a__b, 2)
+
+    def test__from_db_identity_map(self):
+        """Test the `_from_db()` method inside of an identity map."""
+
+        with sessions.identity_map() as identity_map:
+            m1 = DefaultModel._from_db({'_id': AN_OBJECT_ID, 'a': 1})
+            m2 = DefaultModel._from_db({'_id': AN_OBJECT_ID, 'a': 2})
+
+            self.assertIs(m1, m2)
+            self.assertEqual(m1._document['a'], 1)
+
+            # Partial documents aren't added to the map.
+            m3 = DefaultModel._from_db({'_id': 1, 'a': 1}, partial=True)
+            m4 = DefaultModel._from_db({'_id': 1, 'a': 1})
+
+            self.assertIsNot(m3, m4)
+            self.assertIs(identity_map.get(DefaultModel._meta.db, 1), m4)
+
     def test__update(self):
         """Test the `_update()` method."""
 
@@ -301,14 +774,12 @@ class TestDatabase(unittest.TestCase):
 
         with mock.patch.object(DefaultModel._meta.db, 'update') as update:
             with mock.patch.object(DefaultModel._meta.db, 'find_one') as find_one:
-                find_one.return_value = {'_id': AN_OBJECT_ID, 'a': 1}
-
                 m._update({'$set': {'a': 1}})
 
                 update.assert_called_with(spec={'_id': AN_OBJECT_ID},
                                           document={'$set': {'a': 1}}, **wc_on)
 
-                find_one.assert_called_with({'_id': AN_OBJECT_ID}, {'a': 1})
+                find_one.assert_not_called()
 
                 self.assertEqual(m._document['a'], 1)
 
@@ -320,15 +791,13 @@ class TestDatabase(unittest.TestCase):
 
         with mock.patch.object(DefaultModel._meta.db, 'update') as update:
             with mock.patch.object(DefaultModel._meta.db, 'find_one') as find_one:
-                find_one.return_value = {'_id': AN_OBJECT_ID, 'a': {'b': 1}}
-
                 m._update({'$set': {'a.b': 1}})
 
                 update.assert_called_with(spec={'_id': AN_OBJECT_ID},
                                           document={'$set': {'a.b': 1}},
                                           **wc_on)
 
-                find_one.assert_called_with({'_id': AN_OBJECT_ID}, {'a.b': 1})
+                find_one.assert_not_called()
 
                 self.assertEqual(m._document['a']['b'], 1)
 
@@ -378,18 +847,74 @@ class TestDatabase(unittest.TestCase):
 
         with mock.patch.object(MappedModel._meta.db, 'find_one') as find_one:
             with mock.patch.object(MappedModel._meta.db, 'update') as update:
-                find_one.return_value = {'_id': AN_OBJECT_ID, 'real': 1}
-
                 m._update({'$set': {'fake': 1}})
 
                 update.assert_called_with(spec={'_id': AN_OBJECT_ID},
                                           document={'$set': {'real': 1}},
                                           **wc_on)
 
-                find_one.assert_called_with({'_id': AN_OBJECT_ID}, {'real': 1})
+                find_one.assert_not_called()
 
                 self.assertEqual(m._document['real'], 1)
 
+    def test__update_cache(self):
+        """Test that `_update()` removes the document from the cache."""
+
+        CachedModel = ModelFactory('CachedModel', cache=DocumentCache())
+        CachedModel._meta.cache.set(AN_OBJECT_ID, {'_id': AN_OBJECT_ID})
+
+        m = CachedModel(_id=AN_OBJECT_ID)
+
+        with mock.patch.object(CachedModel._meta.db, 'update'):
+            m._update({'$set': {'a': 1}})
+
+        self.assertIsNone(CachedModel._meta.cache.get(AN_OBJECT_ID))
+
+        CachedModel._meta.cache.set(AN_OBJECT_ID, {'_id': AN_OBJECT_ID})
+
+        with mock.patch.object(CachedModel._meta.db, 'update'):
+            m._update({'a': 1})
+
+        self.assertIsNone(CachedModel._meta.cache.get(AN_OBJECT_ID))
+
+    def test__update_query_cache(self):
+        ("Test that `_update()` removes the collection's results from "
+         "the query cache.")
+
+        CachedModel = ModelFactory('CachedModel', query_cache=QueryCache())
+        collection = CachedModel._meta.db.full_name
+        CachedModel._meta.query_cache.set(collection, (), [])
+
+        with mock.patch.object(CachedModel._meta.db, 'insert') as insert:
+            insert.return_value = AN_OBJECT_ID
+
+            m = CachedModel()
+            m._update({'a': 1}, upsert=True)
+
+        self.assertEqual(len(CachedModel._meta.query_cache), 0)
+
+    def test__update_identity_map(self):
+        """Test the `_update()` method inside of an identity map."""
+
+        with mock.patch.object(DefaultModel._meta.db, 'insert') as insert:
+            with mock.patch.object(DefaultModel._meta.db, 'update'):
+                insert.return_value = AN_OBJECT_ID
+
+                with sessions.identity_map() as identity_map:
+                    # Inserted documents are added.
+                    m1 = DefaultModel()
+                    m1._update({'a': 1}, upsert=True)
+
+                    self.assertIs(identity_map.get(DefaultModel._meta.db,
+                                                   AN_OBJECT_ID), m1)
+
+                    # Other instances of the document are removed.
+                    m2 = DefaultModel(_id=AN_OBJECT_ID)
+                    m2._update({'a': 2})
+
+                    self.assertIsNone(identity_map.get(DefaultModel._meta.db,
+                                                       AN_OBJECT_ID))
+
     def test__update_insert(self):
         """Test the `_update()` method for an insert."""
 
@@ -448,87 +973,183 @@ class TestDatabase(unittest.TestCase):
             update.assert_called_with(spec={'_id': 1}, document={'b': 2},
                                       upsert=True, **wc_on)
 
+    def test__update_inc(self):
+        """Test the `_update()` method with an increment."""
+
+        m = DefaultModel(_id=AN_OBJECT_ID, a=1)
+
+        with mock.patch.object(DefaultModel._meta.db,
+                               'find_and_modify') as find_and_modify:
+            with mock.patch.object(DefaultModel._meta.db, 'update') as update:
+                find_and_modify.return_value = {'_id': AN_OBJECT_ID, 'a': 3}
+
+                m._update({'$inc': {'a': 1}})
+
+                find_and_modify.assert_called_with(
+                    {'_id': AN_OBJECT_ID}, {'$inc': {'a': 1}}, upsert=False,
+                    new=True, fields={'a': 1})
+
+                self.assertFalse(update.called)
+
+                self.assertEqual(m._document['a'], 3)
+
+    def test__update_inc_no_reload(self):
+        """Test the `_update()` method with an increment and `reload`."""
+
+        m = DefaultModel(_id=AN_OBJECT_ID, a=1)
+
+        with mock.patch.object(DefaultModel._meta.db,
+                               'find_and_modify') as find_and_modify:
+            with mock.patch.object(DefaultModel._meta.db, 'update') as update:
+                m._update({'$inc': {'a': 1, 'b': 2}}, reload=False)
+
+                update.assert_called_with(spec={'_id': AN_OBJECT_ID},
+                                          document={'$inc': {'a': 1, 'b': 2}},
+                                          **wc_on)
+
+                self.assertFalse(find_and_modify.called)
+
+                self.assertEqual(m._document['a'], 2)
+                self.assertEqual(m._document['b'], 2)
+
     def test__update_pop(self):
         """Test the `_update()` method with a pop."""
 
         m = DefaultModel(_id=AN_OBJECT_ID, a=[1, 2])
 
-        with mock.patch.object(DefaultModel._meta.db, 'find_one') as find_one:
-            with mock.patch.object(DefaultModel._meta.db, 'update') as update:
-                find_one.return_value = {'_id': AN_OBJECT_ID, 'a': [1]}
+        with mock.patch.object(DefaultModel._meta.db,
+                               'find_and_modify') as find_and_modify:
+            find_and_modify.return_value = {'_id': AN_OBJECT_ID, 'a': [1]}
 
-                m._update({'$pop': {'a': 1}})
+            m._update({'$pop': {'a': 1}})
 
-                update.assert_called_with(spec={'_id': AN_OBJECT_ID},
-                                          document={'$pop': {'a': 1}}, **wc_on)
+            find_and_modify.assert_called_with(
+                {'_id': AN_OBJECT_ID}, {'$pop': {'a': 1}}, upsert=False,
+                new=True, fields={'a': 1})
+
+            self.assertEqual(len(m._document['a']), 1)
+            self.assertNotIn(2, m._document['a'])
+
+    def test__update_pop_no_reload(self):
+        """Test the `_update()` method with a pop and `reload`."""
+
+        m = DefaultModel(_id=AN_OBJECT_ID, a=[1, 2, 3])
+
+        with mock.patch.object(DefaultModel._meta.db, 'update') as update:
+            m._update({'$pop': {'a': 1}}, reload=False)
+
+            update.assert_called_with(spec={'_id': AN_OBJECT_ID},
+                                      document={'$pop': {'a': 1}}, **wc_on)
+
+            self.assertEqual(m._document['a'], [1, 2])
+
+            m._update({'$pop': {'a': -1}}, reload=False)
 
-                self.assertEqual(len(m._document['a']), 1)
-                self.assertNotIn(2, m._document['a'])
+            self.assertEqual(m._document['a'], [2])
 
     def test__update_pull(self):
         """Test the `_update()` method with a pull."""
 
         m = DefaultModel(_id=AN_OBJECT_ID, a=[1, 2])
 
-        with mock.patch.object(DefaultModel._meta.db, 'find_one') as find_one:
-            with mock.patch.object(DefaultModel._meta.db, 'update') as update:
-                find_one.return_value = {'_id': AN_OBJECT_ID, 'a': [2]}
+        with mock.patch.object(DefaultModel._meta.db,
+                               'find_and_modify') as find_and_modify:
+            find_and_modify.return_value = {'_id': AN_OBJECT_ID, 'a': [2]}
 
-                m._update({'$pull': {'a': 1}})
+            m._update({'$pull': {'a': 1}})
 
-                update.assert_called_with(spec={'_id': AN_OBJECT_ID},
-                                          document={'$pull': {'a': 1}},
-                                          **wc_on)
+            find_and_modify.assert_called_with(
+                {'_id': AN_OBJECT_ID}, {'$pull': {'a': 1}}, upsert=False,
+                new=True, fields={'a': 1})
 
-                self.assertNotIn(1, m._document['a'])
-                self.assertIn(2, m._document['a'])
+            self.assertNotIn(1, m._document['a'])
+            self.assertIn(2, m._document['a'])
 
-                find_one.return_value = {'_id': AN_OBJECT_ID, 'a': []}
+            find_and_modify.return_value = {'_id': AN_OBJECT_ID, 'a': []}
 
-                m._update({'$pullAll': {'a': [2]}})
+            m._update({'$pullAll': {'a': [2]}})
 
-                update.assert_called_with(spec={'_id': AN_OBJECT_ID},
-                                          document={'$pullAll': {'a': [2]}},
-                                          **wc_on)
+            find_and_modify.assert_called_with(
+                {'_id': AN_OBJECT_ID}, {'$pullAll': {'a': [2]}}, upsert=False,
+                new=True, fields={'a': 1})
+
+            self.assertNotIn(2, m._document['a'])
+
+    def test__update_pull_no_reload(self):
+        """Test the `_update()` method with a pull and `reload`."""
+
+        m = DefaultModel(_id=AN_OBJECT_ID, a=[1, 2, 1, 3])
+
+        with mock.patch.object(DefaultModel._meta.db, 'update') as update:
+            m._update({'$pull': {'a': 1}}, reload=False)
+
+            update.assert_called_with(spec={'_id': AN_OBJECT_ID},
+                                      document={'$pull': {'a': 1}}, **wc_on)
+
+            self.assertEqual(m._document['a'], [2, 3])
 
-                self.assertNotIn(2, m._document['a'])
+            m._update({'$pullAll': {'a': [2, 3]}}, reload=False)
+
+            self.assertEqual(m._document['a'], [])
 
     def test__update_push(self):
         """Test the `_update()` method with a push."""
 
         m = DefaultModel(_id=AN_OBJECT_ID)
 
-        with mock.patch.object(DefaultModel._meta.db, 'find_one') as find_one:
-            with mock.patch.object(DefaultModel._meta.db, 'update') as update:
-                find_one.return_value = {'_id': AN_OBJECT_ID, 'a': [1]}
+        with mock.patch.object(DefaultModel._meta.db,
+                               'find_and_modify') as find_and_modify:
+            find_and_modify.return_value = {'_id': AN_OBJECT_ID, 'a': [1]}
 
-                m._update({'$push': {'a': 1}})
+            m._update({'$push': {'a': 1}})
 
-                update.assert_called_with(spec={'_id': AN_OBJECT_ID},
-                                          document={'$push': {'a': 1}},
-                                          **wc_on)
+            find_and_modify.assert_called_with(
+                {'_id': AN_OBJECT_ID}, {'$push': {'a': 1}}, upsert=False,
+                new=True, fields={'a': 1})
 
-                self.assertIn(1, m._document['a'])
+            self.assertIn(1, m._document['a'])
 
-                find_one.return_value = {'_id': AN_OBJECT_ID, 'a': [1, 2]}
+            find_and_modify.return_value = {'_id': AN_OBJECT_ID, 'a': [1, 2]}
 
-                m._update({'$pushAll': {'a': [2]}})
+            m._update({'$pushAll': {'a': [2]}})
 
-                update.assert_called_with(spec={'_id': AN_OBJECT_ID},
-                                          document={'$pushAll': {'a': [2]}},
-                                          **wc_on)
+            find_and_modify.assert_called_with(
+                {'_id': AN_OBJECT_ID}, {'$pushAll': {'a': [2]}}, upsert=False,
+                new=True, fields={'a': 1})
 
-                self.assertIn(2, m._document['a'])
+            self.assertIn(2, m._document['a'])
 
-                find_one.return_value = {'_id': AN_OBJECT_ID, 'a': [1, 2, 3]}
+            find_and_modify.return_value = {'_id': AN_OBJECT_ID,
+                                            'a': [1, 2, 3]}
 
-                m._update({'$addToSet': {'a': 3}})
+            m._update({'$addToSet': {'a': 3}})
 
-                update.assert_called_with(spec={'_id': AN_OBJECT_ID},
-                                          document={'$addToSet': {'a': 3}},
-                                          **wc_on)
+            find_and_modify.assert_called_with(
+                {'_id': AN_OBJECT_ID}, {'$addToSet': {'a': 3}}, upsert=False,
+                new=True, fields={'a': 1})
+
+            self.assertIn(3, m._document['a'])
+
+    def test__update_push_no_reload(self):
+        """Test the `_update()` method with a push and `reload`."""
+
+        m = DefaultModel(_id=AN_OBJECT_ID)
+
+        with mock.patch.object(DefaultModel._meta.db, 'update') as update:
+            m._update({'$push': {'a': 1}}, reload=False)
+
+            update.assert_called_with(spec={'_id': AN_OBJECT_ID},
+                                      document={'$push': {'a': 1}}, **wc_on)
+
+            self.assertEqual(m._document['a'], [1])
 
-                self.assertIn(3, m._document['a'])
+            m._update({'$pushAll': {'a': [2, 3]}}, reload=False)
+
+            self.assertEqual(m._document['a'], [1, 2, 3])
+
+            m._update({'$addToSet': {'a': {'$each': [3, 4]}}}, reload=False)
+
+            self.assertEqual(m._document['a'], [1, 2, 3, 4])
 
     def test__update_rename(self):
         """Test the `_update()` method with a rename."""
@@ -537,14 +1158,14 @@ class TestDatabase(unittest.TestCase):
 
         with mock.patch.object(DefaultModel._meta.db, 'find_one') as find_one:
             with mock.patch.object(DefaultModel._meta.db, 'update') as update:
-                find_one.return_value = {'_id': AN_OBJECT_ID, 'b': 1}
-
                 m._update({'$rename': {'a': 'b'}})
 
                 update.assert_called_with(spec={'_id': AN_OBJECT_ID},
                                           document={'$rename': {'a': 'b'}},
                                           **wc_on)
 
+                find_one.assert_not_called()
+
                 self.assertNotIn('a', m._document)
                 self.assertIn('b', m._document)
                 self.assertEqual(m._document['b'], 1)
@@ -555,19 +1176,21 @@ class TestDatabase(unittest.TestCase):
 
         m = MappedModel(_id=AN_OBJECT_ID, b=1)
 
-        with mock.patch.object(DefaultModel._meta.db, 'find_one') as find_one:
-            with mock.patch.object(DefaultModel._meta.db, 'update') as update:
-                find_one.return_value = {'_id': AN_OBJECT_ID, 'real': 1}
+        with mock.patch.object(MappedModel._meta.db,
+                               'find_and_modify') as find_and_modify:
+            find_and_modify.return_value = {'_id': AN_OBJECT_ID, 'real': 1}
 
-                m._update({'$rename': {'a': 'fake'}})
+            m._update({'$rename': {'a': 'fake'}})
 
-                update.assert_called_with(spec={'_id': AN_OBJECT_ID},
-                                          document={'$rename': {'a': 'real'}},
-                                          **wc_on)
+            # a isn't associated with the instance so its new value must
+            # come from the database.
+            find_and_modify.assert_called_with(
+                {'_id': AN_OBJECT_ID}, {'$rename': {'a': 'real'}},
+                upsert=False, new=True, fields={'real': 1})
 
-                self.assertNotIn('a', m._document)
-                self.assertIn('real', m._document)
-                self.assertEqual(m._document['real'], 1)
+            self.assertNotIn('a', m._document)
+            self.assertIn('real', m._document)
+            self.assertEqual(m._document['real'], 1)
 
     def test__update_rename_nested(self):
         ("Test the `_update()` method with a rename with an embedded "
@@ -577,14 +1200,15 @@ class TestDatabase(unittest.TestCase):
 
         with mock.patch.object(DefaultModel._meta.db, 'find_one') as find_one:
             with mock.patch.object(DefaultModel._meta.db, 'update') as update:
-                find_one.return_value = {'_id': AN_OBJECT_ID, 'a': {'c': 1}}
-
                 m._update({'$rename': {'a.b': 'a.c'}})
 
                 update.assert_called_with(spec={'_id': AN_OBJECT_ID},
                                           document={'$rename': {'a.b': 'a.c'}},
                                           **wc_on)
 
+                # The rename is applied locally without reloading.
+                self.assertFalse(find_one.called)
+
                 self.assertNotIn('b', m._document['a'])
                 self.assertIn('c', m._document['a'])
                 self.assertEqual(m._document['a']['c'], 1)
@@ -662,6 +1286,104 @@ class TestDatabase(unittest.TestCase):
             update.assert_called_with(spec={'_id': AN_OBJECT_ID},
                                       document={'$unset': {'c': 1}}, **wc_on)
 
+    def test__update_session(self):
+        """Test the `_update()` method inside of a session."""
+
+        m = DefaultModel(_id=AN_OBJECT_ID, a=1)
+
+        with mock.patch.object(DefaultModel._meta.db, 'update') as update:
+            with mock.patch.object(DefaultModel._meta.db,
+                                   'find_and_modify') as find_and_modify:
+                with mock.patch.object(sessions.Session, 'flush'):
+                    with sessions.session() as session:
+                        m._update({'$inc': {'a': 1}})
+                        m._update({'$inc': {'a': 2}})
+
+                self.assertFalse(update.called)
+                self.assertFalse(find_and_modify.called)
+
+        # The increments are merged and applied to the instance.
+        self.assertEqual(len(session), 1)
+        self.assertEqual(session._operations[0]['document'],
+                         {'$inc': {'a': 3}})
+        self.assertEqual(m._document['a'], 4)
+
+    def test__update_session_cache(self):
+        ("Test that `_update()` inside of a session removes the document "
+         "from the cache once the session has been flushed.")
+
+        CachedModel = ModelFactory('CachedModel', cache=DocumentCache())
+        CachedModel._meta.cache.set(AN_OBJECT_ID, {'_id': AN_OBJECT_ID})
+
+        m = CachedModel(_id=AN_OBJECT_ID)
+
+        with mock.patch('simon.sessions.BulkWriteError', None):
+            with mock.patch.object(CachedModel._meta.db, 'update') as update:
+                with sessions.session():
+                    m._update({'$set': {'a': 1}})
+
+                    self.assertIsNotNone(
+                        CachedModel._meta.cache.get(AN_OBJECT_ID))
+
+                self.assertTrue(update.called)
+
+        self.assertIsNone(CachedModel._meta.cache.get(AN_OBJECT_ID))
+
+    def test__update_write_behind(self):
+        """Test the `_update()` method with `write_behind`."""
+
+        write_behind = mock.Mock()
+        WriteBehindModel = ModelFactory('WriteBehindModel',
+                                        write_behind=write_behind)
+
+        m = WriteBehindModel(_id=AN_OBJECT_ID, a=1)
+
+        with mock.patch.object(WriteBehindModel._meta.db, 'update') as update:
+            m._update({'$inc': {'a': 1}})
+
+            self.assertFalse(update.called)
+
+        write_behind.update.assert_called_with(
+            WriteBehindModel._meta.db, spec={'_id': AN_OBJECT_ID},
+            document={'$inc': {'a': 1}}, **wc_on)
+
+        self.assertEqual(m._document['a'], 2)
+
+    def test__update_write_behind_cache(self):
+        ("Test that `_update()` with `write_behind` removes the document "
+         "from the cache once the write has been sent.")
+
+        write_behind = mock.Mock()
+        CachedModel = ModelFactory('CachedModel', cache=DocumentCache(),
+                                   write_behind=write_behind)
+        CachedModel._meta.cache.set(AN_OBJECT_ID, {'_id': AN_OBJECT_ID})
+
+        m = CachedModel(_id=AN_OBJECT_ID)
+        m._update({'$set': {'a': 1}})
+
+        self.assertIsNotNone(CachedModel._meta.cache.get(AN_OBJECT_ID))
+
+        write_behind.on_flush.call_args[0][0]()
+
+        self.assertIsNone(CachedModel._meta.cache.get(AN_OBJECT_ID))
+
+    def test__update_session_insert(self):
+        """Test the `_update()` method for an insert inside a session."""
+
+        m = DefaultModel()
+
+        with mock.patch.object(DefaultModel._meta.db, 'insert') as insert:
+            with mock.patch.object(sessions.Session, 'flush'):
+                with sessions.session() as session:
+                    m._update({'a': 1}, upsert=True)
+
+            self.assertFalse(insert.called)
+
+        # The _id is assigned right away.
+        self.assertIsInstance(m._document['_id'], ObjectId)
+        self.assertEqual(session._operations[0]['document'],
+                         {'_id': m._document['_id'], 'a': 1})
+
     def test__update_typed_field(self):
         """Test the `_update()` method with a typed field."""
 
@@ -940,3 +1662,17 @@ class TestDatabase(unittest.TestCase):
 
                 update.assert_called_with(spec={'_id': AN_OBJECT_ID},
                                           document={'a.b': 5}, **wc_on)
+
+    def test__update_use_internal_unset(self):
+        ("Test the `_update()` method with `use_internal` with "
+         "`$unset`.")
+
+        m = DefaultModel(_id=AN_OBJECT_ID, a=1)
+
+        with mock.patch.object(DefaultModel._meta.db, 'update') as update:
+            m._update({'$set': {'a': 1}, '$unset': {'b': 1}},
+                      use_internal=True)
+
+            update.assert_called_with(
+                spec={'_id': AN_OBJECT_ID},
+                document={'$set': {'a': 1}, '$unset': {'b': 1}}, **wc_on)
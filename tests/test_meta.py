@@ -9,6 +9,8 @@ from bson import ObjectId
 import mock
 import pymongo
 
+from simon import sessions
+from simon.cache import DocumentCache, QueryCache, get_query_cache
 from simon.meta import Meta
 
 
@@ -46,14 +48,19 @@ class TestMeta(unittest.TestCase):
         # Use assertEqual for all of these tests to make them easier to
         # read and maintain.
         self.assertEqual(meta.auto_timestamp, True)
+        self.assertEqual(meta.cache, None)
+        self.assertEqual(meta.counters, None)
         self.assertEqual(meta.class_name, 'TestClass')
         self.assertEqual(meta.collection, 'testclasss')
         self.assertEqual(meta.database, 'default')
         self.assertEqual(meta.field_map, {'id': '_id'})
         self.assertEqual(meta.map_id, True)
+        self.assertEqual(meta.query_cache, None)
+        self.assertEqual(meta.reload, True)
         self.assertEqual(meta.required_fields, None)
         self.assertEqual(meta.sort, None)
         self.assertEqual(meta.typed_fields, {'_id': ObjectId})
+        self.assertEqual(meta.write_behind, False)
 
         if pymongo.version_tuple[:2] >= (2, 4):
             self.assertEqual(meta.write_concern, 1)
@@ -158,12 +165,17 @@ class TestMeta(unittest.TestCase):
         # Use assertEqual for all of these tests to make them easier to
         # read and maintain.
         self.assertEqual(meta.auto_timestamp, True)
+        self.assertEqual(meta.cache, None)
+        self.assertEqual(meta.counters, None)
         self.assertEqual(meta.database, 'default')
         self.assertEqual(meta.field_map, {})
         self.assertEqual(meta.map_id, True)
+        self.assertEqual(meta.query_cache, None)
+        self.assertEqual(meta.reload, True)
         self.assertEqual(meta.required_fields, None)
         self.assertEqual(meta.sort, None)
         self.assertEqual(meta.typed_fields, {})
+        self.assertEqual(meta.write_behind, False)
 
         if pymongo.version_tuple[:2] >= (2, 4):
             self.assertEqual(meta.write_concern, 1)
@@ -176,6 +188,58 @@ class TestMeta(unittest.TestCase):
         self.assertFalse(hasattr(meta, 'class_name'))
         self.assertFalse(hasattr(meta, 'collection'))
 
+    def test_cache(self):
+        """Test the `cache` attribute."""
+
+        meta = Meta(mock.Mock(cache={'max_size': 10, 'ttl': 30}))
+
+        meta.add_to_original(TestClass, '_meta')
+
+        self.assertIsInstance(TestClass._meta.cache, DocumentCache)
+        self.assertEqual(TestClass._meta.cache.max_size, 10)
+        self.assertEqual(TestClass._meta.cache.ttl, 30)
+
+        # True uses the default settings.
+        meta = Meta(mock.Mock(cache=True))
+
+        meta.add_to_original(TestClass, '_meta')
+
+        self.assertIsInstance(TestClass._meta.cache, DocumentCache)
+        self.assertEqual(TestClass._meta.cache.max_size, 1000)
+        self.assertEqual(TestClass._meta.cache.ttl, None)
+
+        # A cache of the model's own can be used, too.
+        cache = DocumentCache()
+        meta = Meta(mock.Mock(cache=cache))
+
+        meta.add_to_original(TestClass, '_meta')
+
+        self.assertIs(TestClass._meta.cache, cache)
+
+    def test_invalid_field(self):
+        """Test the `invalid_field()` method."""
+
+        meta = Meta(mock.Mock(typed_fields={'a': int, 'b': [int],
+                                            'c.d': str, 'e': None}))
+
+        meta.add_to_original(TestClass, '_meta')
+
+        self.assertIsNone(meta.invalid_field({}))
+        self.assertIsNone(meta.invalid_field({'a': 1, 'b': [1, 2], 'e': 'e',
+                                              'f': 'f'}))
+        self.assertIsNone(meta.invalid_field({'c': {'d': 'd'}}))
+        self.assertIsNone(meta.invalid_field({'c.d': 'd'}))
+        self.assertIsNone(meta.invalid_field({'c': {'e': 1}}))
+
+        self.assertEqual(meta.invalid_field({'a': 'a'}), ('a', int))
+        self.assertEqual(meta.invalid_field({'b': [1, 'b']}), ('b', [int]))
+        self.assertEqual(meta.invalid_field({'c': {'d': 1}}), ('c.d', str))
+        self.assertEqual(meta.invalid_field({'c.d': 1}), ('c.d', str))
+
+        # Replacing typed_fields takes effect right away.
+        meta.typed_fields = {'a': str}
+        self.assertIsNone(meta.invalid_field({'a': 'a'}))
+
     def test_map_id(self):
         """Test the `map_id` attribute."""
 
@@ -185,6 +249,54 @@ class TestMeta(unittest.TestCase):
 
         self.assertFalse(TestClass._meta.map_id)
 
+    def test_map_key(self):
+        """Test the `map_key()` method."""
+
+        meta = Meta(mock.Mock(field_map={'a': 'b.c'}))
+
+        meta.add_to_original(TestClass, '_meta')
+
+        self.assertEqual(meta.map_key('a'), 'b.c')
+        self.assertEqual(meta.map_key('a__d'), 'a.d')
+        self.assertEqual(meta.map_key('id'), '_id')
+
+        # A new field_map replaces the translations.
+        meta.field_map = {'a': 'e'}
+
+        self.assertEqual(meta.map_key('a'), 'e')
+
+        # So do changes made to it in place.
+        meta.field_map['a'] = 'f'
+
+        self.assertEqual(meta.map_key('a'), 'f')
+
+    def test_query_cache(self):
+        """Test the `query_cache` attribute."""
+
+        meta = Meta(mock.Mock(query_cache={'max_size': 500, 'ttl': 5}))
+
+        meta.add_to_original(TestClass, '_meta')
+
+        self.assertIsInstance(TestClass._meta.query_cache, QueryCache)
+        self.assertEqual(TestClass._meta.query_cache.max_size, 500)
+        self.assertEqual(TestClass._meta.query_cache.ttl, 5)
+
+        # True uses the shared cache.
+        meta = Meta(mock.Mock(query_cache=True))
+
+        meta.add_to_original(TestClass, '_meta')
+
+        self.assertIs(TestClass._meta.query_cache, get_query_cache())
+
+    def test_reload(self):
+        """Test the `reload` attribute."""
+
+        meta = Meta(mock.Mock(reload=False))
+
+        meta.add_to_original(TestClass, '_meta')
+
+        self.assertFalse(TestClass._meta.reload)
+
     def test_repr(self):
         """Test the `__repr__()` method."""
 
@@ -195,6 +307,24 @@ class TestMeta(unittest.TestCase):
         self.assertEqual('{0!r}'.format(meta),
                          '<Meta options for TestClass>')
 
+    def test_write_behind(self):
+        """Test the `write_behind` attribute."""
+
+        meta = Meta(mock.Mock(write_behind=True))
+
+        meta.add_to_original(TestClass, '_meta')
+
+        self.assertIs(TestClass._meta.write_behind,
+                      sessions.get_write_behind())
+
+        # A queue of the model's own can be used, too.
+        write_behind = sessions.WriteBehind()
+        meta = Meta(mock.Mock(write_behind=write_behind))
+
+        meta.add_to_original(TestClass, '_meta')
+
+        self.assertIs(TestClass._meta.write_behind, write_behind)
+
     def test_required_fields(self):
         """Test the `required_fields` attribute."""
 
@@ -204,6 +334,7 @@ class TestMeta(unittest.TestCase):
         meta.add_to_original(TestClass, '_meta')
 
         self.assertEqual(TestClass._meta.required_fields, ('a',))
+        self.assertEqual(TestClass._meta.required, frozenset(['a']))
 
         # multiple values
         meta = Meta(mock.Mock(required_fields=['a', 'b']))
@@ -211,6 +342,11 @@ class TestMeta(unittest.TestCase):
         meta.add_to_original(TestClass, '_meta')
 
         self.assertEqual(TestClass._meta.required_fields, ['a', 'b'])
+        self.assertEqual(TestClass._meta.required, frozenset(['a', 'b']))
+
+        # Replacing required_fields takes effect right away.
+        TestClass._meta.required_fields = 'c'
+        self.assertEqual(TestClass._meta.required, frozenset(['c']))
 
     @skip_with_mongoclient
     def test_safe(self):
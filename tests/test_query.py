@@ -10,13 +10,21 @@ try:
 except ImportError:
     import mock
 
+import pymongo
 from pymongo.cursor import Cursor
 
-from simon import connection, query
-from simon._compat import range
+from simon import connection, query, sessions
+from simon._compat import PY2, range
+from simon.cache import DocumentCache, QueryCache
 
 from .utils import AN_OBJECT_ID, ModelFactory
 
+# Set the write concern argument
+if pymongo.version_tuple[:2] >= (2, 4):
+    wc_on = {'w': 1}
+else:
+    wc_on = {'safe': True}
+
 DefaultModel = ModelFactory('DefaultModel')
 MappedModel = ModelFactory('MappedModel', field_map={'fake': 'real'})
 
@@ -149,6 +157,110 @@ class TestQuerySet(unittest.TestCase):
         cls.qs = query.QuerySet(cursor=cls.cursor)
         cls.model_qs = query.QuerySet(cursor=cls.cursor, cls=DefaultModel)
 
+        # QuerySets created through a model know their query.
+        cls.qs._spec = {}
+        cls.model_qs._spec = {}
+
+    def test_after(self):
+        """Test the `after()` method."""
+
+        self.qs._spec = {'a': 1}
+        self.qs._ordering = [('b', 1), ('c', -1)]
+
+        qs = self.qs.after({'_id': AN_OBJECT_ID, 'b': 2, 'c': 3})
+
+        spec = {'$and': [{'a': 1}, {'$or': [
+            {'b': {'$gt': 2}},
+            {'b': 2, 'c': {'$lt': 3}},
+            {'b': 2, 'c': None},
+            {'b': 2, 'c': 3, '_id': {'$gt': AN_OBJECT_ID}},
+        ]}]}
+        self.cursor.collection.find.assert_called_with(spec)
+
+        self.assertEqual(qs._spec, spec)
+        self.assertEqual(qs._sorting, [('b', 1), ('c', -1), ('_id', 1)])
+        self.assertEqual((qs._skip, qs._limit), (0, 0))
+
+    def test_after_model(self):
+        """Test the `after()` method with a model instance."""
+
+        self.model_qs._ordering = [('a.b', -1), ('_id', -1)]
+
+        self.model_qs.after(DefaultModel(_id=AN_OBJECT_ID, a={'b': 1}))
+
+        self.cursor.collection.find.assert_called_with({'$or': [
+            {'a.b': {'$lt': 1}},
+            {'a.b': None},
+            {'a.b': 1, '_id': {'$lt': AN_OBJECT_ID}},
+        ]})
+
+    def test_after_missing_field(self):
+        ("Test that `after()` treats missing fields as null.")
+
+        self.qs._ordering = [('a', 1)]
+
+        self.qs.after({'_id': AN_OBJECT_ID})
+
+        self.cursor.collection.find.assert_called_with({'$or': [
+            {'a': {'$ne': None}},
+            {'a': None, '_id': {'$gt': AN_OBJECT_ID}},
+        ]})
+
+        # Null and missing values come last in a descending sort.
+        self.qs._ordering = [('a', -1)]
+
+        self.qs.after({'_id': AN_OBJECT_ID, 'a': 1})
+
+        self.cursor.collection.find.assert_called_with({'$or': [
+            {'a': {'$lt': 1}},
+            {'a': None},
+            {'a': 1, '_id': {'$gt': AN_OBJECT_ID}},
+        ]})
+
+        self.qs.after({'_id': AN_OBJECT_ID})
+
+        self.cursor.collection.find.assert_called_with({'$or': [
+            {'a': None, '_id': {'$gt': AN_OBJECT_ID}},
+        ]})
+
+    def test_after_token(self):
+        """Test the `after()` method with a token."""
+
+        self.qs._ordering = [('a', 1)]
+
+        token = query._encode_token([('a', 1), ('_id', 1)],
+                                    [2, AN_OBJECT_ID])
+        self.qs.after(token)
+
+        self.cursor.collection.find.assert_called_with({'$or': [
+            {'a': {'$gt': 2}},
+            {'a': 2, '_id': {'$gt': AN_OBJECT_ID}},
+        ]})
+
+    def test_after_token_valueerror(self):
+        """Test that `after()` raises `ValueError` for bad tokens."""
+
+        with self.assertRaises(ValueError):
+            self.qs.after('not a token')
+
+        # A token for a different sort can't be used.
+        token = query._encode_token([('a', 1), ('_id', 1)],
+                                    [2, AN_OBJECT_ID])
+        with self.assertRaises(ValueError):
+            self.qs.after(token)
+
+    def test_after_typeerror(self):
+        """Test that `after()` raises `TypeError`."""
+
+        qs = query.QuerySet()
+        with self.assertRaises(TypeError):
+            qs.after({'_id': AN_OBJECT_ID})
+
+        # Without the query, the new one would match every document.
+        qs = query.QuerySet(cursor=self.cursor)
+        with self.assertRaises(TypeError):
+            qs.after({'_id': AN_OBJECT_ID})
+
     def test_count(self):
         """Test the `count()` method."""
 
@@ -168,6 +280,83 @@ class TestQuerySet(unittest.TestCase):
         with self.assertRaises(TypeError):
             qs.count()
 
+    def test_delete(self):
+        """Test the `delete()` method."""
+
+        self.model_qs._spec = {'a': 1}
+        self.cursor.collection.remove.return_value = {'n': 2}
+
+        self.assertEqual(self.model_qs.delete(), 2)
+
+        self.cursor.collection.remove.assert_called_with({'a': 1}, **wc_on)
+
+    def test_delete_identity_map(self):
+        ("Test that `delete()` removes the collection's instances from "
+         "the identity map.")
+
+        self.cursor.collection.full_name = 'test.collection'
+
+        with sessions.identity_map() as identity_map:
+            m = DefaultModel._from_db({'_id': AN_OBJECT_ID})
+            identity_map.add(self.cursor.collection, m)
+
+            self.model_qs.delete()
+
+            self.assertIsNone(identity_map.get(self.cursor.collection,
+                                               AN_OBJECT_ID))
+
+    def test_delete_session(self):
+        ("Test that `delete()` sends the writes queued before it "
+         "first.")
+
+        collection = self.cursor.collection
+
+        def check(*args, **kwargs):
+            self.assertTrue(collection.insert.called)
+            return {'n': 1}
+        collection.remove.side_effect = check
+
+        with mock.patch('simon.sessions.BulkWriteError', None):
+            with sessions.session() as session:
+                session.insert(collection, {'_id': AN_OBJECT_ID})
+                self.model_qs.delete()
+
+                self.assertEqual(len(session), 0)
+
+        self.assertEqual(collection.insert.call_count, 1)
+        self.assertTrue(collection.remove.called)
+
+    def test_delete_write_behind(self):
+        ("Test that `delete()` waits for the model's write-behind "
+         "queue.")
+
+        write_behind = mock.Mock()
+        self.model_qs._cls = ModelFactory('WriteBehindModel',
+                                          write_behind=write_behind)
+
+        self.model_qs.delete()
+
+        write_behind.flush.assert_called_with()
+
+    def test_delete_typeerror(self):
+        """Test that `delete()` raises `TypeError`."""
+
+        qs = query.QuerySet()
+        with self.assertRaises(TypeError):
+            qs.delete()
+
+        # Without the query, every document would be deleted.
+        qs = query.QuerySet(cursor=self.cursor)
+        with self.assertRaises(TypeError):
+            qs.delete()
+
+        # A QuerySet that has been sliced can't be deleted all at once.
+        self.qs._limit = 1
+        with self.assertRaises(TypeError):
+            self.qs.delete()
+
+        self.assertFalse(self.cursor.collection.remove.called)
+
     def test_distinct(self):
         """Test the `distinct()` method."""
 
@@ -191,6 +380,122 @@ class TestQuerySet(unittest.TestCase):
 
         self.cursor.distinct.assert_called_with('a.b')
 
+    def test_exclude(self):
+        """Test the `exclude()` method."""
+
+        self.qs._spec = {'a': 1}
+
+        qs = self.qs.exclude('b', 'c__d')
+
+        self.cursor.collection.find.assert_called_with(
+            {'a': 1}, {'b': 0, 'c__d': 0})
+        self.assertEqual(qs._fields, {'b': 0, 'c__d': 0})
+
+        # Exclusions are combined. The new cursor comes from the
+        # collection of the one created above.
+        qs = qs.exclude('e')
+        self.cursor.collection.find().collection.find.assert_called_with(
+            {'a': 1}, {'b': 0, 'c__d': 0, 'e': 0})
+
+    def test_exclude_field_map(self):
+        """Test the `exclude()` method with a name in `field_map`."""
+
+        self.model_qs._cls = MappedModel
+
+        self.model_qs.exclude('fake', 'a__b')
+
+        self.cursor.collection.find.assert_called_with(
+            {}, {'real': 0, 'a.b': 0})
+
+    def test_exclude_only(self):
+        """Test the `exclude()` method after `only()`."""
+
+        qs = self.qs.only('a', 'b')
+        find = self.cursor.collection.find
+        find.assert_called_with({}, {'a': 1, 'b': 1})
+
+        # Excluding an included field stops including it. _id can still
+        # be excluded.
+        qs = qs.exclude('b', '_id')
+        find = find().collection.find
+        find.assert_called_with({}, {'a': 1, '_id': 0})
+        self.assertEqual(qs._fields, {'a': 1, '_id': 0})
+
+        # Once nothing is included, _id is included so that the
+        # projection doesn't turn into an exclusion.
+        qs = qs.exclude('a')
+        find = find().collection.find
+        find.assert_called_with({}, {'_id': 1})
+        self.assertEqual(qs._fields, {'_id': 1})
+
+    def test_increment(self):
+        """Test the `increment()` method."""
+
+        self.model_qs._cls = MappedModel
+        self.model_qs._spec = {'a': 1}
+        self.cursor.collection.update.return_value = {'n': 3}
+
+        self.assertEqual(self.model_qs.increment('fake', b=2), 3)
+
+        self.cursor.collection.update.assert_called_with(
+            {'a': 1}, {'$inc': {'real': 1, 'b': 2}}, multi=True, **wc_on)
+
+    def test_increment_valueerror(self):
+        """Test that `increment()` raises `ValueError`."""
+
+        with self.assertRaises(ValueError):
+            self.qs.increment()
+
+    def test_iterator(self):
+        """Test the `iterator()` method."""
+
+        clone = self.cursor.clone.return_value
+        clone.__iter__.return_value = iter([{'a': 1}, {'a': 2}])
+
+        actual = list(self.qs.iterator())
+
+        self.cursor.clone.assert_called_with()
+        self.assertEqual(actual, [{'a': 1}, {'a': 2}])
+
+        # The documents should not be cached.
+        self.assertEqual(self.qs._items, [])
+
+    def test_iterator_as_model(self):
+        """Test that `iterator()` yields model instances."""
+
+        clone = self.cursor.clone.return_value
+        clone.__iter__.return_value = iter([{'_id': AN_OBJECT_ID}])
+
+        actual = list(self.model_qs.iterator())
+
+        self.assertIsInstance(actual[0], DefaultModel)
+        self.assertEqual(actual[0]._document, {'_id': AN_OBJECT_ID})
+        self.assertEqual(self.model_qs._items, [])
+
+    def test_iterator_batch_size(self):
+        """Test the `iterator()` method with `batch_size`."""
+
+        list(self.qs.iterator(batch_size=100))
+
+        self.cursor.clone().batch_size.assert_called_with(100)
+
+    def test_iterator_sort(self):
+        """Test that `iterator()` applies the sort to the clone."""
+
+        self.qs._sorting = [('a', 1)]
+
+        list(self.qs.iterator())
+
+        self.cursor.clone().sort.assert_called_with([('a', 1)])
+        self.cursor.sort.assert_not_called()
+
+    def test_iterator_typeerror(self):
+        """Test that `iterator()` raises `TypeError`."""
+
+        qs = query.QuerySet()
+        with self.assertRaises(TypeError):
+            next(qs.iterator())
+
     def test_limit(self):
         """Test the `limit()` method."""
 
@@ -202,6 +507,162 @@ class TestQuerySet(unittest.TestCase):
         self.cursor.clone.assert_called_with()
         self.cursor.clone().limit.assert_called_with(2)
 
+    def test_limit_keeps_state(self):
+        """Test that `limit()` keeps the skip and sorting."""
+
+        self.qs._skip = 10
+        self.qs._sorting = [('a', 1)]
+
+        qs = self.qs.limit(5)
+
+        self.assertEqual((qs._skip, qs._limit), (10, 5))
+        self.assertEqual(qs._sorting, [('a', 1)])
+
+    def test_only(self):
+        """Test the `only()` method."""
+
+        self.qs._spec = {'a': 1}
+        self.qs._skip = 10
+        self.qs._limit = 5
+        self.qs._ordering = [('b', 1)]
+
+        qs = self.qs.only('b', 'c')
+
+        find = self.cursor.collection.find
+        find.assert_called_with({'a': 1}, {'b': 1, 'c': 1})
+        find().skip.assert_called_with(10)
+        find().limit.assert_called_with(5)
+
+        self.assertEqual(qs._fields, {'b': 1, 'c': 1})
+        self.assertEqual((qs._skip, qs._limit), (10, 5))
+        self.assertEqual(qs._sorting, [('b', 1)])
+
+        # only() replaces the existing projection. The new cursor comes
+        # from the collection of the one created above.
+        qs = qs.only('d')
+        find().collection.find.assert_called_with({'a': 1}, {'d': 1})
+
+    def test_only_field_map(self):
+        """Test the `only()` method with a name in `field_map`."""
+
+        self.model_qs._cls = MappedModel
+
+        self.model_qs.only('_id', 'fake')
+
+        self.cursor.collection.find.assert_called_with(
+            {}, {'_id': 1, 'real': 1})
+
+    def test_only_typeerror(self):
+        """Test that `only()` raises `TypeError`."""
+
+        qs = query.QuerySet()
+        with self.assertRaises(TypeError):
+            qs.only('a')
+
+        qs = query.QuerySet(cursor=self.cursor)
+        with self.assertRaises(TypeError):
+            qs.only('a')
+
+    def test_page_by(self):
+        """Test the `page_by()` method."""
+
+        self.qs._spec = {'a': 1}
+
+        find = self.cursor.collection.find
+        cursor = find.return_value.clone.return_value.skip.return_value
+        cursor = cursor.limit.return_value
+        self._set_documents([{'_id': 1}, {'_id': 2}], cursor)
+
+        items, token = self.qs.page_by(2)
+
+        find.assert_called_with({'a': 1})
+        find().clone().skip.assert_called_with(0)
+        find().clone().skip().limit.assert_called_with(2)
+        cursor.sort.assert_called_with([('_id', 1)])
+
+        self.assertEqual(items, [{'_id': 1}, {'_id': 2}])
+        self.assertEqual(query._decode_token(token, [('_id', 1)]), [2])
+
+        # The next page starts after the token.
+        self._set_documents([{'_id': 3}], cursor)
+
+        items, token = self.qs.page_by(2, token)
+
+        find.assert_called_with({'$and': [{'a': 1}, {'$or': [
+            {'_id': {'$gt': 2}},
+        ]}]})
+
+        self.assertEqual(items, [{'_id': 3}])
+        self.assertIsNone(token)
+
+    def test_page_by_missing_field(self):
+        ("Test that `page_by()` continues past missing sort fields.")
+
+        self.qs._ordering = [('n', 1)]
+
+        find = self.cursor.collection.find
+        cursor = find.return_value.clone.return_value.skip.return_value
+        cursor = cursor.limit.return_value
+        self._set_documents([{'_id': 1}, {'_id': 2}], cursor)
+
+        items, token = self.qs.page_by(2)
+
+        self.assertEqual(query._decode_token(token, [('n', 1), ('_id', 1)]),
+                         [None, 2])
+
+        # The next page holds the rest of the documents without the
+        # field followed by the ones with it.
+        self._set_documents([{'_id': 3}, {'_id': 4, 'n': 1}], cursor)
+
+        items, token = self.qs.page_by(2, token)
+
+        find.assert_called_with({'$or': [
+            {'n': {'$ne': None}},
+            {'n': None, '_id': {'$gt': 2}},
+        ]})
+        self.assertEqual(items, [{'_id': 3}, {'_id': 4, 'n': 1}])
+
+    def test_page_by_only(self):
+        """Test that `page_by()` retrieves the sort fields."""
+
+        self.qs._ordering = [('a', 1)]
+        self.qs._fields = {'b': 1}
+
+        find = self.cursor.collection.find
+        cursor = find.return_value.clone.return_value.skip.return_value
+        cursor = cursor.limit.return_value
+
+        self._set_documents([], cursor)
+        self.qs.page_by(10)
+
+        self.cursor.collection.find.assert_called_with(
+            {}, {'a': 1, 'b': 1, '_id': 1})
+
+        self.qs._fields = {'a': 0, 'b': 0}
+
+        self._set_documents([], cursor)
+        self.qs.page_by(10)
+
+        self.cursor.collection.find.assert_called_with({}, {'b': 0})
+
+    def test_page_by_typeerror(self):
+        """Test that `page_by()` raises `TypeError`."""
+
+        qs = query.QuerySet()
+        with self.assertRaises(TypeError):
+            qs.page_by(10)
+
+    def test_page_by_valueerror(self):
+        """Test that `page_by()` raises `ValueError` for bad sizes."""
+
+        with self.assertRaises(ValueError):
+            self.qs.page_by(0)
+
+        with self.assertRaises(ValueError):
+            self.qs.page_by(-1)
+
+        self.assertFalse(self.cursor.collection.find.called)
+
     def test_skip(self):
         """Test the `skip()` method."""
 
@@ -213,6 +674,17 @@ class TestQuerySet(unittest.TestCase):
         self.cursor.clone.assert_called_with()
         self.cursor.clone().skip.assert_called_with(2)
 
+    def test_skip_keeps_state(self):
+        """Test that `skip()` keeps the limit and sorting."""
+
+        self.qs._limit = 5
+        self.qs._sorting = [('a', 1)]
+
+        qs = self.qs.skip(10)
+
+        self.assertEqual((qs._skip, qs._limit), (10, 5))
+        self.assertEqual(qs._sorting, [('a', 1)])
+
     def test_sort(self):
         """Test the `sort()` method."""
 
@@ -226,6 +698,16 @@ class TestQuerySet(unittest.TestCase):
         self.assertEqual(qs._sorting, [('_id', -1)])
         qs._cursor.sort.assert_not_called()
 
+    def test_sort_ordering(self):
+        """Test that `sort()` keeps the ordering once it's applied."""
+
+        qs = self.qs.sort('a')
+        self._set_documents([{'a': 1}], qs._cursor)
+        qs._fill_to(0)
+
+        self.assertIsNone(qs._sorting)
+        self.assertEqual(qs._ordering, [('a', 1)])
+
     def test_sort_field_map(self):
         """Test the `sort()` method with a name in `field_map`."""
 
@@ -276,10 +758,218 @@ class TestQuerySet(unittest.TestCase):
         self.assertEqual(qs._sorting, [('a.b', 1)])
         qs._cursor.sort.assert_not_called()
 
+    def test_update(self):
+        """Test the `update()` method."""
+
+        self.model_qs._cls = MappedModel
+        self.cursor.collection.update.return_value = {'n': 3}
+
+        self.assertEqual(self.model_qs.update(fake=1, a__b=2), 3)
+
+        self.cursor.collection.update.assert_called_with(
+            {}, {'$set': {'real': 1, 'a.b': 2}}, multi=True, **wc_on)
+
+    def test_update_identity_map(self):
+        ("Test that `update()` removes the collection's instances from "
+         "the identity map.")
+
+        self.cursor.collection.full_name = 'test.collection'
+
+        with sessions.identity_map() as identity_map:
+            m = DefaultModel._from_db({'_id': AN_OBJECT_ID})
+            identity_map.add(self.cursor.collection, m)
+
+            self.model_qs.update(a=1)
+
+            self.assertIsNone(identity_map.get(self.cursor.collection,
+                                               AN_OBJECT_ID))
+
+    def test_update_session(self):
+        ("Test that `update()` sends the writes queued before it "
+         "first.")
+
+        collection = self.cursor.collection
+
+        def check(*args, **kwargs):
+            self.assertTrue(collection.insert.called)
+            return {'n': 1}
+        collection.update.side_effect = check
+
+        with mock.patch('simon.sessions.BulkWriteError', None):
+            with sessions.session():
+                sessions.get_session().insert(collection,
+                                              {'_id': AN_OBJECT_ID})
+                self.model_qs.update(a=1)
+
+        self.assertTrue(collection.update.called)
+
+    def test_update_cache(self):
+        """Test that `update()` clears the caches of the model class."""
+
+        self.model_qs._cls = ModelFactory('CachedModel',
+                                          cache=DocumentCache(),
+                                          query_cache=QueryCache())
+        self.model_qs._cls._meta.cache.set(AN_OBJECT_ID, {'_id': 1})
+        self.model_qs._cls._meta.query_cache.set(
+            self.cursor.collection.full_name, (), [{'_id': 1}])
+
+        self.model_qs.update(a=1)
+
+        self.assertEqual(len(self.model_qs._cls._meta.cache), 0)
+        self.assertEqual(len(self.model_qs._cls._meta.query_cache), 0)
+
+    def test_update_typed_fields(self):
+        """Test that `update()` enforces `typed_fields`."""
+
+        self.model_qs._cls = ModelFactory('TypedModel',
+                                          typed_fields={'a': int})
+
+        with self.assertRaises(TypeError):
+            self.model_qs.update(a='b')
+
+        self.assertFalse(self.cursor.collection.update.called)
+
+    def test_update_typeerror(self):
+        """Test that `update()` raises `TypeError`."""
+
+        qs = query.QuerySet()
+        with self.assertRaises(TypeError):
+            qs.update(a=1)
+
+        qs = query.QuerySet(cursor=self.cursor)
+        with self.assertRaises(TypeError):
+            qs.update(a=1)
+
+        self.assertFalse(self.cursor.collection.update.called)
+
+        self.qs._skip = 1
+        with self.assertRaises(TypeError):
+            self.qs.update(a=1)
+
+    def test_update_valueerror(self):
+        """Test that `update()` raises `ValueError`."""
+
+        with self.assertRaises(ValueError):
+            self.qs.update()
+
+    def test_values(self):
+        """Test the `values()` method."""
+
+        qs = self.qs.values()
+
+        self.cursor.clone.assert_called_with()
+        self._set_documents([{'a': 1}, {'a': 2}], qs._cursor)
+
+        self.assertEqual(list(qs), [{'a': 1}, {'a': 2}])
+
+    def test_values_field_map(self):
+        """Test the `values()` method with names in `field_map`."""
+
+        self.model_qs._cls = MappedModel
+
+        qs = self.model_qs.values()
+        self._set_documents([{'_id': AN_OBJECT_ID, 'real': 1, 'b': 2}],
+                            qs._cursor)
+
+        self.assertEqual(list(qs),
+                         [{'_id': AN_OBJECT_ID, 'fake': 1, 'b': 2}])
+
+    def test_values_fields(self):
+        """Test the `values()` method with fields."""
+
+        self.model_qs._cls = MappedModel
+
+        qs = self.model_qs.values('_id', 'fake', 'a__b')
+
+        find = self.cursor.collection.find
+        find.assert_called_with({}, {'_id': 1, 'real': 1, 'a.b': 1})
+
+        self._set_documents([
+            {'_id': AN_OBJECT_ID, 'real': 1, 'a': {'b': 2}},
+            {'_id': AN_OBJECT_ID},
+        ], qs._cursor)
+
+        self.assertEqual(list(qs), [
+            {'_id': AN_OBJECT_ID, 'fake': 1, 'a__b': 2},
+            {'_id': AN_OBJECT_ID, 'fake': None, 'a__b': None},
+        ])
+
+    def test_values_page_by(self):
+        """Test that `page_by()` builds tokens from the documents."""
+
+        self.qs._ordering = [('a', 1)]
+
+        qs = self.qs.values_list('b', flat=True)
+
+        # The pages come from the collection of the projected cursor.
+        find = qs._cursor.collection.find
+        cursor = find.return_value.clone.return_value.skip.return_value
+        cursor = cursor.limit.return_value
+        self._set_documents([{'_id': 1, 'a': 2, 'b': 3}], cursor)
+
+        items, token = qs.page_by(1)
+
+        self.assertEqual(items, [3])
+        self.assertEqual(
+            query._decode_token(token, [('a', 1), ('_id', 1)]), [2, 1])
+
+    def test_values_typeerror(self):
+        """Test that `values()` raises `TypeError`."""
+
+        qs = query.QuerySet()
+        with self.assertRaises(TypeError):
+            qs.values()
+
+    def test_values_list(self):
+        """Test the `values_list()` method."""
+
+        self.model_qs._cls = MappedModel
+
+        qs = self.model_qs.values_list('fake', 'a')
+
+        self.cursor.collection.find.assert_called_with(
+            {}, {'real': 1, 'a': 1})
+
+        self._set_documents([{'real': 1, 'a': 2}, {'a': 3}], qs._cursor)
+
+        self.assertEqual(list(qs), [(1, 2), (None, 3)])
+
+    def test_values_list_flat(self):
+        """Test the `values_list()` method with `flat`."""
+
+        qs = self.qs.values_list('a', flat=True)
+
+        self._set_documents([{'a': 1}, {'a': 2}], qs._cursor)
+
+        self.assertEqual(list(qs), [1, 2])
+
+    def test_values_list_typeerror(self):
+        """Test that `values_list()` raises `TypeError`."""
+
+        with self.assertRaises(TypeError):
+            self.qs.values_list()
+
+        with self.assertRaises(TypeError):
+            self.qs.values_list('a', 'b', flat=True)
+
+        with self.assertRaises(TypeError):
+            self.qs.values_list('a', flatten=True)
+
+    def _set_documents(self, documents, cursor=None):
+        """Make the cursor return ``documents`` and then run out."""
+
+        if cursor is None:
+            cursor = self.cursor
+
+        if PY2:
+            cursor.next.side_effect = documents
+        else:
+            cursor.__next__.side_effect = documents
+
     def test__fill_to(self):
         """Test the `_fill_to()` method."""
 
-        self.cursor.count.return_value = 3
+        self._set_documents([{'a': 1}, {'a': 2}, {'a': 3}])
 
         self.qs._fill_to(2)
 
@@ -288,11 +978,7 @@ class TestQuerySet(unittest.TestCase):
     def test__fill_to_as_documents(self):
         """Test that `_fill_to()` stores documents."""
 
-        if hasattr(self.cursor, 'next'):
-            self.cursor.next.return_value = {'_id': AN_OBJECT_ID}
-        else:
-            self.cursor.__next__.return_value = {'_id': AN_OBJECT_ID}
-        self.cursor.count.return_value = 1
+        self._set_documents([{'_id': AN_OBJECT_ID}])
 
         self.qs._fill_to(0)
 
@@ -301,40 +987,148 @@ class TestQuerySet(unittest.TestCase):
     def test__fill_to_as_model(self):
         """Test that `_fill_to()` stores model instances."""
 
-        if hasattr(self.cursor, 'next'):
-            self.cursor.next.return_value = {'_id': AN_OBJECT_ID}
-        else:
-            self.cursor.__next__.return_value = {'_id': AN_OBJECT_ID}
-        self.cursor.count.return_value = 1
+        document = {'_id': AN_OBJECT_ID}
+        self._set_documents([document])
 
         self.model_qs._fill_to(0)
 
         self.assertIsInstance(self.model_qs._items[0], self.model_qs._cls)
+        # The document is used as is.
+        self.assertIs(self.model_qs._items[0]._document, document)
 
     def test__fill_to_indexes(self):
         ("Test that `_fill_to()` property fills to the specified "
          "index.")
 
-        self.cursor.count.return_value = 3
+        self._set_documents([{'a': 1}, {'a': 2}, {'a': 3}])
 
         for x in range(3):
             self.qs._fill_to(x)
             self.assertEqual(len(self.qs._items), x + 1)
 
+    def test__fill_to_no_count(self):
+        """Test that `_fill_to()` doesn't count the documents."""
+
+        self._set_documents([{'a': 1}, {'a': 2}, {'a': 3}])
+
+        self.qs._fill_to(1)
+        self.qs._fill_to(5)
+
+        self.assertFalse(self.cursor.count.called)
+
     def test__fill_to_overfill(self):
         ("Test that `_fill_to()` correctly handles indexes greater than"
          " the maximum index of the result cache.")
 
-        self.cursor.count.return_value = 3
+        self._set_documents([{'a': 1}, {'a': 2}, {'a': 3}])
 
         self.qs._fill_to(3)
 
         self.assertEqual(len(self.qs._items), 3)
 
+        # Once the cursor runs out, the count is known.
+        self.assertEqual(self.qs.count(), 3)
+        self.assertFalse(self.cursor.count.called)
+
+    def test__fill_to_query_cache(self):
+        """Test that `_fill_to()` uses the query cache."""
+
+        CachedModel = ModelFactory('CachedModel', query_cache=QueryCache())
+
+        self._set_documents([{'_id': 1, 'a': 1}, {'_id': 2, 'a': 1}])
+
+        qs = query.QuerySet(cursor=self.cursor, cls=CachedModel)
+        qs._spec = {'a': 1}
+        qs._fill_to(5)
+
+        # The results are added once the cursor runs out.
+        self.assertEqual(len(CachedModel._meta.query_cache), 1)
+
+        cursor = mock.MagicMock(spec=Cursor)
+        cursor.collection = self.cursor.collection
+
+        qs = query.QuerySet(cursor=cursor, cls=CachedModel)
+        qs._spec = {'a': 1}
+        qs._fill_to(0)
+
+        self.assertEqual([m._document for m in qs._items],
+                         [{'_id': 1, 'a': 1}, {'_id': 2, 'a': 1}])
+        self.assertEqual(qs.count(), 2)
+        self.assertFalse(cursor.count.called)
+        if PY2:
+            self.assertFalse(cursor.next.called)
+        else:
+            self.assertFalse(cursor.__next__.called)
+
+        # Other queries don't share the results.
+        qs = query.QuerySet(cursor=cursor, cls=CachedModel)
+        qs._spec = {'a': 1}
+        qs._limit = 1
+        self._set_documents([{'_id': 1, 'a': 1}], cursor)
+        qs._fill_to(1)
+
+        self.assertEqual(len(CachedModel._meta.query_cache), 2)
+
+    def test__fill_to_query_cache_no_spec(self):
+        ("Test that `_fill_to()` doesn't cache results without the "
+         "query.")
+
+        CachedModel = ModelFactory('CachedModel', query_cache=QueryCache())
+
+        self._set_documents([{'_id': 1, 'a': 1}])
+
+        qs = query.QuerySet(cursor=self.cursor, cls=CachedModel)
+        qs._fill_to(5)
+
+        self.assertEqual(len(qs._items), 1)
+        self.assertEqual(len(CachedModel._meta.query_cache), 0)
+
+    def test__fill_to_query_cache_iter(self):
+        ("Test that iterating over results from the query cache doesn't "
+         "read the cursor.")
+
+        CachedModel = ModelFactory('CachedModel', query_cache=QueryCache())
+
+        documents = [{'_id': 1, 'a': 1}, {'_id': 2, 'a': 1}]
+
+        for i in range(2):
+            cursor = mock.MagicMock(spec=Cursor)
+            cursor.collection = self.cursor.collection
+            self._set_documents(list(documents), cursor)
+
+            qs = query.QuerySet(cursor=cursor, cls=CachedModel)
+            qs._spec = {'a': 1}
+
+            self.assertEqual([m._document for m in qs], documents)
+
+        # The second time, everything came from the query cache.
+        if PY2:
+            self.assertFalse(cursor.next.called)
+        else:
+            self.assertFalse(cursor.__next__.called)
+
+    def test__fill_to_query_cache_invalidated(self):
+        ("Test that `_fill_to()` doesn't cache results read during a "
+         "write.")
+
+        CachedModel = ModelFactory('CachedModel', query_cache=QueryCache())
+
+        self._set_documents([{'_id': 1}, {'_id': 2}])
+
+        qs = query.QuerySet(cursor=self.cursor, cls=CachedModel)
+        qs._fill_to(0)
+
+        CachedModel._meta.query_cache.invalidate(
+            self.cursor.collection.full_name)
+
+        qs._fill_to(5)
+
+        self.assertEqual(len(CachedModel._meta.query_cache), 0)
+
     def test__fill_to_sort(self):
         """Test that `_fill_to()` correctly handles sorting."""
 
-        self.cursor.count.return_value = 3
+        self._set_documents([{'a': 1}, {'a': 2}, {'a': 3}])
 
         self.qs._sorting = [('a', 1)]
 
@@ -346,7 +1140,7 @@ class TestQuerySet(unittest.TestCase):
     def test__fill_to_twice(self):
         """Test that `_fill_to()` can be called multiple times."""
 
-        self.cursor.count.return_value = 3
+        self._set_documents([{'a': 1}, {'a': 2}, {'a': 3}])
 
         self.qs._fill_to(0)
         self.assertEqual(len(self.qs._items), 1)
@@ -363,47 +1157,120 @@ class TestQuerySet(unittest.TestCase):
     def test___getitem__(self):
         """Test the `__getitem__()` method."""
 
-        self.cursor.count.return_value = 3
-
         # qs._fill_to() would normally populate qs._items
-        self.qs._items = range(3)
+        self.qs._items = list(range(3))
 
-        with mock.patch.object(self.qs, '_fill_to') as _fill_to:
-            for x in range(3):
-                self.assertEqual(self.qs[x], self.qs._items[x])
-                _fill_to.assert_called_with(x)
+        for x in range(3):
+            self.assertEqual(self.qs[x], self.qs._items[x])
+
+        # Everything came from the cache.
+        self.assertFalse(self.cursor.clone.called)
+
+    def test___getitem___skip_limit(self):
+        ("Test that `__getitem__()` uses `skip` and `limit` for "
+         "documents that haven't been loaded.")
+
+        cursor = self.cursor.clone.return_value.skip.return_value
+        cursor = cursor.limit.return_value
+        self._set_documents([{'_id': AN_OBJECT_ID}], cursor)
+
+        self.model_qs._sorting = [('a', 1)]
+
+        actual = self.model_qs[10000]
+
+        self.cursor.clone().skip.assert_called_with(10000)
+        self.cursor.clone().skip().limit.assert_called_with(1)
+        cursor.sort.assert_called_with([('a', 1)])
+
+        self.assertIsInstance(actual, DefaultModel)
+        self.assertEqual(actual._document, {'_id': AN_OBJECT_ID})
+
+        # The cache should be left alone.
+        self.assertEqual(self.model_qs._items, [])
 
     def test___getitem___slice(self):
         """Test the `__getitem__()` method with slices."""
 
-        self.cursor.count.return_value = 3
+        cursor = self.cursor.clone.return_value.skip.return_value
+        cursor = cursor.limit.return_value
+        self._set_documents([1, 2], cursor)
 
-        # qs._fill_to() would normally populate qs._items
-        self.qs._items = [0, 1, 2]
+        self.assertEqual(self.qs[10000:10020], [1, 2])
+        self.cursor.clone().skip.assert_called_with(10000)
+        self.cursor.clone().skip().limit.assert_called_with(20)
 
-        with mock.patch.object(self.qs, '_fill_to') as _fill_to:
-            self.assertEqual(self.qs[1:], self.qs._items[1:])
-            _fill_to.assert_called_with(2)
+        self._set_documents([], cursor)
+        self.assertEqual(self.qs[:10], [])
+        self.cursor.clone().skip.assert_called_with(0)
+        self.cursor.clone().skip().limit.assert_called_with(10)
+
+        self._set_documents([], cursor)
+        self.assertEqual(self.qs[10:], [])
+        self.cursor.clone().skip.assert_called_with(10)
+        self.cursor.clone().skip().limit.assert_called_with(0)
+
+        self.assertEqual(self.qs[10:10], [])
+
+        self.assertEqual(self.qs._items, [])
+        self.assertFalse(self.cursor.count.called)
 
-            self.assertEqual(self.qs[:1], self.qs._items[:1])
-            _fill_to.assert_called_with(0)
+    def test___getitem___slice_cached(self):
+        """Test that `__getitem__()` uses the cache for slices."""
 
-            self.assertEqual(self.qs[1:2], self.qs._items[1:2])
-            _fill_to.assert_called_with(1)
+        self._set_documents([0, 1, 2])
 
-            self.assertEqual(self.qs[::2], self.qs._items[::2])
-            _fill_to.assert_called_with(2)
+        # Load everything.
+        self.qs._fill_to(3)
+
+        self.assertEqual(self.qs[1:], [1, 2])
+        self.assertEqual(self.qs[:1], [0])
+        self.assertEqual(self.qs[1:2], [1])
+        self.assertEqual(self.qs[::2], [0, 2])
+        self.assertEqual(self.qs[1::2], [1])
+        self.assertEqual(self.qs[::], [0, 1, 2])
+
+        self.assertFalse(self.cursor.clone.called)
+        self.assertFalse(self.cursor.count.called)
+
+    def test___getitem___slice_skip_limit(self):
+        ("Test that `__getitem__()` respects an existing skip and "
+         "limit.")
+
+        self.qs._skip = 10
+        self.qs._limit = 20
+
+        cursor = self.cursor.clone.return_value.skip.return_value
+        cursor = cursor.limit.return_value
 
-            self.assertEqual(self.qs[1::2], self.qs._items[1::2])
-            _fill_to.assert_called_with(2)
+        self._set_documents([], cursor)
+        self.assertEqual(self.qs[5:50], [])
+        self.cursor.clone().skip.assert_called_with(15)
+        self.cursor.clone().skip().limit.assert_called_with(15)
 
-            self.assertEqual(self.qs[::], self.qs._items[::])
-            _fill_to.assert_called_with(2)
+        self._set_documents([], cursor)
+        self.assertEqual(self.qs[5:], [])
+        self.cursor.clone().skip.assert_called_with(15)
+        self.cursor.clone().skip().limit.assert_called_with(15)
+
+        self.assertEqual(self.qs[25:30], [])
+
+    def test___getitem___slice_step(self):
+        """Test the `__getitem__()` method with a stepped slice."""
+
+        cursor = self.cursor.clone.return_value.skip.return_value
+        cursor = cursor.limit.return_value
+        self._set_documents([1, 2, 3, 4], cursor)
+
+        self.assertEqual(self.qs[1:5:2], [1, 3])
+        self.cursor.clone().skip.assert_called_with(1)
+        self.cursor.clone().skip().limit.assert_called_with(4)
 
     def test___getitem___indexerror(self):
         """Test that `__getitem__()` raises `IndexError`."""
 
-        self.cursor.count.return_value = 3
+        cursor = self.cursor.clone.return_value.skip.return_value
+        cursor = cursor.limit.return_value
+        self._set_documents([], cursor)
 
         with self.assertRaises(IndexError) as e:
             self.model_qs[3]
@@ -412,6 +1279,8 @@ class TestQuerySet(unittest.TestCase):
         actual = str(e.exception)
         self.assertEqual(actual, expected)
 
+        self._set_documents([], cursor)
+
         with self.assertRaises(IndexError) as e:
             self.qs[3]
 
@@ -419,12 +1288,34 @@ class TestQuerySet(unittest.TestCase):
         actual = str(e.exception)
         self.assertEqual(actual, expected)
 
+        self.assertFalse(self.cursor.count.called)
+
+    def test___getitem___indexerror_cached(self):
+        ("Test that `__getitem__()` raises `IndexError` without a trip "
+         "to the database once all documents are loaded.")
+
+        self._set_documents([{'a': 1}, {'a': 2}, {'a': 3}])
+
+        # Load everything.
+        self.qs._fill_to(3)
+
+        with self.assertRaises(IndexError):
+            self.qs[3]
+
+        self.assertFalse(self.cursor.clone.called)
+
     def test___getitem___typeerror(self):
         """Test that `__getitem__()` raises `TypeError`."""
 
         with self.assertRaises(TypeError):
             self.qs[-1]
 
+        with self.assertRaises(TypeError):
+            self.qs[-1:]
+
+        with self.assertRaises(TypeError):
+            self.qs[:-1]
+
     def test___iter__(self):
         """Test the `__iter__()` method."""
 
@@ -433,10 +1324,9 @@ class TestQuerySet(unittest.TestCase):
     def test___iter___fills_cache(self):
         """Test that `__iter__()` fills the result cache."""
 
-        self.cursor.count.return_value = 3
-
         def append_to_cache(v):
-            self.qs._items.append(v)
+            if v < 3:
+                self.qs._items.append(v)
 
         with mock.patch.object(self.qs, '_fill_to') as _fill_to:
             _fill_to.side_effect = append_to_cache
@@ -451,12 +1341,11 @@ class TestQuerySet(unittest.TestCase):
     def test__iter___fills_cache_partial(self):
         """Test that `__iter__()` fills the rest of the result cache."""
 
-        self.cursor.count.return_value = 3
-
         self.qs._items = [0]
 
         def append_to_cache(v):
-            self.qs._items.append(v)
+            if v < 3:
+                self.qs._items.append(v)
 
         with mock.patch.object(self.qs, '_fill_to') as _fill_to:
             _fill_to.side_effect = append_to_cache
@@ -465,13 +1354,21 @@ class TestQuerySet(unittest.TestCase):
             for x in self.qs:
                 if i == 0:
                     # qs._fill_to(0) will already have been called
-                    _fill_to.assert_not_called()
+                    self.assertFalse(_fill_to.called)
                 else:
                     _fill_to.assert_called_with(i)
                 i += 1
 
         self.assertEqual(len(self.qs._items), 3)
 
+    def test___iter___no_count(self):
+        """Test that `__iter__()` doesn't count the documents."""
+
+        self._set_documents([{'a': 1}, {'a': 2}, {'a': 3}])
+
+        self.assertEqual(list(iter(self.qs)), [{'a': 1}, {'a': 2}, {'a': 3}])
+        self.assertFalse(self.cursor.count.called)
+
     def test___len__(self):
         """Test the `__len__()` method."""
 
@@ -0,0 +1,638 @@
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from pymongo.errors import OperationFailure
+
+from simon import sessions
+from simon.exceptions import FlushError
+
+from .utils import AN_OBJECT_ID
+
+
+class BulkWriteError(Exception):
+    """Stand-in for the exception added in PyMongo 2.7."""
+
+    def __init__(self, details):
+        self.details = details
+
+
+def CollectionFactory(name='test.collection'):
+    collection = mock.MagicMock()
+    collection.full_name = name
+    return collection
+
+
+class TestCounters(unittest.TestCase):
+    """Test the :class:`~simon.sessions.Counters` class."""
+
+    def setUp(self):
+        self.collection = CollectionFactory()
+        self.counters = sessions.Counters(interval=60, threshold=5)
+
+    def tearDown(self):
+        if self.counters._timer is not None:
+            self.counters._timer.cancel()
+
+    def test_add(self):
+        """Test the `add()` method."""
+
+        self.counters.add(self.collection, 1, 'a')
+        self.counters.add(self.collection, 1, 'a', 2)
+        self.counters.add(self.collection, 1, 'b')
+        self.counters.add(self.collection, 2, 'a', w=1)
+
+        self.assertEqual(self.counters._pending, {
+            ('test.collection', 1): (self.collection, {'a': 3, 'b': 1}, {},
+                                     None),
+            ('test.collection', 2): (self.collection, {'a': 1}, {'w': 1},
+                                     None),
+        })
+
+        # The timer is started with the first increment.
+        self.assertIsNotNone(self.counters._timer)
+
+    def test_add_threshold(self):
+        ("Test that `add()` sends the increments once the threshold "
+         "has been reached.")
+
+        with mock.patch.object(self.counters, 'flush') as flush:
+            for i in range(4):
+                self.counters.add(self.collection, 1, 'a')
+            self.assertFalse(flush.called)
+
+            self.counters.add(self.collection, 1, 'a')
+            flush.assert_called_once_with()
+
+    def test_counter(self):
+        """Test the `Counter` class."""
+
+        on_flush = mock.Mock()
+
+        counter = sessions.Counter(self.counters, self.collection, 1, 'a',
+                                   on_flush=on_flush, w=1)
+        counter.add()
+        counter.add(2)
+
+        self.assertEqual(self.counters._pending, {
+            ('test.collection', 1): (self.collection, {'a': 3}, {'w': 1},
+                                     on_flush),
+        })
+
+    def test_flush(self):
+        """Test the `flush()` method."""
+
+        self.counters.add(self.collection, 1, 'a', 2)
+        self.counters.add(self.collection, 1, 'b')
+
+        with mock.patch('simon.sessions.BulkWriteError', None):
+            self.counters.flush()
+
+        self.collection.update.assert_called_once_with(
+            {'_id': 1}, {'$inc': {'a': 2, 'b': 1}}, upsert=False)
+
+        self.assertEqual(self.counters._pending, {})
+        self.assertEqual(self.counters._count, 0)
+        self.assertIsNone(self.counters._timer)
+
+    def test_flush_on_flush(self):
+        ("Test that `flush()` calls `on_flush` once the increments have "
+         "been sent.")
+
+        def on_flush():
+            self.assertTrue(self.collection.update.called)
+            calls.append(1)
+
+        calls = []
+        self.counters.add(self.collection, 1, 'a', on_flush=on_flush)
+        self.counters.add(self.collection, 1, 'a', on_flush=on_flush)
+        self.counters.add(self.collection, 2, 'a')
+
+        with mock.patch('simon.sessions.BulkWriteError', None):
+            self.counters.flush()
+
+        # Once for each document.
+        self.assertEqual(calls, [1])
+
+    def test_interval(self):
+        """Test that increments are sent after the interval."""
+
+        self.counters.interval = 0.01
+
+        with mock.patch('simon.sessions.BulkWriteError', None):
+            self.counters.add(self.collection, 1, 'a')
+            self.counters._timer.join()
+
+        self.collection.update.assert_called_once_with(
+            {'_id': 1}, {'$inc': {'a': 1}}, upsert=False)
+
+    def test_on_error(self):
+        """Test that `on_error` is called when sending fails."""
+
+        self.counters.on_error = mock.Mock()
+        self.collection.update.side_effect = OperationFailure('failed')
+
+        self.counters.add(self.collection, 1, 'a')
+
+        with mock.patch('simon.sessions.BulkWriteError', None):
+            self.counters._send()
+
+        self.assertIsInstance(self.counters.on_error.call_args[0][0],
+                              FlushError)
+
+
+class TestIdentityMap(unittest.TestCase):
+    """Test the :class:`~simon.sessions.IdentityMap` class."""
+
+    def setUp(self):
+        self.collection = CollectionFactory()
+        self.identity_map = sessions.IdentityMap()
+
+    def test_add(self):
+        """Test the `add()` method."""
+
+        instance = mock.Mock(_document={'_id': AN_OBJECT_ID})
+
+        self.identity_map.add(self.collection, instance)
+
+        self.assertIs(self.identity_map.get(self.collection, AN_OBJECT_ID),
+                      instance)
+
+        # Documents in other collections are separate.
+        other = CollectionFactory('test.other')
+        self.assertIsNone(self.identity_map.get(other, AN_OBJECT_ID))
+
+    def test_add_without_id(self):
+        """Test that `add()` skips instances without a usable `_id`."""
+
+        self.identity_map.add(self.collection, mock.Mock(_document={}))
+        self.identity_map.add(self.collection,
+                              mock.Mock(_document={'_id': {'a': 1}}))
+
+        self.assertEqual(len(self.identity_map), 0)
+
+    def test_remove(self):
+        """Test the `remove()` method."""
+
+        instance = mock.Mock(_document={'_id': AN_OBJECT_ID})
+
+        self.identity_map.add(self.collection, instance)
+        self.identity_map.remove(self.collection, AN_OBJECT_ID)
+
+        self.assertIsNone(self.identity_map.get(self.collection,
+                                                AN_OBJECT_ID))
+
+        # Removing it again is fine.
+        self.identity_map.remove(self.collection, AN_OBJECT_ID)
+
+    def test_clear(self):
+        """Test the `clear()` method."""
+
+        other = CollectionFactory('test.other')
+
+        self.identity_map.add(self.collection,
+                              mock.Mock(_document={'_id': 1}))
+        self.identity_map.add(other, mock.Mock(_document={'_id': 1}))
+
+        # Only the instances from the collection are removed.
+        self.identity_map.clear(self.collection)
+
+        self.assertIsNone(self.identity_map.get(self.collection, 1))
+        self.assertIsNotNone(self.identity_map.get(other, 1))
+
+        self.identity_map.clear()
+
+        self.assertEqual(len(self.identity_map), 0)
+
+    def test_identity_map(self):
+        """Test the `identity_map()` context manager."""
+
+        self.assertIsNone(sessions.get_identity_map())
+
+        with sessions.identity_map() as identity_map:
+            self.assertIs(sessions.get_identity_map(), identity_map)
+
+            # Nested identity maps are the same as the outer one.
+            with sessions.identity_map() as inner:
+                self.assertIs(inner, identity_map)
+
+            self.assertIs(sessions.get_identity_map(), identity_map)
+
+        self.assertIsNone(sessions.get_identity_map())
+
+
+class TestSession(unittest.TestCase):
+    """Test the :class:`~simon.sessions.Session` class."""
+
+    def setUp(self):
+        self.collection = CollectionFactory()
+        self.session = sessions.Session()
+
+    def test_clear(self):
+        """Test the `clear()` method."""
+
+        self.session.update(self.collection, {'_id': AN_OBJECT_ID},
+                            {'$inc': {'a': 1}})
+        self.session.clear()
+
+        self.assertEqual(len(self.session), 0)
+        self.assertEqual(self.session._updates, {})
+        self.assertEqual(self.session._callbacks, [])
+
+    def test_flush_bulk(self):
+        """Test the `flush()` method with bulk operations."""
+
+        bulk = self.collection.initialize_ordered_bulk_op.return_value
+        view = bulk.find.return_value
+
+        self.session.insert(self.collection, {'_id': 1, 'a': 1}, w=1)
+        self.session.update(self.collection, {'_id': 2}, {'$inc': {'a': 1}},
+                            w=1)
+        self.session.update(self.collection, {'_id': 3}, {'a': 1},
+                            upsert=True, w=1)
+        self.session.remove(self.collection, {'_id': 4}, w=1)
+
+        with mock.patch('simon.sessions.BulkWriteError', BulkWriteError):
+            self.session.flush()
+
+        bulk.insert.assert_called_with({'_id': 1, 'a': 1})
+        bulk.find.assert_any_call({'_id': 2})
+        view.update_one.assert_called_with({'$inc': {'a': 1}})
+        bulk.find.assert_any_call({'_id': 3})
+        view.upsert.return_value.replace_one.assert_called_with({'a': 1})
+        bulk.find.assert_called_with({'_id': 4})
+        view.remove_one.assert_called_with()
+
+        # Everything is sent together.
+        self.assertEqual(self.collection.initialize_ordered_bulk_op.call_count,
+                         1)
+        bulk.execute.assert_called_with({'w': 1})
+
+        self.assertEqual(len(self.session), 0)
+
+    def test_flush_bulk_errors(self):
+        """Test that `flush()` reports the operations that failed."""
+
+        bulk = self.collection.initialize_ordered_bulk_op.return_value
+        bulk.execute.side_effect = BulkWriteError({'writeErrors': [
+            {'index': 1, 'code': 11000, 'errmsg': 'duplicate key'},
+        ]})
+
+        self.session.insert(self.collection, {'_id': 1})
+        self.session.insert(self.collection, {'_id': 2})
+
+        with mock.patch('simon.sessions.BulkWriteError', BulkWriteError):
+            with self.assertRaises(FlushError) as e:
+                self.session.flush()
+
+        errors = e.exception.errors
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0]['index'], 1)
+        self.assertEqual(errors[0]['code'], 11000)
+        self.assertEqual(errors[0]['message'], 'duplicate key')
+        self.assertEqual(errors[0]['operation']['document'], {'_id': 2})
+
+        # The queue is emptied either way.
+        self.assertEqual(len(self.session), 0)
+
+    def test_flush_each(self):
+        ("Test the `flush()` method without support for bulk "
+         "operations.")
+
+        self.session.insert(self.collection, {'_id': 1}, w=1)
+        self.session.update(self.collection, {'_id': 2}, {'$inc': {'a': 1}},
+                            w=1)
+        self.session.remove(self.collection, {'_id': 3}, w=1)
+
+        with mock.patch('simon.sessions.BulkWriteError', None):
+            self.session.flush()
+
+        self.collection.insert.assert_called_with({'_id': 1}, w=1)
+        self.collection.update.assert_called_with(
+            {'_id': 2}, {'$inc': {'a': 1}}, upsert=False, w=1)
+        self.collection.remove.assert_called_with({'_id': 3}, w=1)
+
+    def test_flush_each_errors(self):
+        ("Test that `flush()` stops at the first failure without "
+         "support for bulk operations.")
+
+        other = CollectionFactory('test.other')
+        self.collection.update.side_effect = OperationFailure('failed')
+
+        self.session.insert(self.collection, {'_id': 1})
+        self.session.update(self.collection, {'_id': 2}, {'$inc': {'a': 1}})
+        self.session.insert(other, {'_id': 3})
+
+        with mock.patch('simon.sessions.BulkWriteError', None):
+            with self.assertRaises(FlushError) as e:
+                self.session.flush()
+
+        errors = e.exception.errors
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0]['index'], 1)
+        self.assertEqual(errors[0]['operation']['name'], 'update')
+
+        self.assertFalse(other.insert.called)
+
+    def test_flush_on_flush(self):
+        ("Test that `flush()` calls the `on_flush()` functions after the "
+         "writes have been sent.")
+
+        def callback():
+            self.assertTrue(self.collection.update.called)
+            calls.append(1)
+
+        calls = []
+        self.session.update(self.collection, {'_id': 1}, {'$inc': {'a': 1}})
+        self.session.on_flush(callback)
+
+        self.assertEqual(calls, [])
+
+        with mock.patch('simon.sessions.BulkWriteError', None):
+            self.session.flush()
+
+        self.assertEqual(calls, [1])
+
+        # They're only called once.
+        with mock.patch('simon.sessions.BulkWriteError', None):
+            self.session.flush()
+
+        self.assertEqual(calls, [1])
+
+    def test_flush_on_flush_errors(self):
+        ("Test that `flush()` calls the `on_flush()` functions when a "
+         "write fails.")
+
+        callback = mock.Mock()
+        self.collection.update.side_effect = OperationFailure('failed')
+
+        self.session.insert(self.collection, {'_id': 1})
+        self.session.update(self.collection, {'_id': 2}, {'$inc': {'a': 1}})
+        self.session.on_flush(callback)
+
+        with mock.patch('simon.sessions.BulkWriteError', None):
+            with self.assertRaises(FlushError):
+                self.session.flush()
+
+        callback.assert_called_once_with()
+
+    def test_flush_runs(self):
+        ("Test that `flush()` groups operations by collection and write "
+         "concern.")
+
+        other = CollectionFactory('test.other')
+
+        self.session.insert(self.collection, {'_id': 1}, w=1)
+        self.session.insert(self.collection, {'_id': 2}, w=1)
+        self.session.insert(other, {'_id': 3}, w=1)
+        self.session.insert(self.collection, {'_id': 4}, w=0)
+
+        with mock.patch('simon.sessions.BulkWriteError', BulkWriteError):
+            self.session.flush()
+
+        bulk = self.collection.initialize_ordered_bulk_op.return_value
+        self.assertEqual(self.collection.initialize_ordered_bulk_op.call_count,
+                         2)
+        self.assertEqual(bulk.insert.call_count, 3)
+        bulk.execute.assert_called_with({'w': 0})
+
+        other_bulk = other.initialize_ordered_bulk_op.return_value
+        other_bulk.insert.assert_called_with({'_id': 3})
+
+    def test_insert(self):
+        """Test the `insert()` method."""
+
+        self.assertEqual(self.session.insert(self.collection, {'_id': 1}), 1)
+        self.assertEqual(
+            self.session.insert(self.collection, [{'_id': 2}, {'_id': 3}]),
+            [2, 3])
+
+        self.assertEqual(len(self.session), 3)
+
+    def test_update_merge(self):
+        """Test that `update()` merges compatible updates."""
+
+        spec = {'_id': AN_OBJECT_ID}
+
+        self.session.update(self.collection, spec, {'$inc': {'a': 1}})
+        self.session.update(self.collection, spec, {'$inc': {'a': 2, 'b': 1}})
+        self.session.update(self.collection, spec, {'$set': {'c': 1}})
+        self.session.update(self.collection, spec, {'$set': {'c': 2}})
+
+        self.assertEqual(len(self.session), 1)
+        self.assertEqual(self.session._operations[0]['document'],
+                         {'$inc': {'a': 3, 'b': 1}, '$set': {'c': 2}})
+
+    def test_update_merge_incompatible(self):
+        """Test that `update()` doesn't merge incompatible updates."""
+
+        pairs = [
+            # The same field with different operators.
+            ({'$set': {'a': 1}}, {'$inc': {'a': 1}}, {}),
+            # A field embedded within another.
+            ({'$inc': {'b.c': 1}}, {'$unset': {'b': 1}}, {}),
+            # Operators whose updates can't be combined.
+            ({'$push': {'d': 1}}, {'$push': {'d': 2}}, {}),
+            # A document replacement.
+            ({'$set': {'e': 1}}, {'e': 2}, {}),
+            # Different write concern.
+            ({'$set': {'f': 1}}, {'$set': {'f': 2}}, {'w': 0}),
+        ]
+
+        for id, (first, second, write_concern) in enumerate(pairs):
+            self.session.update(self.collection, {'_id': id}, first)
+            self.session.update(self.collection, {'_id': id}, second,
+                                **write_concern)
+
+        self.assertEqual(len(self.session), 10)
+
+        # The original updates are left alone.
+        self.assertEqual(self.session._operations[0]['document'],
+                         {'$set': {'a': 1}})
+
+    def test_update_merge_other_documents(self):
+        ("Test that `update()` merges updates around those for other "
+         "documents.")
+
+        self.session.update(self.collection, {'_id': 1}, {'$inc': {'a': 1}})
+        self.session.update(self.collection, {'_id': 2}, {'$inc': {'a': 1}})
+        self.session.update(self.collection, {'_id': 1}, {'$inc': {'a': 1}})
+
+        self.assertEqual(len(self.session), 2)
+        self.assertEqual(self.session._operations[0]['document'],
+                         {'$inc': {'a': 2}})
+
+    def test_update_merge_remove(self):
+        """Test that `update()` doesn't merge across a remove."""
+
+        spec = {'_id': AN_OBJECT_ID}
+
+        self.session.update(self.collection, spec, {'$inc': {'a': 1}})
+        self.session.remove(self.collection, spec)
+        self.session.update(self.collection, spec, {'$inc': {'a': 1}},
+                            upsert=True)
+        self.session.update(self.collection, spec, {'$inc': {'a': 1}})
+
+        self.assertEqual(len(self.session), 4)
+
+
+class TestSessionContextManager(unittest.TestCase):
+    """Test the :func:`~simon.sessions.session` context manager."""
+
+    def test_session(self):
+        """Test the `session()` context manager."""
+
+        self.assertIsNone(sessions.get_session())
+
+        with mock.patch.object(sessions.Session, 'flush') as flush:
+            with sessions.session() as s:
+                self.assertIs(sessions.get_session(), s)
+
+                # Nested sessions join the outer one.
+                with sessions.session() as inner:
+                    self.assertIs(inner, s)
+
+                self.assertFalse(flush.called)
+
+            flush.assert_called_once_with()
+
+        self.assertIsNone(sessions.get_session())
+
+    def test_session_exception(self):
+        """Test that `session()` discards writes on an exception."""
+
+        with mock.patch.object(sessions.Session, 'flush') as flush:
+            with self.assertRaises(ValueError):
+                with sessions.session():
+                    raise ValueError
+
+            self.assertFalse(flush.called)
+
+        self.assertIsNone(sessions.get_session())
+
+
+class TestFlushQueued(unittest.TestCase):
+    """Test the :func:`~simon.sessions.flush_queued` function."""
+
+    def test_flush_queued(self):
+        """Test the `flush_queued()` function."""
+
+        write_behind = mock.Mock()
+
+        with mock.patch.object(sessions.Session, 'flush') as flush:
+            sessions.flush_queued()
+            self.assertFalse(flush.called)
+
+            with sessions.session():
+                sessions.flush_queued(write_behind)
+
+                flush.assert_called_once_with()
+
+        write_behind.flush.assert_called_once_with()
+
+
+class TestWriteBehind(unittest.TestCase):
+    """Test the :class:`~simon.sessions.WriteBehind` class."""
+
+    def setUp(self):
+        self.collection = CollectionFactory()
+
+    def test_flush(self):
+        """Test that writes are sent by the background thread."""
+
+        write_behind = sessions.WriteBehind(batch_size=2, interval=0.01)
+
+        with mock.patch('simon.sessions.BulkWriteError', None):
+            self.assertEqual(
+                write_behind.insert(self.collection, {'_id': 1}, w=1), 1)
+            write_behind.update(self.collection, {'_id': 1},
+                                {'$inc': {'a': 1}}, w=1)
+            write_behind.remove(self.collection, {'_id': 2}, w=1)
+
+            write_behind.flush()
+
+        self.collection.insert.assert_called_with({'_id': 1}, w=1)
+        self.collection.update.assert_called_with(
+            {'_id': 1}, {'$inc': {'a': 1}}, upsert=False, w=1)
+        self.collection.remove.assert_called_with({'_id': 2}, w=1)
+
+    def test_on_flush(self):
+        ("Test that `on_flush()` functions are called after the writes "
+         "queued before them have been sent.")
+
+        def callback():
+            self.assertTrue(self.collection.update.called)
+            calls.append(1)
+
+        calls = []
+        write_behind = sessions.WriteBehind(interval=0.01)
+
+        with mock.patch('simon.sessions.BulkWriteError', None):
+            write_behind.update(self.collection, {'_id': 1},
+                                {'$inc': {'a': 1}})
+            write_behind.on_flush(callback)
+
+            write_behind.flush()
+
+        self.assertEqual(calls, [1])
+
+    def test_on_error(self):
+        """Test that `on_error` is called when a batch fails."""
+
+        on_error = mock.Mock()
+        write_behind = sessions.WriteBehind(on_error=on_error)
+
+        self.collection.insert.side_effect = OperationFailure('failed')
+
+        write_behind._queue.put(('insert', (self.collection, {'_id': 1}),
+                                 {}))
+
+        with mock.patch('simon.sessions.BulkWriteError', None):
+            write_behind._send(write_behind._take())
+
+        self.assertTrue(on_error.called)
+        self.assertIsInstance(on_error.call_args[0][0], FlushError)
+
+    def test_take(self):
+        """Test that writes are taken off of the queue in batches."""
+
+        write_behind = sessions.WriteBehind(batch_size=2, interval=0)
+
+        for i in range(3):
+            write_behind._queue.put(('remove', (self.collection, {'_id': i}),
+                                     {}))
+
+        self.assertEqual(len(write_behind._take()), 2)
+        self.assertEqual(len(write_behind._take()), 1)
+
+    def test_update_merge(self):
+        """Test that writes in the same batch are merged."""
+
+        write_behind = sessions.WriteBehind()
+
+        writes = [
+            ('update', (self.collection, {'_id': 1}, {'$inc': {'a': 1}}), {}),
+            ('update', (self.collection, {'_id': 1}, {'$inc': {'a': 2}}), {}),
+        ]
+        for write in writes:
+            write_behind._queue.put(write)
+
+        with mock.patch('simon.sessions.BulkWriteError', None):
+            write_behind._send(write_behind._take())
+
+        self.collection.update.assert_called_once_with(
+            {'_id': 1}, {'$inc': {'a': 3}}, upsert=False)
+
+    def test_get_write_behind(self):
+        """Test the `get_write_behind()` function."""
+
+        write_behind = sessions.get_write_behind()
+
+        self.assertIsInstance(write_behind, sessions.WriteBehind)
+        self.assertIs(sessions.get_write_behind(), write_behind)
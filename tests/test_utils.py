@@ -10,8 +10,9 @@ from bson.errors import InvalidId
 import pymongo
 
 from simon.utils import (current_datetime, get_nested_key, guarantee_object_id,
-                         ignored, is_atomic, map_fields, parse_kwargs,
-                         remove_nested_key, set_write_concern,
+                         ignored, is_atomic, map_fields, map_key,
+                         parse_kwargs,
+                         remove_nested_key, set_nested_key, set_write_concern,
                          set_write_concern_as_safe, set_write_concern_as_w,
                          update_nested_keys)
 
@@ -445,6 +446,44 @@ class TestUtils(unittest.TestCase):
                             with_operators=True)
         self.assertEqual(actual, expected)
 
+        # Only __not is removed from the key.
+        expected = {'count': {'$not': {'$elemMatch': {'a': 1}}}}
+        actual = map_fields(field_map, {'count__not__elemmatch': {'a': 1}},
+                            with_operators=True)
+        self.assertEqual(actual, expected)
+
+    def test_map_fields_memo(self):
+        """Test that `map_fields()` remembers keys for each field map."""
+
+        self.assertEqual(map_fields({'a': 'b'}, {'a': 1}), {'b': 1})
+
+        # Another field map, even with the same id, gets its own keys.
+        self.assertEqual(map_fields({'a': 'c'}, {'a': 1}), {'c': 1})
+
+        mapping = {'a': 'b'}
+        for x in range(2):
+            self.assertEqual(map_fields(mapping, {'a__c': 1}),
+                             {'b': {'c': 1}})
+            self.assertEqual(map_fields(mapping, {'a': 1},
+                                        flatten_keys=True),
+                             {'b': 1})
+
+        # Changes to a field map are picked up.
+        mapping['a'] = 'd.e'
+        self.assertEqual(map_fields(mapping, {'a': 1}, flatten_keys=True),
+                         {'d.e': 1})
+
+    def test_map_key(self):
+        """Test the `map_key()` method."""
+
+        self.assertEqual(map_key(field_map, 'a'), 'a')
+        self.assertEqual(map_key(field_map, 'b'), 'c')
+        self.assertEqual(map_key(field_map, 'd__e'), 'f.e')
+        self.assertEqual(map_key(field_map, 'g.h'), 'i.j')
+        self.assertEqual(map_key(field_map, 'b__c'), 'b.c')
+        self.assertEqual(map_key(field_map, '__a__'), '__a__')
+        self.assertEqual(map_key(field_map, '$or'), '$or')
+
     def test_parse_kwargs(self):
         """Test the `parse_kwargs()` method."""
 
@@ -530,6 +569,36 @@ class TestUtils(unittest.TestCase):
         with self.assertRaises(TypeError):
             remove_nested_key(1, 'a')
 
+    def test_set_nested_key(self):
+        """Test the `set_nested_key()` method."""
+
+        original = {}
+        expected = {'a': 1}
+        actual = set_nested_key(original, 'a', 1)
+        self.assertEqual(actual, expected)
+        self.assertIs(actual, original)
+
+        original = {'a': {'b': 1}}
+        expected = {'a': {'c': 2}}
+        actual = set_nested_key(original, 'a', {'c': 2})
+        self.assertEqual(actual, expected)
+
+        original = {'a': {'b': 1}}
+        expected = {'a': {'b': 1, 'c': {'d': 2}}}
+        actual = set_nested_key(original, 'a.c.d', 2)
+        self.assertEqual(actual, expected)
+
+        original = {'a': 1}
+        expected = {'a': {'b': 2}}
+        actual = set_nested_key(original, 'a.b', 2)
+        self.assertEqual(actual, expected)
+
+    def test_set_nested_key_typeerror(self):
+        """Test that `set_nested_key()` raises `TypeError`."""
+
+        with self.assertRaises(TypeError):
+            set_nested_key(1, 'a', 1)
+
     def test_set_write_concern(self):
         """Test the `set_write_concern()` method."""
 